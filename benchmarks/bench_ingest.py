@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+Ingest-Benchmark für den SMS-Monitor
+
+Startet einen privaten D-Bus, darauf den Fake-ModemManager mit einem
+SMS-Rückstau der gewünschten Größe und misst, wie schnell
+``SMSMonitor.process_sms()`` ihn abarbeitet. Jede Größe läuft in einem
+eigenen Prozess, damit die Spitzen-RSS vergleichbar bleibt.
+
+Ausgabe: SMS/s, Latenz pro Stufe (Abruf, Parsen, Speichern, Löschen,
+Commit) und Spitzen-RSS. Mit ``--json`` zusätzlich maschinenlesbar für
+den Vergleich zwischen Releases.
+
+Verwendung:
+    python3 benchmarks/bench_ingest.py
+    python3 benchmarks/bench_ingest.py --sizes 100,10000 --message-store sqlite
+    python3 benchmarks/bench_ingest.py --json result.json
+    python3 benchmarks/bench_ingest.py --sizes 1000 --delete-latency 50 --sync-delete
+"""
+
+import argparse
+import json
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR.parent))
+
+DEFAULT_SIZES = '100,10000,100000'
+
+# Stufe -> Methode von SMSMonitor
+STAGES = [
+    ('fetch', 'fetch_sms_batch'),
+    ('list', 'get_sms_list'),
+    ('parse', 'parse_sms'),
+    ('save', 'save_sms'),
+    ('delete', 'delete_sms'),
+    ('commit', '_save_processed'),
+]
+
+
+def start_bus() -> tuple:
+    """
+    Privaten Session-Bus starten
+
+    Returns:
+        (Prozess, Bus-Adresse)
+    """
+    process = subprocess.Popen(
+        ['dbus-daemon', '--session', '--nofork', '--print-address=1'],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        text=True
+    )
+    address = process.stdout.readline().strip()
+    if not address:
+        process.kill()
+        raise RuntimeError('dbus-daemon konnte nicht gestartet werden')
+    return process, address
+
+
+def start_fake_modemmanager(address: str, modems: int, messages: int,
+                            delete_latency: int = 0) -> subprocess.Popen:
+    """Fake-ModemManager starten und warten bis er bereit ist"""
+    process = subprocess.Popen(
+        [sys.executable, str(BENCH_DIR / 'fake_modemmanager.py'),
+         '--address', address, '--modems', str(modems), '--messages', str(messages),
+         '--delete-latency', str(delete_latency)],
+        stdout=subprocess.PIPE,
+        text=True
+    )
+    if process.stdout.readline().strip() != 'ready':
+        process.kill()
+        raise RuntimeError('Fake-ModemManager konnte nicht gestartet werden')
+    return process
+
+
+def instrument(monitor, timings: dict):
+    """Laufzeit jeder Stufe pro Aufruf erfassen"""
+    for stage, name in STAGES:
+        original = getattr(monitor, name)
+        samples = timings.setdefault(stage, [])
+
+        def timed(*args, _original=original, _samples=samples, **kwargs):
+            start = time.perf_counter()
+            try:
+                return _original(*args, **kwargs)
+            finally:
+                _samples.append(time.perf_counter() - start)
+
+        setattr(monitor, name, timed)
+
+
+def percentile(samples: list, q: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+
+def run_once(args, size: int) -> dict:
+    """Einen Rückstau abarbeiten (läuft im eigenen Prozess)"""
+    from sms_monitor.config import Config
+    from sms_monitor.monitor import SMSMonitor
+
+    fake = start_fake_modemmanager(args.address, args.modems, size, args.delete_latency)
+    workdir = Path(tempfile.mkdtemp(prefix='sms-monitor-bench-'))
+
+    try:
+        config_path = workdir / 'config.json'
+        config_path.write_text(json.dumps({
+            'dbus_address': args.address,
+            'modems': 'all',
+            'sms_dir': str(workdir / 'sms'),
+            'message_store': args.message_store,
+            'message_db': str(workdir / 'messages.sqlite3'),
+            'log_file': str(workdir / 'sms-monitor.log'),
+            'log_level': args.log_level,
+            'processed_db': str(workdir / 'processed.json'),
+            'processed_backend': args.processed_backend,
+            'stats_file': str(workdir / 'stats.json'),
+            'batch_fetch': not args.no_batch,
+            'delete_concurrency': args.delete_concurrency,
+            'delete_drain_timeout': 3600,
+            'journal_file': str(workdir / 'journal.jsonl'),
+            'send_dir': str(workdir / 'send'),
+            'durability': args.durability,
+            'webhooks': [],
+            'enable_console_output': False
+        }))
+
+        monitor = SMSMonitor(Config(str(config_path)))
+        timings = {}
+        instrument(monitor, timings)
+
+        start = time.perf_counter()
+        if not monitor.connect_modem():
+            raise RuntimeError('Keine Verbindung zum Fake-ModemManager')
+        connect_seconds = time.perf_counter() - start
+
+        if not args.sync_delete:
+            # Ingest-Pipeline und Lösch-Threads der Modem-Worker starten
+            monitor.start_workers()
+
+        start = time.perf_counter()
+        monitor.process_sms()
+        if monitor.pipeline is not None:
+            # Bis alle SMS gespeichert und gemeldet sind
+            for stage in monitor.pipeline.stages:
+                stage.drain()
+        elapsed = time.perf_counter() - start
+
+        processed = len(monitor.processed_sms)
+        monitor.shutdown()
+        # Bis alle Löschungen erledigt sind, d.h. der Modem-Speicher leer ist
+        drained = time.perf_counter() - start
+
+        return {
+            'messages': size,
+            'processed': processed,
+            'seconds': elapsed,
+            'drain_seconds': drained,
+            'connect_seconds': connect_seconds,
+            'messages_per_second': size / elapsed if elapsed else 0.0,
+            # ru_maxrss ist unter Linux in KiB angegeben
+            'peak_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+            'stages': {
+                stage: {
+                    'calls': len(samples),
+                    'total_s': sum(samples),
+                    'p50_ms': percentile(samples, 0.5) * 1000,
+                    'p95_ms': percentile(samples, 0.95) * 1000,
+                    'max_ms': max(samples) * 1000
+                }
+                for stage, samples in timings.items() if samples
+            }
+        }
+
+    finally:
+        fake.terminate()
+        fake.wait()
+        if args.keep:
+            print(f"Arbeitsverzeichnis: {workdir}", file=sys.stderr)
+        else:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+
+def print_result(result: dict):
+    print(
+        f"\n{result['messages']} SMS: {result['seconds']:.2f}s, "
+        f"{result['messages_per_second']:.0f} SMS/s, "
+        f"Modem-Speicher leer nach {result['drain_seconds']:.2f}s, "
+        f"Spitzen-RSS {result['peak_rss_mb']:.1f} MB"
+    )
+    if result['processed'] != result['messages']:
+        print(f"  WARNUNG: nur {result['processed']} von {result['messages']} SMS verarbeitet")
+
+    print(f"  {'Stufe':<8} {'Aufrufe':>8} {'Gesamt s':>9} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8}")
+    for stage, values in result['stages'].items():
+        print(
+            f"  {stage:<8} {values['calls']:>8} {values['total_s']:>9.2f} "
+            f"{values['p50_ms']:>8.3f} {values['p95_ms']:>8.3f} {values['max_ms']:>8.3f}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Ingest-Benchmark mit Fake-ModemManager')
+    parser.add_argument(
+        '--sizes', default=DEFAULT_SIZES,
+        help=f'Größen des SMS-Rückstaus, kommagetrennt (Standard: {DEFAULT_SIZES})'
+    )
+    parser.add_argument('--modems', type=int, default=1, help='Anzahl simulierter Modems')
+    parser.add_argument('--message-store', choices=['files', 'sqlite'], default='files')
+    parser.add_argument('--processed-backend', choices=['sqlite', 'log'], default='sqlite')
+    parser.add_argument('--no-batch', action='store_true', help='batch_fetch deaktivieren')
+    parser.add_argument(
+        '--sync-delete', action='store_true',
+        help='Seriell ohne Pipeline verarbeiten und im Ingest-Thread löschen'
+    )
+    parser.add_argument(
+        '--delete-concurrency', type=int, default=4, help='Gleichzeitige Löschaufrufe pro Modem'
+    )
+    parser.add_argument(
+        '--delete-latency', type=int, default=0,
+        help='Simulierte Antwortzeit von Delete() in ms'
+    )
+    parser.add_argument(
+        '--durability', choices=['message', 'cycle', 'interval'], default='cycle',
+        help='fsync pro SMS, pro Durchlauf oder im Intervall'
+    )
+    parser.add_argument('--log-level', default='INFO', help='Log-Level des Monitors')
+    parser.add_argument('--keep', action='store_true', help='Arbeitsverzeichnisse behalten')
+    parser.add_argument('--json', metavar='DATEI', help='Ergebnisse als JSON speichern')
+    parser.add_argument('--address', help=argparse.SUPPRESS)
+    parser.add_argument('--run-one', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    # Kindprozess: eine Größe messen, Ergebnis als JSON auf stdout
+    if args.run_one is not None:
+        print(json.dumps(run_once(args, args.run_one)))
+        return 0
+
+    bus, address = start_bus()
+    results = []
+    try:
+        for size in (int(value) for value in args.sizes.split(',')):
+            command = [
+                sys.executable, __file__, '--run-one', str(size), '--address', address,
+                '--modems', str(args.modems), '--message-store', args.message_store,
+                '--processed-backend', args.processed_backend, '--log-level', args.log_level,
+                '--delete-concurrency', str(args.delete_concurrency),
+                '--delete-latency', str(args.delete_latency), '--durability', args.durability
+            ]
+            if args.no_batch:
+                command.append('--no-batch')
+            if args.sync_delete:
+                command.append('--sync-delete')
+            if args.keep:
+                command.append('--keep')
+
+            output = subprocess.run(
+                command, stdout=subprocess.PIPE, text=True, check=True,
+                env=dict(os.environ, DBUS_SESSION_BUS_ADDRESS=address)
+            ).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            results.append(result)
+            print_result(result)
+    finally:
+        bus.terminate()
+        bus.wait()
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({
+                'python': sys.version.split()[0],
+                'options': {
+                    'modems': args.modems,
+                    'message_store': args.message_store,
+                    'processed_backend': args.processed_backend,
+                    'batch_fetch': not args.no_batch,
+                    'sync_delete': args.sync_delete,
+                    'delete_concurrency': args.delete_concurrency,
+                    'delete_latency_ms': args.delete_latency,
+                    'durability': args.durability
+                },
+                'results': results
+            }, f, indent=2)
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Startzeit-Benchmark für die CLI
+
+Misst die Laufzeit der Offline-Befehle (``list``, ``search``, ``stats``,
+``config --show``) gegen eine temporäre Konfiguration, jeweils als neuer
+Prozess wie beim Aufruf aus der Shell. Zusätzlich wird mit
+``python -X importtime`` geprüft, dass dabei weder GObject Introspection
+(``gi``) noch der Monitor geladen werden und keine Log-Datei entsteht.
+
+Mit ``--budget`` endet der Benchmark mit Exit-Code 1, sobald ein Befehl
+(abzüglich des reinen Interpreter-Starts) langsamer ist oder eine der
+Prüfungen fehlschlägt - so lässt er sich als Regressionstest nutzen.
+
+Verwendung:
+    python3 benchmarks/bench_startup.py
+    python3 benchmarks/bench_startup.py --runs 20 --budget 150
+    python3 benchmarks/bench_startup.py --json startup.json
+"""
+
+import argparse
+import json
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR.parent))
+
+COMMANDS = [
+    ['list'],
+    ['search', 'code'],
+    ['stats'],
+    ['config', '--show'],
+]
+
+# Module, die Offline-Befehle nicht laden dürfen
+FORBIDDEN_MODULES = ('gi', 'sms_monitor.monitor', 'requests')
+
+
+def prepare_workdir(workdir: Path, messages: int) -> Path:
+    """
+    Konfiguration und einige gespeicherte SMS anlegen
+
+    Returns:
+        Pfad zur Konfigurationsdatei
+    """
+    from sms_monitor.archive import TextFileStore
+    from sms_monitor.search import SearchIndex, fts5_available
+
+    config = {
+        'sms_dir': str(workdir / 'sms'),
+        'log_file': str(workdir / 'log' / 'sms-monitor.log'),
+        'processed_db': str(workdir / 'lib' / 'processed.json'),
+        'stats_file': str(workdir / 'lib' / 'stats.json'),
+        'search_db': str(workdir / 'lib' / 'search.sqlite3'),
+    }
+
+    (workdir / 'sms').mkdir()
+    (workdir / 'lib').mkdir()
+    store = TextFileStore(config['sms_dir'])
+    index = SearchIndex(config['search_db']) if fts5_available() else None
+    for i in range(messages):
+        sms_data = {
+            'number': f'+4915{i % 50:08d}',
+            'timestamp': f'2025-12-{1 + i % 28:02d}T{i % 24:02d}:{i % 60:02d}:00+01:00',
+            'state': 3,
+            'modem': 'bench',
+            'text': f'Ihr Code lautet {i:06d}'
+        }
+        ref = store.save(sms_data)
+        if index is not None:
+            index.add(sms_data, ref)
+    if index is not None:
+        index.close()
+
+    config_path = workdir / 'config.json'
+    config_path.write_text(json.dumps(config), encoding='utf-8')
+    return config_path
+
+
+def time_command(command: list, runs: int) -> dict:
+    """
+    Befehl mehrfach als eigenen Prozess ausführen
+
+    Returns:
+        Median, Minimum und Maximum in Millisekunden
+    """
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(
+            command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+            cwd=BENCH_DIR.parent, check=True
+        )
+        samples.append((time.perf_counter() - start) * 1000)
+
+    return {
+        'median_ms': round(statistics.median(samples), 1),
+        'min_ms': round(min(samples), 1),
+        'max_ms': round(max(samples), 1),
+    }
+
+
+def imported_modules(arguments: list) -> dict:
+    """
+    Importierte Module eines Python-Aufrufs mit kumulierter Importzeit
+
+    Args:
+        arguments: Argumente für den Interpreter (z.B. ``['-m', 'sms_monitor.cli', ...]``)
+
+    Returns:
+        Modulname -> Mikrosekunden
+    """
+    stderr = subprocess.run(
+        [sys.executable, '-X', 'importtime'] + arguments,
+        stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True,
+        cwd=BENCH_DIR.parent
+    ).stderr
+
+    modules = {}
+    for line in stderr.splitlines():
+        # "import time: <self us> | <kumuliert us> | <modul>"
+        fields = line[len('import time:'):].split('|')
+        if not line.startswith('import time:') or len(fields) != 3:
+            continue
+        cumulative = fields[1].strip()
+        if cumulative.isdigit():
+            modules[fields[2].strip()] = int(cumulative)
+    return modules
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Startzeit-Benchmark der CLI')
+    parser.add_argument('--runs', type=int, default=10, help='Wiederholungen pro Befehl')
+    parser.add_argument('--messages', type=int, default=200, help='Anzahl gespeicherter SMS')
+    parser.add_argument(
+        '--budget', type=float,
+        help='Maximale Laufzeit pro Befehl in ms (über dem Interpreter-Start)'
+    )
+    parser.add_argument('--keep', action='store_true', help='Arbeitsverzeichnis behalten')
+    parser.add_argument('--json', metavar='DATEI', help='Ergebnisse als JSON speichern')
+    args = parser.parse_args()
+
+    workdir = Path(tempfile.mkdtemp(prefix='sms-bench-startup-'))
+    failures = []
+    results = []
+
+    try:
+        config_path = prepare_workdir(workdir, args.messages)
+        base = [sys.executable, '-m', 'sms_monitor.cli', '-c', str(config_path)]
+
+        interpreter = time_command([sys.executable, '-c', 'pass'], args.runs)
+        print(f"Interpreter-Start: {interpreter['median_ms']:.1f} ms (Median)")
+        print(f"  {'Befehl':<16} {'Median ms':>10} {'min ms':>8} {'max ms':>8} {'netto ms':>9}")
+
+        for command in COMMANDS:
+            name = ' '.join(command)
+            result = time_command(base + command, args.runs)
+            result['command'] = name
+            result['net_ms'] = round(result['median_ms'] - interpreter['median_ms'], 1)
+
+            modules = imported_modules(base[1:] + command)
+            result['loaded_forbidden'] = [
+                module for module in FORBIDDEN_MODULES if module in modules
+            ]
+            results.append(result)
+
+            print(
+                f"  {name:<16} {result['median_ms']:>10.1f} {result['min_ms']:>8.1f} "
+                f"{result['max_ms']:>8.1f} {result['net_ms']:>9.1f}"
+            )
+
+            if result['loaded_forbidden']:
+                failures.append(f"{name}: lädt {', '.join(result['loaded_forbidden'])}")
+            if args.budget is not None and result['net_ms'] > args.budget:
+                failures.append(f"{name}: {result['net_ms']:.1f} ms > Budget {args.budget:.0f} ms")
+
+        if (workdir / 'log').exists():
+            failures.append("Offline-Befehle haben das Log-Verzeichnis angelegt")
+
+        import_us = imported_modules(['-c', 'import sms_monitor.cli']).get('sms_monitor.cli', 0)
+        print(f"\nImportzeit sms_monitor.cli: {import_us / 1000:.1f} ms")
+    finally:
+        if args.keep:
+            print(f"Arbeitsverzeichnis: {workdir}")
+        else:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({
+                'python': sys.version.split()[0],
+                'interpreter': interpreter,
+                'import_ms': round(import_us / 1000, 1),
+                'results': results,
+                'failures': failures
+            }, f, indent=2)
+
+    for failure in failures:
+        print(f"FEHLER: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,458 @@
+#!/usr/bin/env python3
+"""
+Fake ModemManager für Tests und Benchmarks
+
+Stellt auf einem (privaten) D-Bus die Objekte bereit, die der SMS-Monitor
+von ModemManager verwendet:
+
+- ``/org/freedesktop/ModemManager1`` mit ``org.freedesktop.DBus.ObjectManager``
+- ``/org/freedesktop/ModemManager1/Modem/<n>`` mit ``Modem`` und ``Modem.Messaging``
+- ``/org/freedesktop/ModemManager1/SMS/<n>`` mit ``Sms``
+
+Wie bei ModemManager erscheinen die SMS-Objekte nicht in
+``GetManagedObjects``; ihre Properties müssen einzeln gelesen werden. Mit
+``--receive-latency`` bleiben per Signal gemeldete SMS zunächst im Zustand
+RECEIVING (mehrteilige SMS) und wechseln erst nach der Wartezeit per
+``PropertiesChanged`` auf RECEIVED.
+
+Über das zusätzliche Interface ``sms_monitor.FakeModemManager`` lassen sich
+zur Laufzeit beliebig viele SMS einspielen (optional mit ``Added``-Signal)
+und die Anzahl versendeter SMS (``Create`` + ``Send``) abfragen.
+
+Verwendung:
+    dbus-daemon --session --print-address --nofork &
+    python3 fake_modemmanager.py --address unix:path=... --modems 2 --messages 10000
+"""
+
+import argparse
+import os
+import signal
+import sys
+from datetime import datetime, timedelta, timezone
+
+from gi.repository import Gio, GLib
+
+MM_DBUS_SERVICE = 'org.freedesktop.ModemManager1'
+MM_DBUS_PATH = '/org/freedesktop/ModemManager1'
+MM_DBUS_INTERFACE_MODEM = 'org.freedesktop.ModemManager1.Modem'
+MM_DBUS_INTERFACE_MESSAGING = 'org.freedesktop.ModemManager1.Modem.Messaging'
+MM_DBUS_INTERFACE_SMS = 'org.freedesktop.ModemManager1.Sms'
+OBJECT_MANAGER_INTERFACE = 'org.freedesktop.DBus.ObjectManager'
+CONTROL_INTERFACE = 'sms_monitor.FakeModemManager'
+
+MM_SMS_STATE_STORED = 1
+MM_SMS_STATE_RECEIVING = 2
+MM_SMS_STATE_RECEIVED = 3
+MM_SMS_STATE_SENDING = 4
+MM_SMS_STATE_SENT = 5
+MM_SMS_PDU_TYPE_DELIVER = 1
+MM_SMS_PDU_TYPE_SUBMIT = 2
+
+INTROSPECTION_XML = f"""
+<node>
+  <interface name="{OBJECT_MANAGER_INTERFACE}">
+    <method name="GetManagedObjects">
+      <arg name="objects" type="a{{oa{{sa{{sv}}}}}}" direction="out"/>
+    </method>
+    <signal name="InterfacesAdded">
+      <arg name="object_path" type="o"/>
+      <arg name="interfaces_and_properties" type="a{{sa{{sv}}}}"/>
+    </signal>
+    <signal name="InterfacesRemoved">
+      <arg name="object_path" type="o"/>
+      <arg name="interfaces" type="as"/>
+    </signal>
+  </interface>
+  <interface name="{CONTROL_INTERFACE}">
+    <method name="Inject">
+      <arg name="modem" type="o" direction="in"/>
+      <arg name="count" type="u" direction="in"/>
+      <arg name="emit_signal" type="b" direction="in"/>
+      <arg name="total" type="u" direction="out"/>
+    </method>
+    <method name="Count">
+      <arg name="total" type="u" direction="out"/>
+    </method>
+    <method name="Sent">
+      <arg name="sent" type="a(sss)" direction="out"/>
+    </method>
+  </interface>
+  <interface name="{MM_DBUS_INTERFACE_MODEM}">
+    <property name="EquipmentIdentifier" type="s" access="read"/>
+    <property name="Manufacturer" type="s" access="read"/>
+    <property name="Model" type="s" access="read"/>
+  </interface>
+  <interface name="{MM_DBUS_INTERFACE_MESSAGING}">
+    <method name="List">
+      <arg name="result" type="ao" direction="out"/>
+    </method>
+    <method name="Delete">
+      <arg name="path" type="o" direction="in"/>
+    </method>
+    <method name="Create">
+      <arg name="properties" type="a{{sv}}" direction="in"/>
+      <arg name="path" type="o" direction="out"/>
+    </method>
+    <signal name="Added">
+      <arg name="path" type="o"/>
+      <arg name="received" type="b"/>
+    </signal>
+    <signal name="Deleted">
+      <arg name="path" type="o"/>
+    </signal>
+    <property name="Messages" type="ao" access="read"/>
+  </interface>
+  <interface name="{MM_DBUS_INTERFACE_SMS}">
+    <method name="Send"/>
+    <property name="State" type="u" access="read"/>
+    <property name="PduType" type="u" access="read"/>
+    <property name="Number" type="s" access="read"/>
+    <property name="Text" type="s" access="read"/>
+    <property name="Timestamp" type="s" access="read"/>
+  </interface>
+</node>
+"""
+
+FILLER = "Lorem ipsum dolor sit amet, consetetur sadipscing elitr, sed diam nonumy. "
+
+
+class FakeModemManager:
+    """In-Memory-Nachbildung der benötigten ModemManager-Objekte"""
+
+    def __init__(self, connection: Gio.DBusConnection, modems: int = 1,
+                 delete_latency: int = 0, send_latency: int = 0, receive_latency: int = 0):
+        """
+        Args:
+            connection: Bus-Verbindung, auf der die Objekte exportiert werden
+            modems: Anzahl simulierter Modems
+            delete_latency: Antwortzeit von Delete() in ms (wie bei langsamen Modems)
+            send_latency: Antwortzeit von Send() in ms
+            receive_latency: Dauer von RECEIVING bis RECEIVED in ms (nur mit Signal)
+        """
+        self.connection = connection
+        self.delete_latency = delete_latency
+        self.send_latency = send_latency
+        self.receive_latency = receive_latency
+        self.outgoing = {}
+        self.sent = []
+        self.node = Gio.DBusNodeInfo.new_for_xml(INTROSPECTION_XML)
+        self.modems = {}
+        self.sms = {}
+        self._registrations = {}
+        self._next_sms = 0
+        self._base_time = datetime.now(timezone.utc).replace(microsecond=0)
+
+        self._register(MM_DBUS_PATH, OBJECT_MANAGER_INTERFACE)
+        self._register(MM_DBUS_PATH, CONTROL_INTERFACE)
+
+        for index in range(modems):
+            self.add_modem(index)
+
+    def _register(self, path: str, interface_name: str):
+        registration_id = self.connection.register_object(
+            path,
+            self.node.lookup_interface(interface_name),
+            self._on_method_call,
+            self._on_get_property,
+            None
+        )
+        self._registrations.setdefault(path, []).append(registration_id)
+
+    def _unregister(self, path: str):
+        for registration_id in self._registrations.pop(path, []):
+            self.connection.unregister_object(registration_id)
+
+    def add_modem(self, index: int) -> str:
+        """Modem mit leerem SMS-Speicher anlegen"""
+        path = f"{MM_DBUS_PATH}/Modem/{index}"
+        self.modems[path] = {
+            'EquipmentIdentifier': f"35{index:013d}",
+            'Manufacturer': 'sms-monitor',
+            'Model': 'Fake Modem',
+            'messages': {}
+        }
+        self._register(path, MM_DBUS_INTERFACE_MODEM)
+        self._register(path, MM_DBUS_INTERFACE_MESSAGING)
+        return path
+
+    def inject(self, modem_path: str, count: int, emit_signal: bool = False) -> int:
+        """
+        SMS im Speicher eines Modems ablegen
+
+        Absender und Timestamps sind eindeutig, damit keine SMS als
+        Duplikat gilt.
+
+        Returns:
+            Anzahl SMS im Speicher aller Modems
+        """
+        messages = self.modems[modem_path]['messages']
+
+        for _ in range(count):
+            number = self._next_sms
+            self._next_sms += 1
+
+            path = f"{MM_DBUS_PATH}/SMS/{number}"
+            timestamp = self._base_time - timedelta(seconds=number)
+            receiving = emit_signal and self.receive_latency > 0
+            self.sms[path] = {
+                'State': GLib.Variant(
+                    'u', MM_SMS_STATE_RECEIVING if receiving else MM_SMS_STATE_RECEIVED
+                ),
+                'PduType': GLib.Variant('u', MM_SMS_PDU_TYPE_DELIVER),
+                'Number': GLib.Variant('s', f"+49170{number % 100000:07d}"),
+                'Text': GLib.Variant('s', f"Nachricht {number}: " + FILLER * (1 + number % 3)),
+                'Timestamp': GLib.Variant('s', timestamp.isoformat())
+            }
+            messages[path] = True
+            self._register(path, MM_DBUS_INTERFACE_SMS)
+
+            if emit_signal:
+                self._emit(modem_path, MM_DBUS_INTERFACE_MESSAGING, 'Added',
+                           GLib.Variant('(ob)', (path, True)))
+            if receiving:
+                GLib.timeout_add(self.receive_latency, self._received, path)
+
+        return len(self.sms)
+
+    def _received(self, sms_path: str) -> bool:
+        """Letzter Teil einer mehrteiligen SMS ist eingetroffen"""
+        props = self.sms.get(sms_path)
+        if props is not None:
+            props['State'] = GLib.Variant('u', MM_SMS_STATE_RECEIVED)
+            self._emit(sms_path, 'org.freedesktop.DBus.Properties', 'PropertiesChanged',
+                       GLib.Variant('(sa{sv}as)', (
+                           MM_DBUS_INTERFACE_SMS, {'State': props['State']}, []
+                       )))
+        return False
+
+    def create(self, modem_path: str, properties: dict) -> str:
+        """Ausgehende SMS im Speicher eines Modems anlegen"""
+        number = self._next_sms
+        self._next_sms += 1
+
+        path = f"{MM_DBUS_PATH}/SMS/{number}"
+        self.sms[path] = {
+            'State': GLib.Variant('u', MM_SMS_STATE_STORED),
+            'PduType': GLib.Variant('u', MM_SMS_PDU_TYPE_SUBMIT),
+            'Number': GLib.Variant('s', properties['number']),
+            'Text': GLib.Variant('s', properties.get('text', '')),
+            'Timestamp': GLib.Variant('s', '')
+        }
+        self.outgoing[path] = modem_path
+        self.modems[modem_path]['messages'][path] = True
+        self._register(path, MM_DBUS_INTERFACE_SMS)
+        self._emit(modem_path, MM_DBUS_INTERFACE_MESSAGING, 'Added',
+                   GLib.Variant('(ob)', (path, False)))
+        return path
+
+    def send(self, sms_path: str):
+        """Ausgehende SMS als versendet markieren"""
+        props = self.sms[sms_path]
+        props['State'] = GLib.Variant('u', MM_SMS_STATE_SENT)
+        self.sent.append((
+            self.modems[self.outgoing[sms_path]]['EquipmentIdentifier'],
+            props['Number'].unpack(),
+            props['Text'].unpack()
+        ))
+
+    def delete(self, modem_path: str, sms_path: str):
+        """SMS aus dem Speicher eines Modems löschen"""
+        messages = self.modems[modem_path]['messages']
+        if sms_path not in messages:
+            raise KeyError(sms_path)
+
+        del messages[sms_path]
+        del self.sms[sms_path]
+        self.outgoing.pop(sms_path, None)
+        self._unregister(sms_path)
+
+        self._emit(modem_path, MM_DBUS_INTERFACE_MESSAGING, 'Deleted',
+                   GLib.Variant('(o)', (sms_path,)))
+
+    def _emit(self, path: str, interface_name: str, signal_name: str, parameters):
+        self.connection.emit_signal(None, path, interface_name, signal_name, parameters)
+
+    def _interfaces(self, path: str) -> dict:
+        return {
+            MM_DBUS_INTERFACE_MODEM: {
+                name: self._modem_property(path, name)
+                for name in ('EquipmentIdentifier', 'Manufacturer', 'Model')
+            },
+            MM_DBUS_INTERFACE_MESSAGING: {
+                'Messages': self._modem_property(path, 'Messages')
+            }
+        }
+
+    def _modem_property(self, path: str, name: str) -> GLib.Variant:
+        modem = self.modems[path]
+        if name == 'Messages':
+            return GLib.Variant('ao', list(modem['messages']))
+        return GLib.Variant('s', modem[name])
+
+    def get_managed_objects(self) -> GLib.Variant:
+        # Wie ModemManager: nur Modems, keine SMS-Objekte
+        objects = {path: self._interfaces(path) for path in self.modems}
+        return GLib.Variant('(a{oa{sa{sv}}})', (objects,))
+
+    def _on_method_call(self, connection, sender, object_path, interface_name,
+                        method_name, parameters, invocation):
+        try:
+            if method_name == 'GetManagedObjects':
+                invocation.return_value(self.get_managed_objects())
+
+            elif method_name == 'List':
+                messages = list(self.modems[object_path]['messages'])
+                invocation.return_value(GLib.Variant('(ao)', (messages,)))
+
+            elif method_name == 'Delete':
+                if self.delete_latency:
+                    GLib.timeout_add(
+                        self.delete_latency, self._delete_delayed,
+                        object_path, parameters.unpack()[0], invocation
+                    )
+                    return
+                self.delete(object_path, parameters.unpack()[0])
+                invocation.return_value(None)
+
+            elif method_name == 'Create':
+                path = self.create(object_path, parameters.unpack()[0])
+                invocation.return_value(GLib.Variant('(o)', (path,)))
+
+            elif method_name == 'Send':
+                if self.send_latency:
+                    # Wie ModemManager: während des Versands SENDING
+                    self.sms[object_path]['State'] = GLib.Variant('u', MM_SMS_STATE_SENDING)
+                    GLib.timeout_add(
+                        self.send_latency, self._send_delayed, object_path, invocation
+                    )
+                    return
+                self.send(object_path)
+                invocation.return_value(None)
+
+            elif method_name == 'Sent':
+                invocation.return_value(GLib.Variant('(a(sss))', (self.sent,)))
+
+            elif method_name == 'Inject':
+                modem_path, count, emit_signal = parameters.unpack()
+                total = self.inject(modem_path, count, emit_signal)
+                invocation.return_value(GLib.Variant('(u)', (total,)))
+
+            elif method_name == 'Count':
+                invocation.return_value(GLib.Variant('(u)', (len(self.sms),)))
+
+            else:
+                invocation.return_dbus_error(
+                    'org.freedesktop.DBus.Error.UnknownMethod', method_name
+                )
+
+        except KeyError as e:
+            invocation.return_dbus_error(
+                'org.freedesktop.ModemManager1.Error.Core.NotFound', f"Unbekannt: {e}"
+            )
+
+    def _delete_delayed(self, modem_path: str, sms_path: str, invocation) -> bool:
+        try:
+            self.delete(modem_path, sms_path)
+            invocation.return_value(None)
+        except KeyError as e:
+            invocation.return_dbus_error(
+                'org.freedesktop.ModemManager1.Error.Core.NotFound', f"Unbekannt: {e}"
+            )
+        return False
+
+    def _send_delayed(self, sms_path: str, invocation) -> bool:
+        try:
+            self.send(sms_path)
+            invocation.return_value(None)
+        except KeyError as e:
+            invocation.return_dbus_error(
+                'org.freedesktop.ModemManager1.Error.Core.NotFound', f"Unbekannt: {e}"
+            )
+        return False
+
+    def _on_get_property(self, connection, sender, object_path, interface_name,
+                         property_name):
+        if interface_name == MM_DBUS_INTERFACE_SMS:
+            return self.sms[object_path][property_name]
+        return self._modem_property(object_path, property_name)
+
+
+def request_name(connection: Gio.DBusConnection, name: str):
+    """Bus-Namen synchron übernehmen"""
+    result = connection.call_sync(
+        'org.freedesktop.DBus',
+        '/org/freedesktop/DBus',
+        'org.freedesktop.DBus',
+        'RequestName',
+        GLib.Variant('(su)', (name, 4)),  # DBUS_NAME_FLAG_DO_NOT_QUEUE
+        GLib.VariantType.new('(u)'),
+        Gio.DBusCallFlags.NONE,
+        -1,
+        None
+    )
+    if result.unpack()[0] != 1:  # DBUS_REQUEST_NAME_REPLY_PRIMARY_OWNER
+        raise RuntimeError(f"Bus-Name {name} bereits belegt")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Fake ModemManager auf einem privaten D-Bus')
+    parser.add_argument(
+        '--address',
+        default=os.environ.get('DBUS_SESSION_BUS_ADDRESS'),
+        help='Bus-Adresse (Standard: $DBUS_SESSION_BUS_ADDRESS)'
+    )
+    parser.add_argument('--modems', type=int, default=1, help='Anzahl Modems')
+    parser.add_argument(
+        '--messages', type=int, default=0,
+        help='SMS im Speicher beim Start (auf die Modems verteilt)'
+    )
+    parser.add_argument(
+        '--delete-latency', type=int, default=0,
+        help='Antwortzeit von Delete() in ms'
+    )
+    parser.add_argument(
+        '--send-latency', type=int, default=0,
+        help='Antwortzeit von Send() in ms'
+    )
+    parser.add_argument(
+        '--receive-latency', type=int, default=0,
+        help='Dauer von RECEIVING bis RECEIVED in ms für per Signal gemeldete SMS'
+    )
+    args = parser.parse_args()
+
+    if not args.address:
+        parser.error('Keine Bus-Adresse angegeben (--address)')
+
+    connection = Gio.DBusConnection.new_for_address_sync(
+        args.address,
+        Gio.DBusConnectionFlags.AUTHENTICATION_CLIENT |
+        Gio.DBusConnectionFlags.MESSAGE_BUS_CONNECTION,
+        None,
+        None
+    )
+
+    manager = FakeModemManager(
+        connection, args.modems, args.delete_latency, args.send_latency,
+        args.receive_latency
+    )
+    modem_paths = list(manager.modems)
+    for i, modem_path in enumerate(modem_paths):
+        share = args.messages // len(modem_paths)
+        if i < args.messages % len(modem_paths):
+            share += 1
+        manager.inject(modem_path, share)
+
+    request_name(connection, MM_DBUS_SERVICE)
+
+    loop = GLib.MainLoop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        GLib.unix_signal_add(GLib.PRIORITY_DEFAULT, signum, loop.quit)
+
+    # Bereitschaft für aufrufende Prozesse signalisieren
+    print('ready', flush=True)
+    loop.run()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
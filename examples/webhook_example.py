@@ -13,8 +13,14 @@ Verwendung:
 
 In der Konfiguration (/etc/sms-monitor/config.json) hinzufügen:
     "webhooks": ["http://localhost:5000/webhook/sms"]
+
+Im Batch-Modus ("batch_size" > 1, optional "gzip": true) enthält ein Aufruf
+ein JSON-Array mehrerer SMS.
 """
 
+import gzip
+import json
+
 from flask import Flask, request, jsonify
 from datetime import datetime
 
@@ -25,17 +31,22 @@ app = Flask(__name__)
 def receive_sms():
     """SMS-Webhook-Endpunkt"""
     try:
-        data = request.get_json()
-
-        print("\n" + "=" * 60)
-        print(f"SMS EMPFANGEN: {datetime.now()}")
-        print("=" * 60)
-        print(f"Von:        {data.get('from')}")
-        print(f"Zeit:       {data.get('timestamp')}")
-        print(f"Empfangen:  {data.get('received_at')}")
-        print(f"Nachricht:  {data.get('text')}")
-        print("=" * 60)
-        print()
+        body = request.get_data()
+        if request.headers.get('Content-Encoding') == 'gzip':
+            body = gzip.decompress(body)
+        data = json.loads(body)
+
+        # Batch-Modus: Liste von SMS
+        for sms in data if isinstance(data, list) else [data]:
+            print("\n" + "=" * 60)
+            print(f"SMS EMPFANGEN: {datetime.now()}")
+            print("=" * 60)
+            print(f"Von:        {sms.get('from')}")
+            print(f"Zeit:       {sms.get('timestamp')}")
+            print(f"Empfangen:  {sms.get('received_at')}")
+            print(f"Nachricht:  {sms.get('text')}")
+            print("=" * 60)
+            print()
 
         # Hier können weitere Aktionen durchgeführt werden:
         # - SMS in Datenbank speichern
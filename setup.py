@@ -31,6 +31,7 @@ setup(
 
     extras_require={
         'webhooks': ['requests>=2.25.0'],
+        'parquet': ['pyarrow>=7.0'],
         'dev': [
             'pytest>=6.0',
             'pytest-cov>=2.10',
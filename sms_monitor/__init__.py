@@ -12,7 +12,15 @@ Ein einfaches Python-Tool zum Empfangen und Verwalten von SMS
 __version__ = "1.0.0"
 __author__ = "deCASHme"
 
-from .monitor import SMSMonitor
 from .config import Config
 
 __all__ = ["SMSMonitor", "Config"]
+
+
+def __getattr__(name):
+    # Monitor (D-Bus, Webhooks, ...) erst bei Bedarf laden, damit die CLI
+    # für Offline-Befehle schnell startet
+    if name == 'SMSMonitor':
+        from .monitor import SMSMonitor
+        return SMSMonitor
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
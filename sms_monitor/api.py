@@ -0,0 +1,385 @@
+"""
+Lokale Streaming-API für SMS-Konsumenten
+
+Statt Webhooks zu empfangen, können lokale Dienste neue SMS beim Daemon
+abholen:
+
+- ``GET /events``: Server-Sent Events (``text/event-stream``)
+- ``GET /messages``: Long-Poll, liefert JSON sobald neue SMS vorliegen
+- ``POST /send``: SMS zum Versand einreihen (nur mit ``api_send``)
+- ``GET /send/<id>``: Status eines Versandauftrags
+
+Jede SMS erhält eine fortlaufende ID. Konsumenten setzen nach einem
+Verbindungsabbruch mit ``Last-Event-ID`` bzw. ``?cursor=<id>`` fort. Der
+Daemon schreibt jede SMS genau einmal in einen Ringpuffer (``MessageFeed``);
+alle Verbindungen lesen nur daraus, die Anzahl der Konsumenten hat also
+keinen Einfluss auf den Ingest. Der Puffer wird als JSON-Lines-Datei
+gesichert, damit Cursor auch einen Neustart des Daemons überstehen.
+"""
+
+import itertools
+import json
+import logging
+import os
+import threading
+from collections import deque
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from .httpserver import LocalHTTPServer, LocalRequestHandler
+
+logger = logging.getLogger(__name__)
+
+# Kommentarzeile an SSE-Clients, falls keine SMS eintrifft (Sekunden)
+SSE_KEEPALIVE = 15
+
+LONG_POLL_TIMEOUT = 30
+LONG_POLL_MAX_TIMEOUT = 300
+LONG_POLL_LIMIT = 100
+
+# Maximale Größe eines Versandauftrags in Bytes
+SEND_MAX_BODY = 64 * 1024
+
+
+class MessageFeed:
+    """
+    Ringpuffer der zuletzt gespeicherten SMS mit fortlaufenden IDs
+
+    ``publish()`` wird vom Ingest aufgerufen, ``read()`` liefert die
+    Einträge nach einem Cursor. Mit Feed-Datei sind neue Einträge erst nach
+    ``commit()`` (fsync) sichtbar: Clients setzen mit der ID wieder auf,
+    nach einem Absturz darf sie also nicht erneut vergeben werden.
+    """
+
+    def __init__(self, path: str = None, capacity: int = 10000):
+        """
+        Args:
+            path: JSON-Lines-Datei für die Sicherung (None: nur im Speicher)
+            capacity: Maximale Anzahl gepufferter SMS
+        """
+        self.path = Path(path) if path else None
+        self.capacity = max(capacity, 1)
+        self.closed = False
+        self._events = deque(maxlen=self.capacity)
+        self._last_id = 0  # Neueste sichtbare ID
+        self._assigned = 0  # Zuletzt vergebene ID
+        self._pending = []  # Vergeben, aber noch nicht in der Feed-Datei
+        self._lines = 0
+        self._cond = threading.Condition()
+        self._file = None
+
+        if self.path is not None:
+            truncated = self._load()
+            self._assigned = self._last_id
+            self._file = open(self.path, 'a', encoding='utf-8')
+            if truncated:
+                # Abgeschnittene Zeile abschließen, damit neue Einträge lesbar bleiben
+                self._file.write('\n')
+
+    def _load(self) -> bool:
+        """
+        Gesicherte Einträge einlesen
+
+        Returns:
+            True wenn die letzte Zeile abgeschnitten ist
+        """
+        if not self.path.exists():
+            return False
+
+        line = '\n'
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    event = json.loads(line)
+                    event_id = int(event['id'])
+                except (ValueError, KeyError, TypeError):
+                    logger.warning(f"Ungültige Zeile in {self.path} übersprungen")
+                    continue
+                if event_id <= self._last_id:
+                    continue
+                self._events.append(event)
+                self._last_id = event_id
+                self._lines += 1
+
+        return not line.endswith('\n')
+
+    @property
+    def last_id(self) -> int:
+        """ID der neuesten SMS (0 wenn noch keine)"""
+        return self._last_id
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    def publish(self, payload: Dict) -> int:
+        """
+        SMS anhängen und wartende Verbindungen wecken (mit Feed-Datei erst
+        beim nächsten commit())
+
+        Args:
+            payload: SMS-Daten (wie bei Webhooks)
+
+        Returns:
+            ID der SMS
+        """
+        with self._cond:
+            self._assigned += 1
+            event = dict(payload, id=self._assigned)
+            if self._file is not None:
+                self._pending.append(event)
+                return self._assigned
+
+            self._events.append(event)
+            self._last_id = self._assigned
+            self._cond.notify_all()
+            return self._assigned
+
+    def read(self, after: int, limit: int = None) -> Tuple[List[Dict], int]:
+        """
+        SMS nach einem Cursor (ohne zu warten)
+
+        Args:
+            after: ID der zuletzt erhaltenen SMS
+            limit: Maximale Anzahl
+
+        Returns:
+            (SMS, Anzahl verpasster SMS). Verpasst sind SMS, die bereits aus
+            dem Puffer verdrängt wurden. Ein Cursor jenseits der neuesten ID
+            (z.B. nach Löschen der Feed-Datei) beginnt beim ältesten Eintrag
+            und zählt als mindestens eine verpasste SMS.
+        """
+        with self._cond:
+            first_id = self._events[0]['id'] if self._events else self._last_id + 1
+            missed = 0
+            if after > self._last_id:
+                after = first_id - 1
+                missed = 1
+            elif after < first_id - 1:
+                missed = first_id - 1 - after
+                after = first_id - 1
+
+            start = after - first_id + 1
+            stop = start + limit if limit is not None else None
+            return list(itertools.islice(self._events, start, stop)), missed
+
+    def wait(self, after: int, timeout: float) -> bool:
+        """
+        Warten bis eine SMS nach dem Cursor vorliegt
+
+        Returns:
+            True wenn neue SMS vorliegen
+        """
+        with self._cond:
+            return self._cond.wait_for(
+                lambda: self._last_id > after or self.closed, timeout
+            ) and not self.closed
+
+    def commit(self):
+        """Neue Einträge in die Feed-Datei schreiben (fsync) und freigeben"""
+        with self._cond:
+            if not self._pending:
+                return
+            self._file.write(''.join(
+                json.dumps(event, ensure_ascii=False) + '\n' for event in self._pending
+            ))
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+            self._events.extend(self._pending)
+            self._last_id = self._pending[-1]['id']
+            self._lines += len(self._pending)
+            self._pending = []
+            self._cond.notify_all()
+
+            if self._lines > 2 * self.capacity:
+                self.compact()
+
+    def compact(self):
+        """Feed-Datei auf den aktuellen Puffer kürzen (atomar per rename)"""
+        with self._cond:
+            tmp_path = self.path.with_name(self.path.name + '.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                for event in self._events:
+                    f.write(json.dumps(event, ensure_ascii=False) + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+
+            self._file.close()
+            os.replace(tmp_path, self.path)
+            self._file = open(self.path, 'a', encoding='utf-8')
+            self._lines = len(self._events)
+            logger.debug(f"Feed-Datei kompaktiert: {self._lines} Einträge")
+
+    def close(self):
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+            if self._file is not None:
+                self.commit()
+                self._file.close()
+                self._file = None
+
+
+def _parse_cursor(value: Optional[str]) -> Optional[int]:
+    if value is None or value == '':
+        return None
+    cursor = int(value)
+    if cursor < 0:
+        raise ValueError(value)
+    return cursor
+
+
+class _APIHandler(LocalRequestHandler):
+    feed = None
+    sender = None
+    log_name = 'API'
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        params = {name: values[-1] for name, values in parse_qs(url.query).items()}
+
+        try:
+            if url.path == '/events':
+                self._serve_events(params)
+            elif url.path == '/messages':
+                self._serve_messages(params)
+            elif url.path.startswith('/send/') and self.sender is not None:
+                self._serve_send_status(url.path[len('/send/'):])
+            else:
+                self.send_error(404)
+        except ValueError as e:
+            self.send_error(400, f"Ungültiger Parameter: {e}")
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def do_POST(self):
+        url = urlsplit(self.path)
+        if url.path != '/send' or self.sender is None:
+            self.send_error(404)
+            return
+
+        try:
+            length = int(self.headers.get('Content-Length') or 0)
+            if length > SEND_MAX_BODY:
+                self.send_error(413)
+                return
+            request = json.loads(self.rfile.read(length) or b'null')
+            if not isinstance(request, dict):
+                raise ValueError("JSON-Objekt erwartet")
+
+            number, text, modem = request.get('to'), request.get('text'), request.get('modem')
+            if not isinstance(number, str) or not number.strip():
+                raise ValueError("to fehlt")
+            if not isinstance(text, str) or not text:
+                raise ValueError("text fehlt")
+            if modem is not None and not isinstance(modem, str):
+                raise ValueError("modem muss ein Text sein")
+        except ValueError as e:
+            self.send_error(400, f"Ungültiger Auftrag: {e}")
+            return
+
+        try:
+            job_id = self.sender.submit(number.strip(), text, modem)
+        except OSError as e:
+            logger.error(f"Versandauftrag nicht gespeichert: {e}")
+            self.send_error(503)
+            return
+
+        self._send_json({'id': job_id, 'status': 'pending'}, status=202)
+
+    def _serve_send_status(self, job_id: str):
+        status = self.sender.status(job_id)
+        if status is None:
+            self.send_error(404, "Unbekannter Versandauftrag")
+            return
+        self._send_json(status)
+
+    def _serve_messages(self, params: Dict):
+        """Long-Poll: antwortet sofort bei vorhandenen SMS, sonst nach Eintreffen"""
+        cursor = _parse_cursor(params.get('cursor'))
+        timeout = min(float(params.get('timeout', LONG_POLL_TIMEOUT)), LONG_POLL_MAX_TIMEOUT)
+        limit = max(int(params.get('limit', LONG_POLL_LIMIT)), 1)
+
+        if cursor is None:
+            cursor = self.feed.last_id
+
+        events, missed = self.feed.read(cursor, limit)
+        if not events and not missed and self.feed.wait(cursor, timeout):
+            events, missed = self.feed.read(cursor, limit)
+
+        if events:
+            cursor = events[-1]['id']
+        elif missed:
+            cursor = self.feed.last_id
+
+        body = {'cursor': cursor, 'messages': events}
+        if missed:
+            body['missed'] = missed
+        self._send_json(body)
+
+    def _serve_events(self, params: Dict):
+        """Server-Sent Events: erst verpasste SMS, dann live"""
+        cursor = _parse_cursor(
+            self.headers.get('Last-Event-ID') or params.get('cursor')
+        )
+        if cursor is None:
+            cursor = self.feed.last_id
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream; charset=utf-8')
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('X-Accel-Buffering', 'no')
+        self.end_headers()
+        self.wfile.write(b'retry: 1000\n\n')
+        self.wfile.flush()
+
+        while not self.feed.closed:
+            events, missed = self.feed.read(cursor, LONG_POLL_LIMIT)
+            if missed:
+                self.wfile.write(f'event: missed\ndata: {missed}\n\n'.encode('utf-8'))
+
+            for event in events:
+                data = json.dumps(event, ensure_ascii=False)
+                self.wfile.write(f'id: {event["id"]}\nevent: sms\ndata: {data}\n\n'.encode('utf-8'))
+                cursor = event['id']
+            if missed and not events:
+                cursor = self.feed.last_id
+            self.wfile.flush()
+
+            if events:
+                continue
+            if not self.feed.wait(cursor, SSE_KEEPALIVE) and not self.feed.closed:
+                self.wfile.write(b': keepalive\n\n')
+                self.wfile.flush()
+
+    def _send_json(self, data: Dict, status: int = 200):
+        body = json.dumps(data, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Cache-Control', 'no-cache')
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class APIServer(LocalHTTPServer):
+    """Lokaler HTTP-Server für /events, /messages und /send"""
+
+    name = 'api'
+
+    def __init__(self, listen: str, feed: MessageFeed, sender=None):
+        """
+        Args:
+            listen: ``host:port`` oder ``unix:/pfad/zum/socket``
+            feed: Auszuliefernde SMS
+            sender: SMSSender für ``/send`` (None: Versand nicht freigegeben)
+        """
+        self.feed = feed
+        self.sender = sender
+        handler = type('APIHandler', (_APIHandler,), {'feed': feed, 'sender': sender})
+        super().__init__(listen, handler)
+
+    def start(self):
+        super().start()
+        logger.info(f"SMS-API verfügbar unter {self.listen}")
@@ -0,0 +1,404 @@
+"""
+Ablage empfangener SMS
+
+Zwei Backends:
+
+- ``files``: eine Textdatei pro SMS im ``sms_dir`` (bisheriges Format)
+- ``sqlite``: indizierte SQLite-Datenbank; Abfragen nach Absender, Zeitraum
+  und Modem laufen über Indizes und werden gestreamt
+
+Das Textformat bleibt beim SQLite-Backend als kompatibler Export
+(``export_txt``) verfügbar.
+"""
+
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, Optional
+
+from .utils import fsync_paths, write_text_atomic
+
+TIME_FORMAT = '%Y%m%d_%H%M%S'
+
+
+def parse_timestamp(value: str) -> Optional[datetime]:
+    """
+    ISO 8601 Timestamp (auch mit ``Z``) parsen
+
+    Returns:
+        datetime oder None wenn nicht parsebar
+    """
+    try:
+        return datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except (AttributeError, ValueError):
+        return None
+
+
+def to_epoch(value: str) -> Optional[int]:
+    """ISO 8601 Timestamp in Unix-Zeit umrechnen (naive Zeiten = lokal)"""
+    dt = parse_timestamp(value)
+    return int(dt.timestamp()) if dt else None
+
+
+def format_sms_text(sms_data: Dict) -> str:
+    """
+    SMS im Textformat der gespeicherten Dateien darstellen
+
+    Args:
+        sms_data: SMS-Daten (number, timestamp, state, text, optional modem)
+
+    Returns:
+        Dateiinhalt
+    """
+    lines = [
+        f"Von: {sms_data['number']}",
+        f"Zeit: {sms_data['timestamp']}",
+        f"Status: {sms_data['state']}",
+    ]
+    if sms_data.get('modem'):
+        lines.append(f"Modem: {sms_data['modem']}")
+    lines.append("")
+    lines.append("Nachricht:")
+    lines.append(sms_data['text'])
+    return '\n'.join(lines) + '\n'
+
+
+def sms_filename(sms_data: Dict) -> str:
+    """Dateiname ``<YYYYmmdd_HHMMSS>_<nummer>.txt`` für eine SMS"""
+    dt = parse_timestamp(sms_data['timestamp'])
+    # Fallback: Aktueller Timestamp
+    time_part = (dt or datetime.now()).strftime(TIME_FORMAT)
+
+    # Telefonnummer sanitieren
+    number = sms_data['number'].replace('+', '').replace(' ', '')
+
+    return f"{time_part}_{number}.txt"
+
+
+class MessageStore:
+    """Basisklasse für die SMS-Ablage"""
+
+    def save(self, sms_data: Dict) -> str:
+        """
+        SMS ablegen
+
+        Args:
+            sms_data: SMS-Daten
+
+        Returns:
+            Speicherort (Dateipfad bzw. Datenbank-Referenz)
+        """
+        raise NotImplementedError
+
+    def query(self, sender: str = None, since: datetime = None,
+              until: datetime = None, modem: str = None,
+              limit: int = None, offset: int = 0) -> Iterator[Dict]:
+        """
+        Gespeicherte SMS chronologisch abfragen (gestreamt)
+
+        Args:
+            sender: Nur SMS dieses Absenders
+            since: Nur SMS ab diesem Zeitpunkt
+            until: Nur SMS vor diesem Zeitpunkt
+            modem: Nur SMS dieses Modems
+            limit: Maximale Anzahl
+            offset: Anzahl zu überspringender Treffer
+
+        Yields:
+            SMS-Daten inkl. ``ref`` (Speicherort)
+        """
+        raise NotImplementedError
+
+    def count(self, **filters) -> int:
+        """Anzahl gespeicherter SMS (mit denselben Filtern wie query)"""
+        return sum(1 for _ in self.query(**filters))
+
+    def contains(self, sms_data: Dict) -> bool:
+        """True wenn die SMS vollständig abgelegt ist (für die Journal-Wiederherstellung)"""
+        raise NotImplementedError
+
+    def commit(self):
+        """Gepufferte Schreibvorgänge abschließen"""
+
+    def sync(self):
+        """Abgeschlossene Schreibvorgänge auf den Datenträger schreiben"""
+        self.commit()
+
+    def close(self):
+        self.commit()
+
+
+class TextFileStore(MessageStore):
+    """Eine Textdatei pro SMS (bisheriges Format)"""
+
+    def __init__(self, sms_dir: str):
+        self.sms_dir = Path(sms_dir)
+        self._unsynced = []
+        self._lock = threading.Lock()
+
+    def save(self, sms_data: Dict) -> str:
+        # Über temporäre Datei + rename, damit nie eine halbe Datei entsteht;
+        # fsync erfolgt gesammelt in sync()
+        filepath = self.sms_dir / sms_filename(sms_data)
+        write_text_atomic(filepath, format_sms_text(sms_data), fsync=False)
+        with self._lock:
+            self._unsynced.append(filepath)
+        return str(filepath)
+
+    def contains(self, sms_data: Dict) -> bool:
+        filepath = self.sms_dir / sms_filename(sms_data)
+        try:
+            return filepath.read_text(encoding='utf-8') == format_sms_text(sms_data)
+        except OSError:
+            return False
+
+    def sync(self):
+        with self._lock:
+            paths, self._unsynced = self._unsynced, []
+        fsync_paths(paths)
+
+    @staticmethod
+    def read_file(filepath: Path) -> Dict:
+        """Gespeicherte Textdatei wieder einlesen"""
+        header, _, text = filepath.read_text(encoding='utf-8').partition('\nNachricht:\n')
+        fields = {}
+        for line in header.splitlines():
+            name, sep, value = line.partition(': ')
+            if sep:
+                fields[name] = value
+
+        return {
+            'ref': str(filepath),
+            'number': fields.get('Von', ''),
+            'timestamp': fields.get('Zeit', ''),
+            'state': fields.get('Status', ''),
+            'modem': fields.get('Modem', ''),
+            'text': text[:-1] if text.endswith('\n') else text
+        }
+
+    def matching_files(self, sender=None, since=None, until=None) -> Iterator[Path]:
+        """Dateien chronologisch, nur über den Dateinamen gefiltert"""
+        if not self.sms_dir.exists():
+            return
+
+        since_part = since.strftime(TIME_FORMAT) if since else None
+        until_part = until.strftime(TIME_FORMAT) if until else None
+        sender_part = sender.replace('+', '').replace(' ', '') if sender else None
+
+        for filepath in sorted(self.sms_dir.glob('*.txt')):
+            time_part, _, number_part = filepath.stem.rpartition('_')
+            if since_part and time_part < since_part:
+                continue
+            if until_part and time_part >= until_part:
+                continue
+            if sender_part and number_part != sender_part:
+                continue
+            yield filepath
+
+    def query(self, sender=None, since=None, until=None, modem=None,
+              limit=None, offset=0):
+        skipped = 0
+        returned = 0
+        for filepath in self.matching_files(sender, since, until):
+            sms_data = self.read_file(filepath)
+            if modem and sms_data['modem'] != modem:
+                continue
+
+            if skipped < offset:
+                skipped += 1
+                continue
+
+            yield sms_data
+
+            returned += 1
+            if limit is not None and returned >= limit:
+                return
+
+    def count(self, sender=None, since=None, until=None, modem=None, **_):
+        if modem:
+            return super().count(sender=sender, since=since, until=until, modem=modem)
+        return sum(1 for _ in self.matching_files(sender, since, until))
+
+
+class SQLiteMessageStore(MessageStore):
+    """SMS-Ablage in SQLite mit Indizes auf Absender, Zeit und Modem"""
+
+    def __init__(self, path: str, export_dir: str = None):
+        """
+        Args:
+            path: Pfad zur SQLite-Datenbank
+            export_dir: Zusätzlich Textdateien in dieses Verzeichnis schreiben
+        """
+        self.path = Path(path)
+        self.export = TextFileStore(export_dir) if export_dir else None
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(
+            "CREATE TABLE IF NOT EXISTS messages ("
+            " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+            " sender TEXT NOT NULL,"
+            " timestamp TEXT,"
+            " ts INTEGER,"
+            " state INTEGER,"
+            " modem TEXT,"
+            " text TEXT,"
+            " saved_at TEXT"
+            ");"
+            "CREATE INDEX IF NOT EXISTS idx_messages_ts ON messages (ts);"
+            "CREATE INDEX IF NOT EXISTS idx_messages_sender ON messages (sender, ts);"
+            "CREATE INDEX IF NOT EXISTS idx_messages_modem ON messages (modem, ts);"
+        )
+        self._conn.commit()
+
+    def save(self, sms_data: Dict) -> str:
+        now = datetime.now()
+        ts = to_epoch(sms_data['timestamp'])
+
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT INTO messages (sender, timestamp, ts, state, modem, text, saved_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    sms_data['number'],
+                    sms_data['timestamp'],
+                    ts if ts is not None else int(now.timestamp()),
+                    sms_data['state'],
+                    sms_data.get('modem'),
+                    sms_data['text'],
+                    now.isoformat()
+                )
+            )
+            ref = f"{self.path}#{cursor.lastrowid}"
+
+        if self.export:
+            self.export.save(sms_data)
+
+        return ref
+
+    def _where(self, sender, since, until, modem):
+        clauses = []
+        params = []
+        if sender:
+            clauses.append("sender = ?")
+            params.append(sender)
+        if modem:
+            clauses.append("modem = ?")
+            params.append(modem)
+        if since:
+            clauses.append("ts >= ?")
+            params.append(int(since.timestamp()))
+        if until:
+            clauses.append("ts < ?")
+            params.append(int(until.timestamp()))
+
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        return where, params
+
+    def query(self, sender=None, since=None, until=None, modem=None,
+              limit=None, offset=0):
+        where, params = self._where(sender, since, until, modem)
+        sql = f"SELECT * FROM messages{where} ORDER BY ts, id"
+        if limit is not None or offset:
+            sql += " LIMIT ? OFFSET ?"
+            params += [limit if limit is not None else -1, offset]
+
+        # Eigene Verbindung, damit lange Abfragen den Ingest nicht blockieren
+        conn = sqlite3.connect(str(self.path))
+        conn.row_factory = sqlite3.Row
+        try:
+            for row in conn.execute(sql, params):
+                yield self._row_to_sms(row)
+        finally:
+            conn.close()
+
+    def query_after_id(self, last_id: int = 0, sender=None, since=None,
+                       until=None, modem=None) -> Iterator[Dict]:
+        """
+        SMS mit größerer ID als last_id in Einfügereihenfolge (gestreamt)
+
+        Für inkrementelle Verarbeitung (Suchindex, Export); Filter wie bei
+        query().
+        """
+        where, params = self._where(sender, since, until, modem)
+        where = f"{where} AND id > ?" if where else " WHERE id > ?"
+
+        conn = sqlite3.connect(str(self.path))
+        conn.row_factory = sqlite3.Row
+        try:
+            for row in conn.execute(
+                f"SELECT * FROM messages{where} ORDER BY id", params + [last_id]
+            ):
+                yield self._row_to_sms(row)
+        finally:
+            conn.close()
+
+    def count(self, sender=None, since=None, until=None, modem=None, **_):
+        where, params = self._where(sender, since, until, modem)
+        with self._lock:
+            return self._conn.execute(
+                f"SELECT COUNT(*) FROM messages{where}", params
+            ).fetchone()[0]
+
+    def _row_to_sms(self, row) -> Dict:
+        return {
+            'ref': f"{self.path}#{row['id']}",
+            'id': row['id'],
+            'number': row['sender'],
+            'timestamp': row['timestamp'],
+            'state': row['state'],
+            'modem': row['modem'] or '',
+            'text': row['text'],
+            'saved_at': row['saved_at']
+        }
+
+    def contains(self, sms_data: Dict) -> bool:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM messages WHERE sender = ? AND timestamp = ? AND text = ? LIMIT 1",
+                (sms_data['number'], sms_data['timestamp'], sms_data['text'])
+            ).fetchone()
+        return row is not None
+
+    def commit(self):
+        with self._lock:
+            self._conn.commit()
+
+    def sync(self):
+        # synchronous=NORMAL schreibt das WAL erst beim Checkpoint auf den
+        # Datenträger
+        with self._lock:
+            self._conn.commit()
+            self._conn.execute("PRAGMA wal_checkpoint(FULL)")
+        if self.export:
+            self.export.sync()
+
+    def close(self):
+        with self._lock:
+            self._conn.commit()
+            self._conn.close()
+
+
+def open_message_store(config) -> MessageStore:
+    """
+    SMS-Ablage gemäß Konfiguration öffnen
+
+    Args:
+        config: Config-Objekt
+
+    Returns:
+        MessageStore-Instanz
+    """
+    backend = config.get('message_store', 'files')
+
+    if backend == 'files':
+        return TextFileStore(config.get('sms_dir'))
+
+    if backend == 'sqlite':
+        export_dir = config.get('sms_dir') if config.get('export_txt', False) else None
+        return SQLiteMessageStore(config.get('message_db'), export_dir)
+
+    raise ValueError(f"Unbekanntes Message-Store-Backend '{backend}' (verfügbar: files, sqlite)")
@@ -11,12 +11,18 @@ import sys
 from pathlib import Path
 from datetime import datetime
 
+from .archive import format_sms_text, open_message_store
 from .config import Config
-from .monitor import SMSMonitor
+from .export import FORMATS, export_messages
+from .search import SearchIndex
+from .sender import SendQueue
+from .stats import load_snapshot
 
 
 def cmd_run(args):
     """SMS-Monitor im Daemon-Modus starten"""
+    from .monitor import SMSMonitor
+
     config = Config(args.config)
     monitor = SMSMonitor(config)
     monitor.run()
@@ -24,112 +30,282 @@ def cmd_run(args):
 
 def cmd_check(args):
     """Einmalige SMS-Prüfung durchführen"""
+    from .monitor import SMSMonitor
+
     config = Config(args.config)
-    monitor = SMSMonitor(config)
+    # Nur abrufen: Outbox und Versand-Spool gehören dem Daemon
+    monitor = SMSMonitor(config, daemon=False)
 
     if not monitor.connect_modem():
         print("FEHLER: Modem-Verbindung fehlgeschlagen")
         sys.exit(1)
 
     print("Prüfe auf neue SMS...")
-    monitor.process_sms()
+    monitor.start_workers()
+    try:
+        monitor.process_sms()
+    finally:
+        monitor.shutdown()
     print("Fertig.")
 
 
+STATS_BREAKDOWNS = {
+    'sender': 'Absender',
+    'hour': 'Stunde',
+    'day': 'Tag',
+    'modem': 'Modem',
+}
+
+
+def parse_datetime_arg(value: str) -> datetime:
+    """Datum/Zeit-Argument (ISO 8601, z.B. 2025-12-05 oder 2025-12-05T14:00) parsen"""
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Ungültiges Datum: {value}")
+
+
 def cmd_list(args):
-    """Alle gespeicherten SMS auflisten"""
+    """Gespeicherte SMS auflisten"""
     config = Config(args.config)
-    sms_dir = Path(config.get('sms_dir'))
 
-    if not sms_dir.exists():
-        print(f"SMS-Verzeichnis nicht gefunden: {sms_dir}")
+    if config.get('message_store', 'files') == 'files':
+        sms_dir = Path(config.get('sms_dir'))
+        if not sms_dir.exists():
+            print(f"SMS-Verzeichnis nicht gefunden: {sms_dir}")
+            return
+    elif not Path(config.get('message_db')).exists():
+        print(f"SMS-Datenbank nicht gefunden: {config.get('message_db')}")
         return
 
-    sms_files = sorted(sms_dir.glob("*.txt"))
+    store = open_message_store(config)
+    filters = {
+        'sender': args.sender,
+        'since': args.since,
+        'until': args.until,
+        'modem': args.modem,
+    }
 
-    if not sms_files:
+    total = store.count(**filters)
+    if not total:
         print("Keine gespeicherten SMS vorhanden")
         return
 
-    print(f"\n=== {len(sms_files)} gespeicherte SMS ===\n")
+    print(f"\n=== {total} gespeicherte SMS ===\n")
 
-    for sms_file in sms_files:
+    for sms_data in store.query(limit=args.limit, offset=args.offset, **filters):
         if args.verbose:
             print(f"{'=' * 70}")
-            print(f"Datei: {sms_file.name}")
+            label = 'Eintrag' if 'id' in sms_data else 'Datei'
+            print(f"{label}: {Path(sms_data['ref']).name}")
             print(f"{'=' * 70}")
-            print(sms_file.read_text(encoding='utf-8'))
+            print(format_sms_text(sms_data))
             print()
         else:
             # Nur die erste Zeile (Von:) anzeigen
-            with open(sms_file, 'r', encoding='utf-8') as f:
-                first_line = f.readline().strip()
-            print(f"{sms_file.name}: {first_line}")
+            print(f"{Path(sms_data['ref']).name}: Von: {sms_data['number']}")
 
+    store.close()
 
-def cmd_stats(args):
-    """Statistiken anzeigen"""
+
+def cmd_search(args):
+    """Volltextsuche über gespeicherte SMS"""
     config = Config(args.config)
-    monitor = SMSMonitor(config)
+    search_db = Path(config.get('search_db'))
+
+    if not search_db.exists():
+        print(f"Suchindex nicht gefunden: {search_db}")
+        print("Index aufbauen mit: sms-monitor reindex")
+        return
+
+    index = SearchIndex(str(search_db))
+    results = index.search(
+        args.query,
+        sender=args.sender,
+        since=args.since,
+        until=args.until,
+        modem=args.modem,
+        limit=args.limit
+    )
+
+    count = 0
+    for sms_data in results:
+        count += 1
+        modem = f" [{sms_data['modem']}]" if sms_data['modem'] else ''
+        if args.verbose:
+            print(f"{'=' * 70}")
+            print(f"{sms_data['timestamp']}  Von: {sms_data['number']}{modem}")
+            print(f"Ablage: {sms_data['ref']}")
+            print(f"{'=' * 70}")
+            print(sms_data['text'])
+            print()
+        else:
+            print(f"{sms_data['timestamp']}  {sms_data['number']}{modem}: {sms_data['snippet']}")
+
+    if not count:
+        print("Keine Treffer")
+
+    index.close()
+
 
-    sms_dir = Path(config.get('sms_dir'))
-    sms_count = len(list(sms_dir.glob("*.txt"))) if sms_dir.exists() else 0
+def cmd_reindex(args):
+    """Suchindex mit der SMS-Ablage abgleichen"""
+    config = Config(args.config)
+    search_db = Path(config.get('search_db'))
+    search_db.parent.mkdir(parents=True, exist_ok=True)
+
+    store = open_message_store(config)
+    index = SearchIndex(str(search_db))
+    try:
+        counts = index.reindex(store)
+    finally:
+        index.close()
+        store.close()
+
+    print(
+        f"Suchindex aktualisiert: {counts['added']} neu, "
+        f"{counts['updated']} geändert, {counts['removed']} entfernt"
+    )
 
-    processed = monitor._load_processed()
+
+def cmd_export(args):
+    """Gespeicherte SMS exportieren (gestreamt)"""
+    config = Config(args.config)
+    store = open_message_store(config)
+
+    try:
+        count = export_messages(
+            store,
+            fmt=args.format,
+            output=args.output,
+            compress=args.gzip,
+            cursor_path=args.cursor,
+            sender=args.sender,
+            since=args.since,
+            until=args.until,
+            modem=args.modem
+        )
+    finally:
+        store.close()
+
+    print(f"{count} SMS exportiert", file=sys.stderr)
+
+
+def cmd_stats(args):
+    """Statistiken anzeigen (aus dem Snapshot des Daemons)"""
+    config = Config(args.config)
+    snapshot = load_snapshot(config.get('stats_file')) or {}
 
     print("\n=== SMS Monitor Statistiken ===\n")
-    print(f"Verarbeitete SMS (gesamt): {len(processed)}")
-    print(f"Gespeicherte SMS-Dateien:  {sms_count}")
-    print(f"SMS-Verzeichnis:           {sms_dir}")
+    print(f"Verarbeitete SMS (gesamt): {snapshot.get('total', 0)}")
+    print(f"Duplikate übersprungen:    {snapshot.get('duplicates', 0)}")
+    print(f"Stand:                     {snapshot.get('updated_at', '-')}")
+    print(f"SMS-Verzeichnis:           {config.get('sms_dir')}")
     print(f"Log-Datei:                 {config.get('log_file')}")
     print(f"Konfiguration:             {config.config_path}")
     print(f"Check-Intervall:           {config.get('check_interval')}s")
     print(f"Löschen nach Lesen:        {config.get('delete_after_read')}")
 
-    # Modem-Info (falls verfügbar)
-    if monitor.connect_modem():
-        print(f"\nModem:")
-        print(f"  Hersteller: {monitor.modem.get_manufacturer()}")
-        print(f"  Modell:     {monitor.modem.get_model()}")
-        print(f"  Firmware:   {monitor.modem.get_revision()}")
+    webhooks = snapshot.get('webhooks', {})
+    if webhooks:
+        print("\nWebhooks:")
+        for url, counts in webhooks.items():
+            print(f"  {url}: {counts.get('success', 0)} ok, {counts.get('failure', 0)} Fehler")
+
+    if args.by:
+        breakdown = snapshot.get(f"by_{args.by}", {})
+        print(f"\nSMS nach {STATS_BREAKDOWNS[args.by]}:")
+
+        if args.by in ('hour', 'day'):
+            # Chronologisch, neueste zuletzt
+            rows = sorted(breakdown.items())[-args.top:]
+        else:
+            rows = sorted(breakdown.items(), key=lambda item: item[1], reverse=True)[:args.top]
+
+        if not rows:
+            print("  (keine Daten)")
+        for key, count in rows:
+            print(f"  {key:<25} {count}")
 
     print()
 
 
 def cmd_modem_info(args):
     """Detaillierte Modem-Informationen anzeigen"""
+    from .monitor import connect_modems
+
     config = Config(args.config)
-    monitor = SMSMonitor(config)
 
-    if not monitor.connect_modem():
-        print("FEHLER: Modem-Verbindung fehlgeschlagen")
+    # Nur D-Bus, keine Ablage/Journal/Outbox: läuft gefahrlos neben dem Daemon
+    try:
+        modems = connect_modems(config)
+    except Exception as e:
+        print(f"FEHLER: Modem-Verbindung fehlgeschlagen: {e}")
         sys.exit(1)
 
-    modem = monitor.modem
+    if not modems:
+        print("FEHLER: Kein Modem gefunden. Ist das USB-Modem angeschlossen?")
+        sys.exit(1)
 
-    print("\n=== Modem-Informationen ===\n")
-    print(f"Hersteller:  {modem.get_manufacturer()}")
-    print(f"Modell:      {modem.get_model()}")
-    print(f"Firmware:    {modem.get_revision()}")
+    for modem in modems:
+        print(f"\n=== Modem-Informationen [{modem.label}] ===\n")
+        print(f"D-Bus Pfad:  {modem.path}")
+        print(f"Hersteller:  {modem.get_property('Manufacturer')}")
+        print(f"Modell:      {modem.get_property('Model')}")
+        print(f"Firmware:    {modem.get_property('Revision')}")
+
+        try:
+            print(f"Equipment ID: {modem.get_property('EquipmentIdentifier')}")
+        except:
+            pass
+
+        try:
+            state = modem.get_property('State')
+            print(f"Status:      {state}")
+        except:
+            pass
+
+        try:
+            signal_quality, _ = modem.get_property('SignalQuality')
+            print(f"Signalstärke: {signal_quality}%")
+        except:
+            pass
 
-    try:
-        print(f"Equipment ID: {modem.get_equipment_identifier()}")
-    except:
-        pass
+    print()
 
-    try:
-        state = modem.get_state()
-        print(f"Status:      {state}")
-    except:
-        pass
 
-    try:
-        signal_quality = modem.get_signal_quality()
-        print(f"Signalstärke: {signal_quality}%")
-    except:
-        pass
+def cmd_send(args):
+    """SMS zum Versand durch den laufenden Daemon einreihen"""
+    config = Config(args.config)
+    # Nur beim Einreihen anlegen, --list bleibt ohne Nebenwirkung
+    queue = SendQueue(config.get('send_dir'), create=not args.list)
+
+    if args.list:
+        pending, failed = queue.pending(), queue.failed()
+        print(f"\n=== Versand: {len(pending)} ausstehend, {len(failed)} fehlgeschlagen ===\n")
+        for status, jobs in (('ausstehend', pending), ('fehlgeschlagen', failed)):
+            for job in jobs:
+                line = f"{job['id']}  {status:<14} {job['number']:<16} Versuche: {job['attempts']}"
+                if job.get('modem'):
+                    line += f"  [{job['modem']}]"
+                print(line)
+                if job.get('last_error'):
+                    print(f"    {job['last_error']}")
+        return
 
-    print()
+    if not args.number:
+        print("FEHLER: Empfängernummer fehlt", file=sys.stderr)
+        sys.exit(1)
+
+    text = args.text
+    if text is None or text == '-':
+        text = sys.stdin.read().rstrip('\n')
+    if not text:
+        print("FEHLER: Leere Nachricht", file=sys.stderr)
+        sys.exit(1)
+
+    job = queue.create(args.number.strip(), text, args.modem)
+    print(f"SMS an {job['number']} eingereiht: {job['id']}")
 
 
 def cmd_config(args):
@@ -160,8 +336,15 @@ Beispiele:
   %(prog)s run                    # Monitor starten
   %(prog)s check                  # Einmalig auf SMS prüfen
   %(prog)s list                   # Gespeicherte SMS anzeigen
+  %(prog)s list --from +4912345 --since 2025-12-01 -n 20
+  %(prog)s search "code 4821" --since 2025-12-01
+  %(prog)s reindex                # Suchindex aktualisieren
+  %(prog)s export -f csv -o sms.csv.gz --cursor /var/lib/sms-monitor/export.cursor
   %(prog)s stats                  # Statistiken anzeigen
+  %(prog)s stats --by sender      # SMS pro Absender
   %(prog)s modem-info             # Modem-Informationen
+  %(prog)s send +4912345678 "Hallo"  # SMS versenden (über den laufenden Daemon)
+  %(prog)s send --list            # Ausstehende und fehlgeschlagene SMS
   %(prog)s config --show          # Konfiguration anzeigen
 
 Weitere Informationen: https://github.com/deCASHme/sms-monitor
@@ -197,16 +380,177 @@ Weitere Informationen: https://github.com/deCASHme/sms-monitor
         action='store_true',
         help='Komplette SMS-Inhalte anzeigen'
     )
+    parser_list.add_argument(
+        '--from',
+        dest='sender',
+        metavar='NUMMER',
+        help='Nur SMS dieses Absenders'
+    )
+    parser_list.add_argument(
+        '--since',
+        type=parse_datetime_arg,
+        metavar='DATUM',
+        help='Nur SMS ab diesem Zeitpunkt (ISO 8601)'
+    )
+    parser_list.add_argument(
+        '--until',
+        type=parse_datetime_arg,
+        metavar='DATUM',
+        help='Nur SMS vor diesem Zeitpunkt (ISO 8601)'
+    )
+    parser_list.add_argument(
+        '--modem',
+        metavar='LABEL',
+        help='Nur SMS dieses Modems'
+    )
+    parser_list.add_argument(
+        '-n', '--limit',
+        type=int,
+        help='Maximale Anzahl anzuzeigender SMS'
+    )
+    parser_list.add_argument(
+        '--offset',
+        type=int,
+        default=0,
+        help='Anzahl zu überspringender SMS (Blättern)'
+    )
     parser_list.set_defaults(func=cmd_list)
 
+    # search command
+    parser_search = subparsers.add_parser('search', help='Volltextsuche über gespeicherte SMS')
+    parser_search.add_argument(
+        'query',
+        help='Suchbegriffe (FTS5-Syntax, z.B. \'"exakte phrase"\', \'code AND 4821\', \'48*\')'
+    )
+    parser_search.add_argument(
+        '-v', '--verbose',
+        action='store_true',
+        help='Komplette SMS-Inhalte anzeigen'
+    )
+    parser_search.add_argument(
+        '--from',
+        dest='sender',
+        metavar='NUMMER',
+        help='Nur SMS dieses Absenders'
+    )
+    parser_search.add_argument(
+        '--since',
+        type=parse_datetime_arg,
+        metavar='DATUM',
+        help='Nur SMS ab diesem Zeitpunkt (ISO 8601)'
+    )
+    parser_search.add_argument(
+        '--until',
+        type=parse_datetime_arg,
+        metavar='DATUM',
+        help='Nur SMS vor diesem Zeitpunkt (ISO 8601)'
+    )
+    parser_search.add_argument(
+        '--modem',
+        metavar='LABEL',
+        help='Nur SMS dieses Modems'
+    )
+    parser_search.add_argument(
+        '-n', '--limit',
+        type=int,
+        default=20,
+        help='Maximale Anzahl Treffer (Standard: 20)'
+    )
+    parser_search.set_defaults(func=cmd_search)
+
+    # reindex command
+    parser_reindex = subparsers.add_parser(
+        'reindex', help='Suchindex aktualisieren (nur neue/geänderte SMS)'
+    )
+    parser_reindex.set_defaults(func=cmd_reindex)
+
+    # export command
+    parser_export = subparsers.add_parser('export', help='Gespeicherte SMS exportieren')
+    parser_export.add_argument(
+        '-f', '--format',
+        choices=FORMATS,
+        default='jsonl',
+        help='Ausgabeformat (Standard: jsonl; parquet benötigt pyarrow)'
+    )
+    parser_export.add_argument(
+        '-o', '--output',
+        metavar='DATEI',
+        help='Zieldatei (Standard: stdout; Endung .gz komprimiert)'
+    )
+    parser_export.add_argument(
+        '--gzip',
+        action='store_true',
+        help='Ausgabe gzip-komprimieren'
+    )
+    parser_export.add_argument(
+        '--cursor',
+        metavar='DATEI',
+        help='Nur SMS seit dem letzten Export mit dieser Cursor-Datei'
+    )
+    parser_export.add_argument(
+        '--from',
+        dest='sender',
+        metavar='NUMMER',
+        help='Nur SMS dieses Absenders'
+    )
+    parser_export.add_argument(
+        '--since',
+        type=parse_datetime_arg,
+        metavar='DATUM',
+        help='Nur SMS ab diesem Zeitpunkt (ISO 8601)'
+    )
+    parser_export.add_argument(
+        '--until',
+        type=parse_datetime_arg,
+        metavar='DATUM',
+        help='Nur SMS vor diesem Zeitpunkt (ISO 8601)'
+    )
+    parser_export.add_argument(
+        '--modem',
+        metavar='LABEL',
+        help='Nur SMS dieses Modems'
+    )
+    parser_export.set_defaults(func=cmd_export)
+
     # stats command
     parser_stats = subparsers.add_parser('stats', help='Statistiken anzeigen')
+    parser_stats.add_argument(
+        '--by',
+        choices=list(STATS_BREAKDOWNS),
+        help='Aufschlüsselung nach Absender, Stunde, Tag oder Modem'
+    )
+    parser_stats.add_argument(
+        '--top',
+        type=int,
+        default=20,
+        help='Anzahl angezeigter Einträge der Aufschlüsselung (Standard: 20)'
+    )
     parser_stats.set_defaults(func=cmd_stats)
 
     # modem-info command
     parser_modem = subparsers.add_parser('modem-info', help='Modem-Informationen')
     parser_modem.set_defaults(func=cmd_modem_info)
 
+    # send command
+    parser_send = subparsers.add_parser('send', help='SMS versenden')
+    parser_send.add_argument('number', nargs='?', help='Empfängernummer')
+    parser_send.add_argument(
+        'text',
+        nargs='?',
+        help='Nachricht (ohne Angabe oder "-": von der Standardeingabe)'
+    )
+    parser_send.add_argument(
+        '--modem',
+        metavar='LABEL',
+        help='Über dieses Modem senden (Standard: beliebiges freies Modem)'
+    )
+    parser_send.add_argument(
+        '--list',
+        action='store_true',
+        help='Ausstehende und fehlgeschlagene SMS anzeigen'
+    )
+    parser_send.set_defaults(func=cmd_send)
+
     # config command
     parser_config = subparsers.add_parser('config', help='Konfiguration verwalten')
     parser_config.add_argument(
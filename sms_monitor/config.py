@@ -5,7 +5,9 @@ Konfigurationsmanagement für SMS Monitor
 import json
 import logging
 from pathlib import Path
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Set
+
+logger = logging.getLogger(__name__)
 
 
 class Config:
@@ -13,16 +15,108 @@ class Config:
 
     DEFAULT_CONFIG = {
         "modem_index": 0,
+        "modems": None,
+        "dbus_address": None,
         "sms_dir": "/var/spool/sms",
+        "message_store": "files",
+        "message_db": "/var/lib/sms-monitor/messages.sqlite3",
+        "export_txt": False,
+        "search_index": True,
+        "search_db": "/var/lib/sms-monitor/search.sqlite3",
         "log_file": "/var/log/sms-monitor.log",
         "log_level": "INFO",
+        "log_format": "text",
+        "log_async": True,
+        "log_max_bytes": None,
+        "log_rotate_when": None,
+        "log_backup_count": 7,
+        "log_messages": "full",
         "processed_db": "/var/lib/sms-monitor/processed.json",
+        "processed_backend": "sqlite",
+        "processed_retention_days": None,
+        "processed_max_entries": None,
+        "processed_bloom": False,
+        "stats_file": "/var/lib/sms-monitor/stats.json",
+        "stats_flush_interval": 10,
         "check_interval": 30,
+        "poll_adaptive": True,
+        "poll_min_interval": 2,
+        "poll_max_interval": 120,
+        "poll_backoff_max": 300,
+        "event_driven": True,
+        "sweep_interval": 300,
+        "batch_fetch": True,
+        "wait_for_modem": True,
+        "reconnect_delay": 500,
         "delete_after_read": True,
+        "delete_concurrency": 4,
+        "delete_max_attempts": 5,
+        "delete_retry_delay": 2,
+        "delete_drain_timeout": 5,
+        "pipeline_queue_size": 200,
+        "pipeline_parse_workers": 2,
+        "pipeline_persist_workers": 1,
+        "pipeline_notify_workers": 2,
+        "journal_file": "/var/lib/sms-monitor/journal.jsonl",
+        "durability": "cycle",
+        "durability_interval_ms": 200,
+        "journal_checkpoint": 1000,
         "webhooks": [],
+        "webhook_timeout": 5,
+        "webhook_concurrency": 4,
+        "circuit_breaker_threshold": 5,
+        "circuit_breaker_reset": 30,
+        "webhook_outbox": True,
+        "outbox_dir": "/var/lib/sms-monitor/outbox",
+        "outbox_drain_timeout": 5,
+        "webhook_workers": 2,
+        "webhook_max_attempts": 10,
+        "webhook_backoff_base": 5,
+        "webhook_backoff_max": 3600,
+        "routes": [],
+        "route_default": "all",
+        "metrics_listen": None,
+        "api_listen": None,
+        "api_buffer": 10000,
+        "api_feed_file": "/var/lib/sms-monitor/feed.jsonl",
+        "send_dir": "/var/lib/sms-monitor/send",
+        "send_rate": 10,
+        "send_burst": 5,
+        "send_timeout": 60,
+        "send_max_attempts": 5,
+        "send_retry_delay": 30,
+        "send_retry_max": 900,
+        "send_scan_interval": 5,
+        "send_modem_wait": 3600,
+        "api_send": False,
+        "config_watch": False,
+        "config_watch_interval": 2,
         "enable_console_output": True
     }
 
+    # Zulässige Werte für Auswahl-Optionen
+    CHOICES = {
+        "message_store": ("files", "sqlite"),
+        "processed_backend": ("sqlite", "log"),
+        "log_level": ("DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"),
+        "log_format": ("text", "json"),
+        "log_messages": ("full", "compact"),
+        "durability": ("message", "cycle", "interval"),
+        "route_default": ("all", "drop"),
+    }
+
+    # Zahlen, die größer als 0 sein müssen
+    POSITIVE = (
+        "check_interval", "sweep_interval", "stats_flush_interval", "webhook_timeout",
+        "webhook_concurrency", "webhook_workers", "webhook_max_attempts",
+        "api_buffer", "config_watch_interval", "delete_concurrency", "delete_max_attempts",
+        "delete_retry_delay", "pipeline_queue_size", "pipeline_parse_workers",
+        "pipeline_persist_workers", "pipeline_notify_workers", "durability_interval_ms",
+        "journal_checkpoint", "poll_min_interval", "poll_max_interval", "poll_backoff_max",
+        "send_rate", "send_burst", "send_timeout", "send_max_attempts", "send_retry_delay",
+        "send_retry_max", "send_scan_interval", "send_modem_wait",
+    )
+
     def __init__(self, config_path: str = "/etc/sms-monitor/config.json"):
         """
         Initialisiert die Konfiguration
@@ -40,20 +134,124 @@ class Config:
         try:
             config_file = Path(self.config_path)
             if config_file.exists():
-                with open(config_file, 'r', encoding='utf-8') as f:
-                    user_config = json.load(f)
-                    config.update(user_config)
-                logging.debug(f"Konfiguration geladen von {self.config_path}")
+                config = self._read_config()
+                logger.debug(f"Konfiguration geladen von {self.config_path}")
+                for error in self.validate(config):
+                    logger.error(f"Ungültige Konfiguration: {error}")
             else:
-                logging.warning(
+                logger.warning(
                     f"Konfigurationsdatei {self.config_path} nicht gefunden, "
                     f"verwende Standard-Konfiguration"
                 )
         except Exception as e:
-            logging.error(f"Fehler beim Laden der Konfiguration: {e}")
+            logger.error(f"Fehler beim Laden der Konfiguration: {e}")
 
         return config
 
+    def _read_config(self) -> Dict[str, Any]:
+        """
+        Konfigurationsdatei lesen und mit den Standardwerten ergänzen
+
+        Raises:
+            OSError, ValueError bei fehlender oder fehlerhafter Datei
+        """
+        with open(self.config_path, 'r', encoding='utf-8') as f:
+            user_config = json.load(f)
+        if not isinstance(user_config, dict):
+            raise ValueError("Konfiguration muss ein JSON-Objekt sein")
+
+        config = self.DEFAULT_CONFIG.copy()
+        config.update(user_config)
+        return config
+
+    @classmethod
+    def validate(cls, data: Dict[str, Any]) -> List[str]:
+        """
+        Konfiguration prüfen
+
+        Args:
+            data: Vollständige Konfiguration
+
+        Returns:
+            Liste der Fehler (leer wenn gültig)
+        """
+        errors = []
+
+        for key, default in cls.DEFAULT_CONFIG.items():
+            value = data.get(key)
+            if default is None or value is None:
+                continue
+            if isinstance(default, bool):
+                valid = isinstance(value, bool)
+            elif isinstance(default, (int, float)):
+                valid = isinstance(value, (int, float)) and not isinstance(value, bool)
+            else:
+                valid = isinstance(value, type(default))
+            if not valid:
+                errors.append(f"{key}: {type(default).__name__} erwartet, nicht {value!r}")
+
+        for key, choices in cls.CHOICES.items():
+            value = data.get(key)
+            if value is None:
+                continue
+            normalized = value.upper() if key == 'log_level' and isinstance(value, str) else value
+            if normalized not in choices:
+                errors.append(f"{key}: '{value}' ungültig (erlaubt: {', '.join(choices)})")
+
+        for key in cls.POSITIVE:
+            value = data.get(key)
+            if isinstance(value, (int, float)) and not isinstance(value, bool) and value <= 0:
+                errors.append(f"{key}: muss größer als 0 sein")
+
+        for entry in data.get('webhooks') or []:
+            if isinstance(entry, dict):
+                if not isinstance(entry.get('url'), str):
+                    errors.append(f"webhooks: Eintrag ohne url: {entry!r}")
+                batch_size = entry.get('batch_size', 1)
+                if not isinstance(batch_size, int) or isinstance(batch_size, bool) or batch_size < 1:
+                    errors.append(f"webhooks: batch_size muss eine Zahl ab 1 sein: {entry!r}")
+                batch_ms = entry.get('batch_ms', 0)
+                if not isinstance(batch_ms, (int, float)) or isinstance(batch_ms, bool) or batch_ms < 0:
+                    errors.append(f"webhooks: batch_ms muss eine Zahl ab 0 sein: {entry!r}")
+                if not isinstance(entry.get('gzip', False), bool):
+                    errors.append(f"webhooks: gzip: bool erwartet: {entry!r}")
+            elif not isinstance(entry, str):
+                errors.append(f"webhooks: URL oder Objekt erwartet, nicht {entry!r}")
+
+        from .routing import check_routes
+        errors.extend(check_routes(data.get('routes'), data.get('webhooks')))
+
+        modems = data.get('modems')
+        if modems not in (None, 'all') and not isinstance(modems, list):
+            errors.append(f"modems: \"all\" oder Liste erwartet, nicht {modems!r}")
+
+        return errors
+
+    def reload(self) -> Set[str]:
+        """
+        Konfigurationsdatei neu laden
+
+        Die neue Konfiguration wird erst nach erfolgreicher Prüfung in einem
+        Schritt übernommen; bei Fehlern bleibt die bisherige aktiv.
+
+        Returns:
+            Namen der geänderten Optionen
+
+        Raises:
+            OSError, ValueError bei fehlender, fehlerhafter oder ungültiger Datei
+        """
+        data = self._read_config()
+        errors = self.validate(data)
+        if errors:
+            raise ValueError('; '.join(errors))
+
+        changed = {
+            key for key in set(data) | set(self.data)
+            if data.get(key) != self.data.get(key)
+        }
+        self.data = data
+        return changed
+
     def get(self, key: str, default: Any = None) -> Any:
         """
         Konfigurationswert abrufen
@@ -80,9 +278,9 @@ class Config:
             Path(save_path).parent.mkdir(parents=True, exist_ok=True)
             with open(save_path, 'w', encoding='utf-8') as f:
                 json.dump(self.data, f, indent=2, ensure_ascii=False)
-            logging.info(f"Konfiguration gespeichert in {save_path}")
+            logger.info(f"Konfiguration gespeichert in {save_path}")
         except Exception as e:
-            logging.error(f"Fehler beim Speichern der Konfiguration: {e}")
+            logger.error(f"Fehler beim Speichern der Konfiguration: {e}")
 
     def create_example_config(self, path: str):
         """
@@ -92,4 +290,4 @@ class Config:
             path: Pfad für die Beispieldatei
         """
         self.save(path)
-        logging.info(f"Beispiel-Konfiguration erstellt: {path}")
+        logger.info(f"Beispiel-Konfiguration erstellt: {path}")
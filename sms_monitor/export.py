@@ -0,0 +1,247 @@
+"""
+Export gespeicherter SMS
+
+Die SMS werden direkt aus der Ablage gestreamt und als JSON Lines, CSV oder
+(mit ``pyarrow``) als Parquet geschrieben; der Speicherbedarf hängt nicht
+von der Größe des Archivs ab. Eine Cursor-Datei merkt sich die Position
+des letzten Exports, sodass regelmäßige Exporte nur neue SMS enthalten.
+"""
+
+import csv
+import gzip
+import json
+import logging
+import sys
+from pathlib import Path
+from typing import Dict, IO, Iterator, Optional, Tuple
+
+from .archive import MessageStore, SQLiteMessageStore, TextFileStore
+from .utils import write_json_atomic
+
+logger = logging.getLogger(__name__)
+
+FORMATS = ('jsonl', 'csv', 'parquet')
+
+FIELDS = ['ref', 'number', 'timestamp', 'modem', 'state', 'text']
+
+# Zeilen pro Parquet Row Group
+PARQUET_BATCH_SIZE = 10000
+
+# Überlappung des Datei-Cursors: atomar geschriebene Dateien tragen den
+# Änderungszeitpunkt der temporären Datei, erscheinen also evtl. erst nach
+# einem Export mit jüngeren Dateien
+CURSOR_OVERLAP_NS = 60 * 10 ** 9
+
+
+def load_cursor(path: str) -> Dict:
+    """Cursor-Datei lesen (leer wenn noch kein Export erfolgt ist)"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def iter_messages(store: MessageStore, cursor: Dict = None,
+                  **filters) -> Iterator[Tuple[Dict, Dict]]:
+    """
+    SMS der Ablage streamen, optional nur nach dem Cursor
+
+    Der Cursor ist bei der SQLite-Ablage die letzte exportierte ID. Bei der
+    Datei-Ablage ist es der späteste Änderungszeitpunkt der exportierten
+    Dateien; zusätzlich werden Dateien bis CURSOR_OVERLAP_NS davor erneut
+    geprüft und anhand der im Cursor gemerkten Namen nicht doppelt exportiert.
+
+    Args:
+        store: MessageStore
+        cursor: Position des letzten Exports
+        filters: sender, since, until, modem (wie MessageStore.query)
+
+    Yields:
+        (SMS-Daten, neuer Cursor)
+    """
+    cursor = cursor or {}
+
+    if isinstance(store, SQLiteMessageStore):
+        for sms_data in store.query_after_id(cursor.get('last_id', 0), **filters):
+            yield sms_data, {'last_id': sms_data['id']}
+        return
+
+    if isinstance(store, TextFileStore):
+        last_mtime = cursor.get('mtime_ns', 0)
+        newest = pruned = last_mtime
+        # Dateiname -> Änderungszeitpunkt der zuletzt exportierten Dateien
+        exported = dict(cursor.get('files', {}))
+        # Ältere Cursor ohne Dateinamen: ohne Überlappung fortsetzen
+        lower = last_mtime - CURSOR_OVERLAP_NS if 'files' in cursor else last_mtime
+        modem = filters.pop('modem', None)
+
+        for filepath in store.matching_files(**filters):
+            try:
+                mtime = filepath.stat().st_mtime_ns
+            except FileNotFoundError:
+                continue
+            if mtime <= lower or filepath.name in exported:
+                continue
+
+            sms_data = store.read_file(filepath)
+            if modem and sms_data['modem'] != modem:
+                continue
+
+            newest = max(newest, mtime)
+            exported[filepath.name] = mtime
+            if newest - pruned > CURSOR_OVERLAP_NS:
+                # Namen außerhalb des Fensters schließt schon der Zeitpunkt aus
+                exported = {
+                    name: value for name, value in exported.items()
+                    if value > newest - CURSOR_OVERLAP_NS
+                }
+                pruned = newest
+            yield sms_data, {'mtime_ns': newest, 'files': exported}
+        return
+
+    raise ValueError(f"Export für {type(store).__name__} nicht unterstützt")
+
+
+def open_output(path: Optional[str], compress: bool = False) -> IO:
+    """
+    Ausgabe öffnen (Datei oder stdout, optional gzip)
+
+    Dateien mit Endung ``.gz`` werden immer komprimiert.
+    """
+    if path and path != '-':
+        if compress or path.endswith('.gz'):
+            return gzip.open(path, 'wt', encoding='utf-8', newline='')
+        return open(path, 'w', encoding='utf-8', newline='')
+
+    if compress:
+        return gzip.open(sys.stdout.buffer, 'wt', encoding='utf-8', newline='')
+    return sys.stdout
+
+
+class JSONLWriter:
+    """Eine JSON-Zeile pro SMS"""
+
+    def __init__(self, output: IO):
+        self.output = output
+
+    def write(self, sms_data: Dict):
+        self.output.write(json.dumps(
+            {field: sms_data.get(field, '') for field in FIELDS}, ensure_ascii=False
+        ) + '\n')
+
+    def close(self):
+        self.output.flush()
+
+
+class CSVWriter:
+    """CSV mit Kopfzeile"""
+
+    def __init__(self, output: IO):
+        self.output = output
+        self.writer = csv.DictWriter(
+            output, fieldnames=FIELDS, extrasaction='ignore', lineterminator='\n'
+        )
+        self.writer.writeheader()
+
+    def write(self, sms_data: Dict):
+        self.writer.writerow(sms_data)
+
+    def close(self):
+        self.output.flush()
+
+
+class ParquetWriter:
+    """Spaltenorientiert als Parquet (benötigt pyarrow), in Row Groups gepuffert"""
+
+    def __init__(self, path: str, compression: str = 'zstd'):
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            raise RuntimeError(
+                "pyarrow-Bibliothek nicht installiert, Parquet-Export nicht möglich. "
+                "Installation: pip install pyarrow"
+            )
+
+        self.pyarrow = pyarrow
+        self.schema = pyarrow.schema([(field, pyarrow.string()) for field in FIELDS])
+        self.writer = pyarrow.parquet.ParquetWriter(
+            path, self.schema, compression=compression
+        )
+        self.batch = {field: [] for field in FIELDS}
+        self.rows = 0
+
+    def write(self, sms_data: Dict):
+        for field in FIELDS:
+            value = sms_data.get(field, '')
+            self.batch[field].append(None if value is None else str(value))
+        self.rows += 1
+        if self.rows >= PARQUET_BATCH_SIZE:
+            self._flush()
+
+    def _flush(self):
+        if not self.rows:
+            return
+        table = self.pyarrow.Table.from_pydict(self.batch, schema=self.schema)
+        self.writer.write_table(table)
+        self.batch = {field: [] for field in FIELDS}
+        self.rows = 0
+
+    def close(self):
+        self._flush()
+        self.writer.close()
+
+
+def export_messages(store: MessageStore, fmt: str = 'jsonl', output: str = None,
+                    compress: bool = False, cursor_path: str = None,
+                    **filters) -> int:
+    """
+    SMS exportieren
+
+    Die Cursor-Datei wird erst nach vollständig geschriebener Ausgabe
+    aktualisiert; ein abgebrochener Export wird beim nächsten Lauf
+    wiederholt.
+
+    Args:
+        store: MessageStore
+        fmt: ``jsonl``, ``csv`` oder ``parquet``
+        output: Zieldatei (Standard bzw. ``-``: stdout; nicht bei Parquet)
+        compress: gzip-Kompression (JSON Lines / CSV)
+        cursor_path: Cursor-Datei für inkrementelle Exporte
+        filters: sender, since, until, modem
+
+    Returns:
+        Anzahl exportierter SMS
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unbekanntes Exportformat '{fmt}' (verfügbar: {', '.join(FORMATS)})")
+
+    cursor = load_cursor(cursor_path) if cursor_path else {}
+
+    stream = None
+    if fmt == 'parquet':
+        if not output or output == '-':
+            raise ValueError("Parquet-Export benötigt eine Zieldatei (-o)")
+        writer = ParquetWriter(output)
+    else:
+        stream = open_output(output, compress)
+        writer = JSONLWriter(stream) if fmt == 'jsonl' else CSVWriter(stream)
+
+    count = 0
+    position = None
+    try:
+        for sms_data, position in iter_messages(store, cursor, **filters):
+            writer.write(sms_data)
+            count += 1
+        writer.close()
+    finally:
+        if stream is not None and stream is not sys.stdout:
+            stream.close()
+
+    if cursor_path and position is not None:
+        Path(cursor_path).parent.mkdir(parents=True, exist_ok=True)
+        write_json_atomic(cursor_path, dict(cursor, **position))
+        logger.debug(f"Export-Cursor gespeichert: {cursor_path}")
+
+    return count
@@ -0,0 +1,76 @@
+"""
+Lokale HTTP-Server des Daemons (Metriken, Streaming-API)
+
+Gemeinsame Basis für Server, die wahlweise auf ``host:port`` oder einem
+Unix-Socket (``unix:/pfad``) lauschen und in einem eigenen Thread laufen.
+"""
+
+import logging
+import os
+import socketserver
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Type
+
+logger = logging.getLogger(__name__)
+
+
+class _TCPHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # Viele gleichzeitige Verbindungen (z.B. SSE-Konsumenten nach einem Neustart)
+    request_queue_size = 128
+
+
+class _UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+
+class LocalRequestHandler(BaseHTTPRequestHandler):
+    """Request-Handler mit Logging über das Modul-Logging"""
+
+    log_name = 'HTTP'
+
+    def address_string(self):
+        # Bei Unix-Sockets ist client_address leer
+        return self.client_address[0] if self.client_address else 'unix'
+
+    def log_message(self, format, *args):
+        logger.debug(f"{self.log_name}: {format % args}")
+
+
+class LocalHTTPServer:
+    """HTTP-Server auf TCP oder Unix-Socket in einem Hintergrund-Thread"""
+
+    name = 'http'
+
+    def __init__(self, listen: str, handler: Type[BaseHTTPRequestHandler]):
+        """
+        Args:
+            listen: ``host:port`` oder ``unix:/pfad/zum/socket``
+            handler: Request-Handler-Klasse
+        """
+        self.listen = listen
+
+        if listen.startswith('unix:'):
+            self.socket_path = listen[len('unix:'):]
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+            self.server = _UnixHTTPServer(self.socket_path, handler)
+        else:
+            self.socket_path = None
+            host, _, port = listen.rpartition(':')
+            self.server = _TCPHTTPServer((host or '127.0.0.1', int(port)), handler)
+
+        self.thread = threading.Thread(
+            target=self.server.serve_forever, name=self.name, daemon=True
+        )
+
+    def start(self):
+        self.thread.start()
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+        if self.socket_path and os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
@@ -0,0 +1,135 @@
+"""
+Write-Ahead-Journal für den Ingest
+
+Jede neue SMS wird vor dem Speichern als JSON-Zeile an das Journal
+angehängt. Ist das Journal auf dem Datenträger (``sync()``), gilt die SMS
+als gesichert und darf vom Modem gelöscht werden - auch wenn Ablage und
+Processed-DB noch nicht per fsync geschrieben sind. Ein Checkpoint schreibt
+die Ablage auf den Datenträger und leert das Journal.
+
+Nach einem Absturz werden beim Start alle Einträge seit dem letzten
+Checkpoint wiederhergestellt, die in der Ablage fehlen.
+
+Das Journal gehört genau einem Prozess (exklusiver ``flock``). Ein zweiter
+Prozess, z.B. ``sms-monitor check`` neben dem Daemon, darf es weder
+wiederherstellen noch leeren.
+"""
+
+import fcntl
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Dict, List
+
+logger = logging.getLogger(__name__)
+
+
+class JournalLockedError(Exception):
+    """Journal wird bereits von einem anderen Prozess verwendet"""
+
+
+class IngestJournal:
+    """Append-only JSON-Lines-Journal neuer SMS"""
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: Pfad zur Journal-Datei
+
+        Raises:
+            JournalLockedError wenn ein anderer Prozess das Journal hält
+        """
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._file = open(self.path, 'a', encoding='utf-8')
+        try:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            self._file.close()
+            raise JournalLockedError(f"Ingest-Journal {self.path} wird bereits verwendet")
+
+        self._entries = self._load()
+        self._count = len(self._entries)
+        self._dirty = False
+        if not self._ends_with_newline():
+            # Abgeschnittene letzte Zeile abschließen
+            self._file.write('\n')
+
+    def _load(self) -> List[Dict]:
+        if not self.path.exists():
+            return []
+
+        entries = []
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entries.append(json.loads(line))
+                except ValueError:
+                    # Beim Absturz abgeschnittene Zeile
+                    logger.warning(f"Unvollständiger Eintrag in {self.path} übersprungen")
+        return entries
+
+    def _ends_with_newline(self) -> bool:
+        with open(self.path, 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            if not f.tell():
+                return True
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b'\n'
+
+    def __len__(self) -> int:
+        """Einträge seit dem letzten Checkpoint"""
+        return self._count
+
+    def recovered(self) -> List[Dict]:
+        """Beim Öffnen vorgefundene Einträge (seit dem letzten Checkpoint)"""
+        return self._entries
+
+    def append(self, sms_data: Dict, sync: bool = False):
+        """
+        SMS anhängen
+
+        Args:
+            sms_data: SMS-Daten
+            sync: Sofort auf den Datenträger schreiben
+        """
+        line = json.dumps(sms_data, ensure_ascii=False) + '\n'
+        with self._lock:
+            self._file.write(line)
+            self._count += 1
+            self._dirty = True
+            if sync:
+                self._sync()
+
+    def _sync(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._dirty = False
+
+    def sync(self):
+        """Angehängte Einträge auf den Datenträger schreiben"""
+        with self._lock:
+            if self._dirty:
+                self._sync()
+
+    def checkpoint(self):
+        """
+        Journal leeren
+
+        Erst aufrufen, nachdem die Ablage selbst auf dem Datenträger ist.
+        """
+        with self._lock:
+            self._file.truncate(0)
+            self._file.seek(0)
+            self._sync()
+            self._entries = []
+            self._count = 0
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._sync()
+                self._file.close()
+                self._file = None
@@ -0,0 +1,134 @@
+"""
+Logging-Einrichtung für den Daemon
+
+Log-Einträge werden über eine Queue an einen Hintergrund-Thread übergeben
+(``QueueListener``), der in Datei und Konsole schreibt. Der Ingest wartet
+damit nie auf Datei- oder journald-I/O. Optional wird die Log-Datei nach
+Größe oder Zeit rotiert und als JSON Lines geschrieben.
+"""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional
+
+TEXT_FORMAT = '[%(asctime)s] %(levelname)s: %(message)s'
+
+# Attribute jedes LogRecords; alles andere stammt aus ``extra=`` und wird
+# im JSON-Format als eigenes Feld ausgegeben
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {
+    'message', 'asctime', 'taskName'
+}
+
+
+class JSONFormatter(logging.Formatter):
+    """Ein JSON-Objekt pro Zeile (Zeit, Level, Logger, Meldung, Zusatzfelder)"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'time': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage()
+        }
+        for name, value in vars(record).items():
+            if name not in _RECORD_ATTRIBUTES and not name.startswith('_'):
+                entry[name] = value
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry['exception'] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler, der Ausnahmen und Zusatzfelder für den Formatter erhält"""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Meldung bereits im aufrufenden Thread zusammensetzen (Argumente
+        # könnten sich sonst noch ändern), Traceback als Text mitgeben
+        record = logging.makeLogRecord(vars(record))
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def create_file_handler(config) -> logging.Handler:
+    """
+    Datei-Handler gemäß Konfiguration
+
+    ``log_max_bytes`` rotiert nach Größe, ``log_rotate_when`` nach Zeit
+    (z.B. ``midnight``); ohne beide wird die Datei nicht rotiert (z.B. für
+    logrotate).
+
+    Args:
+        config: Config-Objekt
+
+    Returns:
+        logging.Handler
+    """
+    log_file = Path(config.get('log_file'))
+    log_file.parent.mkdir(parents=True, exist_ok=True)
+    backup_count = config.get('log_backup_count', 7)
+
+    if config.get('log_max_bytes'):
+        return logging.handlers.RotatingFileHandler(
+            log_file, maxBytes=config.get('log_max_bytes'),
+            backupCount=backup_count, encoding='utf-8'
+        )
+    if config.get('log_rotate_when'):
+        return logging.handlers.TimedRotatingFileHandler(
+            log_file, when=config.get('log_rotate_when'),
+            backupCount=backup_count, encoding='utf-8'
+        )
+    return logging.FileHandler(log_file, encoding='utf-8')
+
+
+def setup_logging(config) -> Optional[logging.handlers.QueueListener]:
+    """
+    Root-Logger konfigurieren
+
+    Args:
+        config: Config-Objekt
+
+    Returns:
+        Laufender QueueListener (None bei synchronem Logging)
+    """
+    root = logging.getLogger()
+    if root.handlers:
+        # Bereits eingerichtet (wie bei logging.basicConfig)
+        return None
+
+    if config.get('log_format', 'text') == 'json':
+        formatter = JSONFormatter()
+    else:
+        formatter = logging.Formatter(TEXT_FORMAT)
+
+    handlers: List[logging.Handler] = [create_file_handler(config)]
+    if config.get('enable_console_output', True):
+        handlers.append(logging.StreamHandler(sys.stdout))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    log_level = getattr(logging, config.get('log_level', 'INFO').upper())
+
+    if not config.get('log_async', True):
+        logging.basicConfig(level=log_level, handlers=handlers)
+        return None
+
+    listener = logging.handlers.QueueListener(
+        queue.SimpleQueue(), *handlers, respect_handler_level=True
+    )
+    logging.basicConfig(level=log_level, handlers=[_QueueHandler(listener.queue)])
+    listener.start()
+    # Beim Beenden ausstehende Einträge noch schreiben
+    atexit.register(listener.stop)
+    return listener
@@ -0,0 +1,314 @@
+"""
+Metriken im Prometheus-Textformat
+
+Die Metriken werden immer mitgezählt (geringer Overhead). Ist
+``metrics_listen`` konfiguriert, stellt ein lokaler HTTP-Server sie unter
+``/metrics`` bereit - wahlweise auf ``host:port`` oder einem Unix-Socket
+(``unix:/pfad``).
+"""
+
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Tuple
+
+from .httpserver import LocalHTTPServer, LocalRequestHandler
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+LAG_BUCKETS = (0.1, 0.5, 1, 2, 5, 10, 30, 60, 300, 900, 3600)
+BATCH_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = '') -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+class Metric:
+    """Basisklasse für Metriken mit Labels"""
+
+    type_name = ''
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, '')) for name in self.labelnames)
+
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type_name}",
+        ]
+        lines.extend(self.samples())
+        return '\n'.join(lines)
+
+
+class Counter(Metric):
+    """Monoton steigender Zähler"""
+
+    type_name = 'counter'
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            items = list(self._values.items())
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {value}"
+            for key, value in items
+        ]
+
+
+class Gauge(Metric):
+    """Momentanwert (optional über eine Callback-Funktion ermittelt)"""
+
+    type_name = 'gauge'
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values = {}
+        self._callback = None
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def set_function(self, callback: Callable[[], float]):
+        """Wert bei jeder Abfrage über callback ermitteln (nur ohne Labels)"""
+        self._callback = callback
+
+    def samples(self):
+        if self._callback:
+            try:
+                return [f"{self.name} {self._callback()}"]
+            except Exception:
+                return []
+
+        with self._lock:
+            items = list(self._values.items())
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {value}"
+            for key, value in items
+        ]
+
+
+class Histogram(Metric):
+    """Verteilung von Messwerten (z.B. Latenzen) in festen Buckets"""
+
+    type_name = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+        self._values = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [[0] * len(self.buckets), 0, 0.0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    entry[0][i] += 1
+            entry[1] += 1
+            entry[2] += value
+
+    @contextmanager
+    def time(self, **labels):
+        """Laufzeit eines Blocks messen"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def samples(self):
+        with self._lock:
+            items = [(key, (list(counts), count, total))
+                     for key, (counts, count, total) in self._values.items()]
+
+        lines = []
+        for key, (counts, count, total) in items:
+            for bound, bucket_count in zip(self.buckets, counts):
+                labels = _format_labels(self.labelnames, key, f'le="{bound}"')
+                lines.append(f"{self.name}_bucket{labels} {bucket_count}")
+            labels = _format_labels(self.labelnames, key, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{labels} {count}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_count{labels} {count}")
+            lines.append(f"{self.name}_sum{labels} {total}")
+        return lines
+
+
+class Registry:
+    """Sammlung aller Metriken"""
+
+    def __init__(self):
+        self.metrics = []
+
+    def register(self, metric: Metric) -> Metric:
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        return '\n'.join(metric.render() for metric in self.metrics) + '\n'
+
+
+REGISTRY = Registry()
+
+DBUS_CALL_SECONDS = REGISTRY.register(Histogram(
+    'sms_monitor_dbus_call_seconds',
+    'Dauer der D-Bus Aufrufe an ModemManager',
+    ['call']
+))
+SAVE_SECONDS = REGISTRY.register(Histogram(
+    'sms_monitor_save_seconds',
+    'Dauer von save_sms()'
+))
+WEBHOOK_SECONDS = REGISTRY.register(Histogram(
+    'sms_monitor_webhook_seconds',
+    'Dauer der Webhook-Aufrufe pro Endpunkt',
+    ['endpoint']
+))
+WEBHOOK_REQUESTS = REGISTRY.register(Counter(
+    'sms_monitor_webhook_requests_total',
+    'Webhook-Aufrufe pro Endpunkt und Ergebnis (success, error, circuit_open)',
+    ['endpoint', 'result']
+))
+WEBHOOK_BATCH_SIZE = REGISTRY.register(Histogram(
+    'sms_monitor_webhook_batch_size',
+    'SMS pro Webhook-Aufruf im Batch-Modus',
+    ['endpoint'],
+    buckets=BATCH_BUCKETS
+))
+WEBHOOK_ROUTES = REGISTRY.register(Counter(
+    'sms_monitor_webhook_routes_total',
+    'Zutreffende Routing-Regeln (default: keine Regel traf zu)',
+    ['route']
+))
+MESSAGES_SEEN = REGISTRY.register(Counter(
+    'sms_monitor_messages_seen_total',
+    'Vom Modem gelesene SMS',
+    ['modem']
+))
+MESSAGES_DUPLICATE = REGISTRY.register(Counter(
+    'sms_monitor_messages_duplicate_total',
+    'Als Duplikat erkannte SMS',
+    ['modem']
+))
+MESSAGES_SAVED = REGISTRY.register(Counter(
+    'sms_monitor_messages_saved_total',
+    'Neu gespeicherte SMS',
+    ['modem']
+))
+INGEST_LAG_SECONDS = REGISTRY.register(Histogram(
+    'sms_monitor_ingest_lag_seconds',
+    'Zeit vom SMS-Timestamp bis zur Speicherung',
+    buckets=LAG_BUCKETS
+))
+MODEM_BACKLOG = REGISTRY.register(Gauge(
+    'sms_monitor_modem_backlog',
+    'Anzahl SMS im Modem-Speicher beim letzten Durchlauf',
+    ['modem']
+))
+POLL_INTERVAL_SECONDS = REGISTRY.register(Gauge(
+    'sms_monitor_poll_interval_seconds',
+    'Aktuelles Intervall des Polling-Betriebs'
+))
+POLL_OVERRUNS = REGISTRY.register(Counter(
+    'sms_monitor_poll_overruns_total',
+    'Polling-Durchläufe, die nicht rechtzeitig beendet waren'
+))
+PIPELINE_QUEUE = REGISTRY.register(Gauge(
+    'sms_monitor_pipeline_queue',
+    'Wartende SMS pro Stufe der Ingest-Pipeline',
+    ['stage']
+))
+PIPELINE_STAGE_SECONDS = REGISTRY.register(Histogram(
+    'sms_monitor_pipeline_stage_seconds',
+    'Verarbeitungsdauer pro SMS und Pipeline-Stufe',
+    ['stage']
+))
+DELETE_PENDING = REGISTRY.register(Gauge(
+    'sms_monitor_delete_pending',
+    'Verarbeitete SMS, deren Löschung vom Modem noch aussteht',
+    ['modem']
+))
+DELETE_FAILURES = REGISTRY.register(Counter(
+    'sms_monitor_delete_failures_total',
+    'Fehlgeschlagene Löschversuche',
+    ['modem']
+))
+SEND_PENDING = REGISTRY.register(Gauge(
+    'sms_monitor_send_pending',
+    'Noch nicht versendete SMS im Versand-Spool'
+))
+SMS_SENT = REGISTRY.register(Counter(
+    'sms_monitor_sms_sent_total',
+    'Versandversuche pro Modem und Ergebnis (sent, error)',
+    ['modem', 'result']
+))
+OUTBOX_PENDING = REGISTRY.register(Gauge(
+    'sms_monitor_webhook_outbox_pending',
+    'Noch nicht zugestellte Webhook-Aufträge in der Outbox'
+))
+
+
+class _MetricsHandler(LocalRequestHandler):
+    registry = REGISTRY
+    log_name = 'Metrics'
+
+    def do_GET(self):
+        if self.path.split('?', 1)[0] not in ('/metrics', '/'):
+            self.send_error(404)
+            return
+
+        body = self.registry.render().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class MetricsServer(LocalHTTPServer):
+    """Lokaler HTTP-Server für /metrics"""
+
+    name = 'metrics'
+
+    def __init__(self, listen: str, registry: Registry = REGISTRY):
+        """
+        Args:
+            listen: ``host:port`` oder ``unix:/pfad/zum/socket``
+            registry: Auszuliefernde Metriken
+        """
+        handler = type('MetricsHandler', (_MetricsHandler,), {'registry': registry})
+        super().__init__(listen, handler)
+
+    def start(self):
+        super().start()
+        logger.info(f"Metriken verfügbar unter {self.listen}")
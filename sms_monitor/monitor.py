@@ -2,481 +2,2434 @@
 SMS Monitor - Hauptmodul für SMS-Empfang über ModemManager
 """
 
-import json
+import heapq
+import itertools
 import logging
+import queue
 import signal
 import sys
+import threading
 import time
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Optional
 
-try:
-    import gi
-    gi.require_version('ModemManager', '1.0')
-    from gi.repository import ModemManager, GLib, Gio
-except ImportError:
-    print("FEHLER: ModemManager GObject Introspection nicht gefunden!")
-    print("Installation: sudo apt install python3-gi gir1.2-modemmanager-1.0")
-    sys.exit(1)
+from . import logs, metrics
+from .api import APIServer, MessageFeed
+from .archive import open_message_store, to_epoch
+from .config import Config
+from .journal import IngestJournal, JournalLockedError
+from .outbox import WebhookOutbox
+from .pipeline import Pipeline, Stage
+from .routing import RouteTable
+from .scheduler import PollScheduler
+from .search import SearchIndex, fts5_available
+from .sender import SendQueue, SendUnconfirmedError, SMSSender
+from .webhooks import CircuitOpenError, WebhookDispatcher
+from .stats import StatsCollector
+from .store import ProcessedStore, open_processed_store
+
+MM_DBUS_SERVICE = 'org.freedesktop.ModemManager1'
+MM_DBUS_PATH = '/org/freedesktop/ModemManager1'
+MM_DBUS_INTERFACE_MODEM = 'org.freedesktop.ModemManager1.Modem'
+MM_DBUS_INTERFACE_MESSAGING = 'org.freedesktop.ModemManager1.Modem.Messaging'
+MM_DBUS_INTERFACE_SMS = 'org.freedesktop.ModemManager1.Sms'
+
+# MMSmsState (siehe ModemManager-enums.h)
+MM_SMS_STATE_STORED = 1
+MM_SMS_STATE_RECEIVING = 2
+MM_SMS_STATE_RECEIVED = 3
+MM_SMS_STATE_SENDING = 4
+MM_SMS_STATE_SENT = 5
+
+# Zustände lokal erstellter (ausgehender) SMS, die der Ingest überspringt
+MM_SMS_OUTGOING_STATES = (MM_SMS_STATE_STORED, MM_SMS_STATE_SENDING, MM_SMS_STATE_SENT)
+
+# Optionen, deren Änderung beim Neuladen den Neuaufbau der Webhook-Zustellung auslöst
+WEBHOOK_OPTIONS = (
+    'webhooks', 'webhook_timeout', 'webhook_concurrency', 'circuit_breaker_threshold',
+    'circuit_breaker_reset', 'webhook_outbox', 'outbox_dir', 'webhook_workers',
+    'webhook_max_attempts', 'webhook_backoff_base', 'webhook_backoff_max', 'routes',
+    'route_default',
+)
+
+# Optionen, die erst nach einem Neustart wirksam werden
+RESTART_OPTIONS = (
+    'dbus_address', 'event_driven', 'sms_dir', 'message_store', 'message_db', 'export_txt',
+    'search_index', 'search_db', 'log_file', 'log_format', 'log_async', 'log_max_bytes',
+    'log_rotate_when', 'log_backup_count', 'enable_console_output', 'processed_db',
+    'processed_backend', 'processed_retention_days', 'processed_max_entries',
+    'processed_bloom', 'stats_file', 'stats_flush_interval', 'api_listen', 'api_buffer',
+    'api_feed_file', 'delete_concurrency', 'pipeline_queue_size', 'pipeline_parse_workers',
+    'pipeline_persist_workers', 'pipeline_notify_workers', 'journal_file', 'send_dir',
+    'api_send',
+)
+
+# GObject Introspection wird erst beim ersten D-Bus-Zugriff geladen (load_gi),
+# damit Offline-Befehle der CLI ohne den Import-Aufwand auskommen
+GLib = None
+Gio = None
+
+
+def load_gi():
+    """
+    GLib und Gio bei Bedarf importieren
+
+    Fehlt PyGObject oder die ModemManager-Typelib, wird das Programm mit
+    einem Installationshinweis beendet.
+    """
+    global GLib, Gio
+    if Gio is not None:
+        return
+
+    try:
+        import gi
+        gi.require_version('ModemManager', '1.0')
+        from gi.repository import GLib as glib, Gio as gio
+    except (ImportError, ValueError):
+        print("FEHLER: ModemManager GObject Introspection nicht gefunden!")
+        print("Installation: sudo apt install python3-gi gir1.2-modemmanager-1.0")
+        sys.exit(1)
+
+    GLib, Gio = glib, gio
+
+
+def open_bus(address: str = None):
+    """
+    Bus-Verbindung aufbauen
+
+    Args:
+        address: Adresse eines anderen Bus (``dbus_address``), sonst System-Bus
+
+    Returns:
+        Gio.DBusConnection
+    """
+    load_gi()
+    if address:
+        return Gio.DBusConnection.new_for_address_sync(
+            address,
+            Gio.DBusConnectionFlags.AUTHENTICATION_CLIENT |
+            Gio.DBusConnectionFlags.MESSAGE_BUS_CONNECTION,
+            None,
+            None
+        )
+    return Gio.bus_get_sync(Gio.BusType.SYSTEM, None)
+
+
+def create_manager_proxy(bus):
+    """Proxy für den ObjectManager von ModemManager"""
+    return Gio.DBusProxy.new_sync(
+        bus,
+        Gio.DBusProxyFlags.DO_NOT_LOAD_PROPERTIES,
+        None,
+        MM_DBUS_SERVICE,
+        MM_DBUS_PATH,
+        'org.freedesktop.DBus.ObjectManager',
+        None
+    )
+
+
+def list_modem_paths(objects: Dict) -> List[str]:
+    """
+    Modems mit Messaging-Interface aus einem GetManagedObjects-Ergebnis
+
+    Returns:
+        Modem-Pfade, nach mmcli -L Nummer sortiert
+    """
+    return sorted(
+        (path for path, interfaces in objects.items()
+         if '/Modem/' in path and MM_DBUS_INTERFACE_MESSAGING in interfaces),
+        key=lambda path: int(path.rsplit('/', 1)[-1])
+    )
+
+
+def select_modems(config: Config, modem_paths: List[str]) -> List:
+    """
+    Zu überwachende Modems gemäß Konfiguration auswählen
+
+    ``modems`` kann ``"all"`` oder eine Liste aus Indizes bzw. Objekten
+    mit ``index`` und ``label`` sein. Ohne ``modems`` wird wie bisher
+    nur ``modem_index`` verwendet.
+
+    Args:
+        config: Konfiguration
+        modem_paths: Verfügbare Modem-Pfade (sortiert)
+
+    Returns:
+        Liste von (Pfad, Label)-Tupeln
+    """
+    selection = config.get('modems')
+
+    if selection is None:
+        selection = [config.get('modem_index', 0)]
+    elif selection == 'all':
+        return [(path, None) for path in modem_paths]
+
+    selected = []
+    for entry in selection:
+        if not isinstance(entry, dict):
+            entry = {'index': entry}
+
+        index = entry.get('index', 0)
+        if index >= len(modem_paths):
+            logging.getLogger(__name__).error(
+                f"Modem-Index {index} ungültig. "
+                f"Verfügbare Modems: {len(modem_paths)}"
+            )
+            continue
+
+        selected.append((modem_paths[index], entry.get('label')))
+
+    return selected
+
+
+class ModemConnection:
+    """
+    Verbindung zu einem einzelnen Modem
+
+    Hält die D-Bus Proxies für Modem und Messaging. SMS-Objekte werden
+    ohne Proxy direkt über die Verbindung gelesen.
+    """
+
+    def __init__(self, bus, modem_path: str, label: str = None):
+        """
+        Args:
+            bus: Gio.DBusConnection
+            modem_path: D-Bus Pfad des Modems
+            label: Bezeichnung für Dateien und Webhooks (Standard: IMEI)
+        """
+        self.bus = bus
+        self.path = modem_path
+
+        # Modem-Proxy erstellen
+        self.modem_proxy = Gio.DBusProxy.new_sync(
+            bus,
+            Gio.DBusProxyFlags.NONE,
+            None,
+            MM_DBUS_SERVICE,
+            modem_path,
+            MM_DBUS_INTERFACE_MODEM,
+            None
+        )
+
+        # Messaging-Proxy erstellen
+        self.messaging_proxy = Gio.DBusProxy.new_sync(
+            bus,
+            Gio.DBusProxyFlags.NONE,
+            None,
+            MM_DBUS_SERVICE,
+            modem_path,
+            MM_DBUS_INTERFACE_MESSAGING,
+            None
+        )
+
+        self.label = label or self.get_property('EquipmentIdentifier') or \
+            f"modem{modem_path.rsplit('/', 1)[-1]}"
+        self.signal_ids = []
+        self.pending_sms = set()
+
+    def get_property(self, name: str):
+        """
+        Gecachte Property des Modem-Interfaces
+
+        Returns:
+            Entpackter Wert oder None
+        """
+        value = self.modem_proxy.get_cached_property(name)
+        return value.unpack() if value is not None else None
+
+    def describe(self) -> str:
+        """Hersteller und Modell (oder D-Bus Pfad)"""
+        manufacturer = self.get_property('Manufacturer')
+        model = self.get_property('Model')
+        if manufacturer and model:
+            return f"{manufacturer} {model}"
+        return self.path
+
+    def list_sms(self) -> List[str]:
+        """
+        DBus-Call: List() Methode aufrufen
+
+        Returns:
+            Liste von SMS-Pfaden
+        """
+        result = self.messaging_proxy.call_sync(
+            'List',
+            None,
+            Gio.DBusCallFlags.NONE,
+            -1,
+            None
+        )
+        return result[0] if result else []
+
+    def read_sms(self, sms_path: str) -> Dict:
+        """
+        SMS-Properties per Properties.GetAll lesen
+
+        Die Werte werden bei jedem Aufruf abgefragt und nicht aus einem
+        Proxy-Cache gelesen: dieser würde nur aktualisiert, während der
+        GLib-Hauptkontext läuft, und eine SMS im Zustand RECEIVING bliebe
+        im Polling-Betrieb dauerhaft unvollständig.
+
+        Args:
+            sms_path: DBus-Pfad zur SMS
+
+        Returns:
+            Dictionary mit SMS-Daten
+        """
+        result = self.bus.call_sync(
+            MM_DBUS_SERVICE,
+            sms_path,
+            'org.freedesktop.DBus.Properties',
+            'GetAll',
+            GLib.Variant('(s)', (MM_DBUS_INTERFACE_SMS,)),
+            GLib.VariantType('(a{sv})'),
+            Gio.DBusCallFlags.NONE,
+            -1,
+            None
+        )
+        props = result.unpack()[0]
+
+        return {
+            'path': sms_path,
+            'modem': self.label,
+            'number': props.get('Number') or '',
+            'text': props.get('Text') or '',
+            'timestamp': props.get('Timestamp') or '',
+            'state': props.get('State', 0)
+        }
+
+    def read_sms_batch(self, objects: Dict) -> Optional[List[Dict]]:
+        """
+        SMS des Modems aus einem GetManagedObjects-Ergebnis lesen
+
+        SMS-Objekte, die ModemManager nicht über den ObjectManager
+        exportiert, werden einzeln über read_sms() nachgeladen.
+
+        Args:
+            objects: Ergebnis von GetManagedObjects
+
+        Returns:
+            Liste von SMS-Daten oder None wenn das Modem fehlt
+        """
+        messaging = objects.get(self.path, {}).get(MM_DBUS_INTERFACE_MESSAGING)
+        if messaging is None:
+            return None
+
+        sms_paths = messaging.get('Messages')
+        if sms_paths is None:
+            sms_paths = self.list_sms()
+
+        batch = []
+        for sms_path in sms_paths:
+            props = objects.get(sms_path, {}).get(MM_DBUS_INTERFACE_SMS)
+
+            if props is None:
+                batch.append(self.read_sms(sms_path))
+                continue
+
+            batch.append({
+                'path': sms_path,
+                'modem': self.label,
+                'number': props.get('Number', ''),
+                'text': props.get('Text', ''),
+                'timestamp': props.get('Timestamp', ''),
+                'state': props.get('State', 0)
+            })
+
+        return batch
+
+    def delete_sms(self, sms_path: str):
+        """
+        DBus-Call: Delete() Methode aufrufen
+
+        Args:
+            sms_path: D-Bus Pfad der SMS
+        """
+        self.messaging_proxy.call_sync(
+            'Delete',
+            GLib.Variant('(o)', (sms_path,)),
+            Gio.DBusCallFlags.NONE,
+            -1,
+            None
+        )
+
+    def send_sms(self, number: str, text: str, timeout: int = -1) -> str:
+        """
+        SMS anlegen (Messaging.Create) und versenden (Sms.Send)
+
+        Die SMS wird danach wieder aus dem Modem-Speicher gelöscht, auch
+        wenn der Versand fehlschlägt. Meldet Send() einen Fehler (z.B.
+        Zeitüberschreitung), entscheidet der Zustand der SMS: SENT gilt als
+        Erfolg, STORED (nicht verschickt) als wiederholbarer Fehler, alles
+        andere als SendUnconfirmedError.
+
+        Args:
+            number: Empfängernummer
+            text: Nachricht
+            timeout: Timeout für Send() in Millisekunden (-1 = Standard)
+
+        Returns:
+            D-Bus Pfad der versendeten SMS
+
+        Raises:
+            SendUnconfirmedError wenn die SMS evtl. bereits verschickt ist
+        """
+        result = self.messaging_proxy.call_sync(
+            'Create',
+            GLib.Variant('(a{sv})', ({
+                'number': GLib.Variant('s', number),
+                'text': GLib.Variant('s', text)
+            },)),
+            Gio.DBusCallFlags.NONE,
+            -1,
+            None
+        )
+        sms_path = result.unpack()[0]
+
+        try:
+            # Nur für den einen Aufruf: Properties und Signale nicht laden
+            sms_proxy = Gio.DBusProxy.new_sync(
+                self.bus,
+                Gio.DBusProxyFlags.DO_NOT_LOAD_PROPERTIES |
+                Gio.DBusProxyFlags.DO_NOT_CONNECT_SIGNALS,
+                None,
+                MM_DBUS_SERVICE,
+                sms_path,
+                MM_DBUS_INTERFACE_SMS,
+                None
+            )
+            try:
+                sms_proxy.call_sync('Send', None, Gio.DBusCallFlags.NONE, timeout, None)
+            except Exception as e:
+                try:
+                    state = self.read_sms(sms_path)['state']
+                except Exception:
+                    state = None
+
+                if state == MM_SMS_STATE_SENT:
+                    logging.getLogger(__name__).warning(
+                        f"Send() fehlgeschlagen, SMS {sms_path} ist aber versendet: {e}"
+                    )
+                elif state == MM_SMS_STATE_STORED:
+                    raise
+                else:
+                    raise SendUnconfirmedError(
+                        f"Versandstatus unklar (State {state}): {e}"
+                    ) from e
+        finally:
+            try:
+                self.delete_sms(sms_path)
+            except Exception as e:
+                logging.getLogger(__name__).debug(f"Gesendete SMS {sms_path} nicht gelöscht: {e}")
+
+        return sms_path
+
+
+def connect_modems(config: Config) -> List[ModemConnection]:
+    """
+    Konfigurierte Modems verbinden, ohne den Monitor aufzubauen
+
+    Für Befehle wie ``sms-monitor modem-info``, die weder Ablage noch
+    Journal, Outbox oder Versand öffnen dürfen.
+
+    Returns:
+        Liste verbundener Modems (leer wenn keines gefunden wurde)
+    """
+    bus = open_bus(config.get('dbus_address'))
+    result = create_manager_proxy(bus).call_sync(
+        'GetManagedObjects',
+        None,
+        Gio.DBusCallFlags.NONE,
+        -1,
+        None
+    )
+    modem_paths = list_modem_paths(result[0])
+    return [
+        ModemConnection(bus, path, label)
+        for path, label in select_modems(config, modem_paths)
+    ]
+
+
+class ModemWorker:
+    """
+    Ingest-Worker für ein Modem
+
+    Verarbeitet Durchläufe und per Signal gemeldete SMS eines Modems in
+    einem eigenen Thread, sodass mehrere Modems parallel arbeiten.
+    """
+
+    _STOP = object()
+    _SWEEP = object()
+
+    def __init__(self, monitor: 'SMSMonitor', modem: ModemConnection):
+        self.monitor = monitor
+        self.modem = modem
+        self.queue = queue.Queue()
+        self.deleter = ModemDeleter(
+            monitor, modem, monitor.config.get('delete_concurrency', 4),
+            monitor.config.get('pipeline_queue_size', 200)
+        )
+        self._sweep_queued = False
+        self._sweeping = False
+        self._lock = threading.Lock()
+        self.thread = threading.Thread(
+            target=self._run, name=f"ingest-{modem.label}", daemon=True
+        )
+
+    def start(self):
+        self.deleter.start()
+        self.thread.start()
+
+    def submit_sweep(self):
+        """Durchlauf über den Modem-Speicher anfordern (zusammengefasst)"""
+        with self._lock:
+            if self._sweep_queued:
+                return
+            self._sweep_queued = True
+        self.queue.put(self._SWEEP)
+
+    def submit_sms(self, sms_path: str):
+        """Per Signal gemeldete SMS einreihen"""
+        self.queue.put(sms_path)
+
+    def sweep_pending(self) -> bool:
+        """True solange ein angeforderter Durchlauf wartet oder läuft"""
+        with self._lock:
+            return self._sweep_queued or self._sweeping
+
+    def stop(self, drain_timeout: float = 0):
+        """
+        Worker beenden
+
+        Args:
+            drain_timeout: Maximale Wartezeit für ausstehende Löschungen
+        """
+        self.stop_ingest()
+        self.deleter.stop(drain_timeout)
+
+    def stop_ingest(self):
+        """Nur den Ingest-Thread beenden (Löschungen laufen weiter)"""
+        self.queue.put(self._STOP)
+        self.thread.join(timeout=30)
+
+    def _run(self):
+        while True:
+            item = self.queue.get()
+            if item is self._STOP:
+                return
+
+            try:
+                if item is self._SWEEP:
+                    with self._lock:
+                        self._sweep_queued = False
+                        self._sweeping = True
+                    try:
+                        self.monitor.process_sms(self.modem)
+                    finally:
+                        with self._lock:
+                            self._sweeping = False
+                else:
+                    self.monitor._ingest_signalled(item, self.modem)
+            except Exception as e:
+                self.monitor.logger.error(
+                    f"Fehler im Ingest-Worker ({self.modem.label}): {e}", exc_info=True
+                )
+
+
+class ModemDeleter:
+    """
+    Löschen verarbeiteter SMS aus dem Modem-Speicher
+
+    Löschungen laufen nicht im Ingest-Thread, sondern in bis zu
+    ``concurrency`` eigenen Threads gleichzeitig; der Ingest liest währenddessen
+    bereits die nächsten SMS. Fehlgeschlagene Löschungen werden mit
+    wachsendem Abstand wiederholt (``delete_max_attempts``,
+    ``delete_retry_delay``), danach übernimmt der nächste Durchlauf.
+    """
+
+    def __init__(self, monitor: 'SMSMonitor', modem: ModemConnection, concurrency: int = 4,
+                 capacity: int = 200):
+        self.monitor = monitor
+        self.modem = modem
+        self.concurrency = max(concurrency, 1)
+        self.capacity = max(capacity, 1)
+        self._queue = []
+        self._pending = set()
+        self._attempts = {}
+        self._in_flight = 0
+        self._seq = itertools.count()
+        self._running = False
+        self._threads = []
+        self._cond = threading.Condition()
+
+    def __len__(self) -> int:
+        with self._cond:
+            return len(self._pending)
+
+    def is_pending(self, sms_path: str) -> bool:
+        """True wenn die Löschung der SMS noch aussteht"""
+        with self._cond:
+            return sms_path in self._pending
+
+    def submit(self, sms_path: str):
+        """
+        Löschung einreihen (doppelte Aufträge werden ignoriert)
+
+        Blockiert, solange ``capacity`` Löschungen ausstehen (Backpressure
+        auf die Ingest-Pipeline).
+        """
+        with self._cond:
+            while self._running and len(self._pending) >= self.capacity \
+                    and sms_path not in self._pending:
+                self._cond.wait()
+            if sms_path in self._pending:
+                return
+            self._pending.add(sms_path)
+            heapq.heappush(self._queue, (time.monotonic(), next(self._seq), sms_path))
+            self._update_metric()
+            self._cond.notify()
+
+    def _update_metric(self):
+        metrics.DELETE_PENDING.set(len(self._pending), modem=self.modem.label)
+
+    def _next(self) -> Optional[str]:
+        """Nächste fällige Löschung holen (blockiert bis fällig oder Stopp)"""
+        with self._cond:
+            while self._running:
+                if not self._queue:
+                    self._cond.wait()
+                    continue
+
+                due, _, sms_path = self._queue[0]
+                delay = due - time.monotonic()
+                if delay > 0:
+                    self._cond.wait(delay)
+                    continue
+
+                heapq.heappop(self._queue)
+                self._in_flight += 1
+                return sms_path
+
+        return None
+
+    def _finish(self, sms_path: str, success: bool):
+        with self._cond:
+            self._in_flight -= 1
+
+            if success:
+                self._pending.discard(sms_path)
+                self._attempts.pop(sms_path, None)
+            else:
+                metrics.DELETE_FAILURES.inc(modem=self.modem.label)
+                attempts = self._attempts.get(sms_path, 0) + 1
+                max_attempts = self.monitor.config.get('delete_max_attempts', 5)
+
+                if attempts >= max_attempts:
+                    self.monitor.logger.error(
+                        f"SMS nach {attempts} Versuchen nicht gelöscht [{self.modem.label}]: "
+                        f"{sms_path} (nächster Durchlauf versucht es erneut)"
+                    )
+                    self._pending.discard(sms_path)
+                    self._attempts.pop(sms_path, None)
+                else:
+                    self._attempts[sms_path] = attempts
+                    delay = self.monitor.config.get('delete_retry_delay', 2) * 2 ** (attempts - 1)
+                    heapq.heappush(
+                        self._queue, (time.monotonic() + delay, next(self._seq), sms_path)
+                    )
+
+            self._update_metric()
+            self._cond.notify_all()
+
+    def _run(self):
+        while True:
+            sms_path = self._next()
+            if sms_path is None:
+                return
+
+            success = False
+            try:
+                success = self.monitor.delete_sms(sms_path, self.modem)
+            finally:
+                self._finish(sms_path, success)
+
+    def start(self):
+        if self._running:
+            return
+
+        self._running = True
+        for i in range(self.concurrency):
+            thread = threading.Thread(
+                target=self._run, name=f"delete-{self.modem.label}-{i}", daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout: float = 0):
+        """
+        Lösch-Threads beenden
+
+        Args:
+            timeout: Maximale Wartezeit in Sekunden, bis fällige Löschungen
+                erledigt sind (0 = nicht warten). Nicht gelöschte SMS bleiben
+                auf dem Modem und werden beim nächsten Start als Duplikat
+                erkannt und gelöscht.
+        """
+        deadline = time.monotonic() + timeout
+
+        with self._cond:
+            while self._running:
+                due = self._queue and self._queue[0][0] <= time.monotonic()
+                remaining = deadline - time.monotonic()
+                if not (due or self._in_flight) or remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+
+            self._running = False
+            self._cond.notify_all()
+
+        for thread in self._threads:
+            thread.join(timeout=5)
+        self._threads = []
+
+
+class SMSMonitor:
+    """
+    SMS-Monitor für ModemManager-kompatible USB-Modems
+
+    Empfängt, speichert und verwaltet SMS-Nachrichten von USB 4G/LTE Modems.
+    """
+
+    def __init__(self, config: Config = None, daemon: bool = True):
+        """
+        Initialisiert den SMS-Monitor
+
+        Args:
+            config: Config-Objekt (optional)
+            daemon: False für einmalige Befehle (z.B. check): keine
+                Webhook-Outbox und kein Versand, Webhooks werden direkt
+                zugestellt; outbox_dir und send_dir bleiben dem Daemon
+        """
+        self.config = config or Config()
+        self.daemon = daemon
+        self.setup_logging()
+        self.setup_directories()
+        self.processed_sms = self._load_processed()
+        self.message_store = open_message_store(self.config)
+        self.search_index = self._create_search_index()
+        self.stats = self._create_stats()
+        self.dispatcher = self._create_dispatcher()
+        self.routes = self._create_routes()
+        self.outbox = self._create_outbox()
+        self.feed = self._create_feed()
+        self.journal = self._open_journal()
+        self.sender = self._create_sender()
+        self.metrics_server = None
+        self.api_server = None
+        self.modem = None
+        self.messaging = None
+        self.modems = []
+        self.workers = {}
+        # Beendende Worker getrennter Modems (siehe _unbind_modem)
+        self._retiring = set()
+        self._retiring_lock = threading.Lock()
+        self.pipeline = None
+        self.running = True
+        self.loop = None
+        self.bus = None
+        self.manager_proxy = None
+        self._signal_ids = []
+        self._workers_started = False
+        self._reconcile_pending = False
+        self._dedupe_lock = threading.Lock()
+        self._in_progress = set()
+        self._queued_paths = set()
+        self.messages_ingested = 0
+        self.fetch_errors = 0
+        self._wakeup = threading.Event()
+        self._commit_lock = threading.Lock()
+        # Journal-Eintrag und Speicherung einer SMS vs. Checkpoint
+        self._persist_cond = threading.Condition()
+        self._persisting = 0
+        self._checkpointing = False
+        # Schützt Commit-Zähler, zurückgehaltene Löschungen und _uncommitted
+        self._delete_lock = threading.Lock()
+        self._commits_started = 0
+        self._commits_done = 0
+        self._awaiting_commit = []
+        self._uncommitted = 0
+        self._last_commit = time.monotonic()
+        self._sweep_source = None
+        self._watch_source = None
+        self._reload_requested = False
+        self._reload_lock = threading.Lock()
+        # Serialisiert Übergaben zwischen alter und neuer Outbox
+        self._outbox_lock = threading.Lock()
+        self._config_stamp = self._read_config_stamp()
+        self._recover_journal()
+
+        self.logger.info("SMS-Monitor initialisiert")
+
+    def setup_logging(self):
+        """
+        Logging-System konfigurieren
+
+        Datei- und Konsolenausgabe laufen standardmäßig in einem
+        Hintergrund-Thread (log_async), optional rotiert und als JSON.
+        """
+        self.log_listener = logs.setup_logging(self.config)
+        self.logger = logging.getLogger(__name__)
+
+    def setup_directories(self):
+        """Benötigte Verzeichnisse erstellen"""
+        sms_dir = Path(self.config.get('sms_dir'))
+        sms_dir.mkdir(parents=True, exist_ok=True)
+
+        processed_db = Path(self.config.get('processed_db'))
+        processed_db.parent.mkdir(parents=True, exist_ok=True)
+
+        Path(self.config.get('stats_file')).parent.mkdir(parents=True, exist_ok=True)
+
+        if self.config.get('message_store', 'files') == 'sqlite':
+            Path(self.config.get('message_db')).parent.mkdir(parents=True, exist_ok=True)
+
+        if self.config.get('search_index', True):
+            Path(self.config.get('search_db')).parent.mkdir(parents=True, exist_ok=True)
+
+        if self.config.get('webhook_outbox', True) and self.config.get('webhooks'):
+            Path(self.config.get('outbox_dir')).mkdir(parents=True, exist_ok=True)
+
+        if self.config.get('api_listen') and self.config.get('api_feed_file'):
+            Path(self.config.get('api_feed_file')).parent.mkdir(parents=True, exist_ok=True)
+
+        if self.config.get('journal_file'):
+            Path(self.config.get('journal_file')).parent.mkdir(parents=True, exist_ok=True)
+
+        self.logger.debug("Verzeichnisse eingerichtet")
+
+    def _load_processed(self) -> ProcessedStore:
+        """
+        Datenbank verarbeiteter SMS öffnen
+
+        Eine vorhandene processed.json wird beim ersten Start einmalig in
+        das konfigurierte Backend übernommen. Alte Einträge werden gemäß
+        processed_retention_days / processed_max_entries verworfen.
+
+        Returns:
+            ProcessedStore mit verarbeiteten SMS
+        """
+        return open_processed_store(
+            self.config.get('processed_db'),
+            self.config.get('processed_backend', 'sqlite'),
+            retention_days=self.config.get('processed_retention_days'),
+            max_entries=self.config.get('processed_max_entries'),
+            bloom=self.config.get('processed_bloom', False)
+        )
+
+    def _create_search_index(self) -> Optional[SearchIndex]:
+        """
+        Volltext-Index öffnen (falls aktiviert)
+
+        Returns:
+            SearchIndex oder None
+        """
+        if not self.config.get('search_index', True):
+            return None
+
+        if not fts5_available():
+            self.logger.warning("SQLite ohne FTS5-Unterstützung, Volltextsuche deaktiviert")
+            return None
+
+        try:
+            return SearchIndex(self.config.get('search_db'))
+        except Exception as e:
+            self.logger.error(f"Suchindex konnte nicht geöffnet werden: {e}")
+            return None
+
+    def _create_stats(self) -> StatsCollector:
+        """
+        Statistik-Zähler laden
+
+        Beim ersten Start wird die Gesamtzahl aus der Processed-DB übernommen.
+
+        Returns:
+            StatsCollector
+        """
+        stats = StatsCollector(
+            self.config.get('stats_file'),
+            flush_interval=self.config.get('stats_flush_interval', 10)
+        )
+        if not stats.exists:
+            stats.seed_total(len(self.processed_sms))
+        return stats
+
+    def _save_processed(self):
+        """
+        Gruppen-Commit: Ablage, Processed-DB und Journal sichern
+
+        Erst danach werden die SMS, die bis zum Beginn des Commits
+        verarbeitet wurden, vom Modem gelöscht.
+        """
+        with self._commit_lock:
+            with self._delete_lock:
+                self._commits_started += 1
+                commit_id = self._commits_started
+                self._uncommitted = 0
+            self._last_commit = time.monotonic()
+
+            durable = False
+            try:
+                # SMS-Ablage zuerst, damit nichts als verarbeitet gilt, das fehlt
+                self.message_store.commit()
+                self.processed_sms.commit()
+                self._sync_durable()
+                durable = True
+            except Exception as e:
+                self.logger.error(f"Fehler beim Speichern der Processed-DB: {e}")
+
+            if self.search_index is not None:
+                try:
+                    self.search_index.commit()
+                except Exception as e:
+                    self.logger.error(f"Fehler beim Speichern des Suchindex: {e}")
+
+            self._commit_feed()
+            self.stats.maybe_flush()
+
+        if durable:
+            self._release_deletes(commit_id)
+
+    def _sync_durable(self):
+        """
+        Verarbeitete SMS auf den Datenträger schreiben
+
+        Mit Journal genügt dessen fsync (eine Datei, sequentiell); die
+        Ablage wird erst beim Checkpoint synchronisiert. Ohne Journal wird
+        die Ablage bei jedem Commit synchronisiert.
+        """
+        if self.journal is None:
+            self.message_store.sync()
+            return
+
+        self.journal.sync()
+        if len(self.journal) >= self.config.get('journal_checkpoint', 1000):
+            self._checkpoint_journal()
+
+    def _checkpoint_journal(self):
+        """
+        Ablage synchronisieren und Journal leeren
+
+        Wartet, bis jede bereits ins Journal geschriebene SMS auch in der
+        Ablage ist; neue SMS warten solange. Sonst könnte der Checkpoint den
+        Eintrag einer SMS entfernen, deren Speicherung erst nach dem sync()
+        der Ablage erfolgt.
+        """
+        with self._persist_cond:
+            self._checkpointing = True
+            self._persist_cond.wait_for(lambda: not self._persisting)
+        try:
+            self.message_store.sync()
+            self.journal.checkpoint()
+        finally:
+            with self._persist_cond:
+                self._checkpointing = False
+                self._persist_cond.notify_all()
+        self.logger.debug("Ingest-Journal: Checkpoint")
+
+    def _maybe_commit(self):
+        """
+        Commit gemäß ``durability`` nach jeder verarbeiteten SMS
+
+        - ``message``: sofort (fsync pro SMS)
+        - ``cycle``: am Ende des Durchlaufs bzw. wenn die Pipeline leerläuft,
+          spätestens alle ``pipeline_queue_size`` SMS
+        - ``interval``: zusätzlich spätestens alle ``durability_interval_ms``
+        """
+        durability = self.config.get('durability', 'cycle')
+        with self._delete_lock:
+            self._uncommitted += 1
+            uncommitted = self._uncommitted
+
+        if durability == 'message':
+            self._save_processed()
+        elif durability == 'interval':
+            interval = self.config.get('durability_interval_ms', 200) / 1000
+            if time.monotonic() - self._last_commit >= interval:
+                self._save_processed()
+        elif uncommitted >= self.config.get('pipeline_queue_size', 200):
+            self._save_processed()
+
+    def _commit_mark(self) -> int:
+        """Stand der Commits nach dem Speichern einer SMS (für _delete_after_commit)"""
+        with self._delete_lock:
+            return self._commits_started
+
+    def _delete_after_commit(self, sms_path: str, modem: Optional[ModemConnection], mark: int):
+        """
+        SMS löschen, sobald ein nach ihrer Speicherung begonnener Commit
+        abgeschlossen ist
+
+        Args:
+            sms_path: D-Bus Pfad der SMS
+            modem: Modem der SMS
+            mark: Ergebnis von _commit_mark() nach der Speicherung
+        """
+        with self._delete_lock:
+            if self._commits_done <= mark:
+                self._awaiting_commit.append((mark, sms_path, modem))
+                return
+        self.request_delete(sms_path, modem)
+
+    def _release_deletes(self, commit_id: int):
+        """Nach einem Commit zurückgehaltene Löschungen freigeben"""
+        with self._delete_lock:
+            self._commits_done = max(self._commits_done, commit_id)
+            ready = [entry for entry in self._awaiting_commit if entry[0] < commit_id]
+            self._awaiting_commit = [
+                entry for entry in self._awaiting_commit if entry[0] >= commit_id
+            ]
+
+        for _, sms_path, modem in ready:
+            self.request_delete(sms_path, modem)
+
+    def _open_journal(self) -> Optional[IngestJournal]:
+        """
+        Ingest-Journal öffnen (falls journal_file konfiguriert ist)
+
+        Returns:
+            IngestJournal oder None
+        """
+        path = self.config.get('journal_file')
+        if not path:
+            return None
+
+        try:
+            return IngestJournal(path)
+        except JournalLockedError:
+            # Läuft z.B. neben dem Daemon: dessen Journal nicht anfassen
+            self.logger.info(
+                f"Ingest-Journal {path} gehört einem anderen Prozess, "
+                f"Verarbeitung ohne Journal"
+            )
+            return None
+        except Exception as e:
+            self.logger.error(f"Ingest-Journal {path} konnte nicht geöffnet werden: {e}")
+            return None
+
+    def _recover_journal(self):
+        """
+        Nach einem Absturz SMS aus dem Journal wiederherstellen
+
+        SMS, die bereits vollständig in der Ablage sind, werden nur als
+        verarbeitet markiert; fehlende werden gespeichert und gemeldet.
+        """
+        if self.journal is None or not self.journal.recovered():
+            return
+
+        restored = 0
+        for sms_data in self.journal.recovered():
+            try:
+                if self.message_store.contains(sms_data):
+                    if not self.is_processed(sms_data):
+                        self.processed_sms.add(self.sms_key(sms_data))
+                    continue
+
+                if self.save_sms(sms_data):
+                    self.stats.record_message(sms_data)
+                    self.notify_sms(sms_data)
+                    restored += 1
+            except Exception as e:
+                self.logger.error(f"SMS aus dem Journal nicht wiederhergestellt: {e}")
+
+        try:
+            self.message_store.commit()
+            self.processed_sms.commit()
+            self._checkpoint_journal()
+            self._commit_feed()
+        except Exception as e:
+            self.logger.error(f"Fehler beim Abschließen der Journal-Wiederherstellung: {e}")
+            return
+
+        if restored:
+            self.logger.warning(f"{restored} SMS aus dem Ingest-Journal wiederhergestellt")
+
+    def _commit_feed(self):
+        """Neue Einträge des SMS-Feeds sichern"""
+        if self.feed is not None:
+            try:
+                self.feed.commit()
+            except Exception as e:
+                self.logger.error(f"Fehler beim Speichern des SMS-Feeds: {e}")
+
+    def get_bus(self):
+        """
+        Gemeinsame Bus-Verbindung (einmalig aufgebaut)
+
+        Standardmäßig der System-Bus; mit ``dbus_address`` ein beliebiger
+        Bus (z.B. ein privater Session-Bus für Tests und Benchmarks).
+
+        Returns:
+            Gio.DBusConnection
+        """
+        if self.bus is None or self.bus.is_closed():
+            self.bus = open_bus(self.config.get('dbus_address'))
+        return self.bus
+
+    def get_managed_objects(self) -> Dict:
+        """
+        Alle von ModemManager verwalteten Objekte abrufen
+
+        Returns:
+            Dictionary Pfad -> Interfaces -> Properties
+        """
+        result = self.manager_proxy.call_sync(
+            'GetManagedObjects',
+            None,
+            Gio.DBusCallFlags.NONE,
+            -1,
+            None
+        )
+        return result[0]
+
+    def _select_modems(self, modem_paths: List[str]) -> List:
+        """Zu überwachende Modems gemäß Konfiguration (siehe select_modems)"""
+        return select_modems(self.config, modem_paths)
+
+    def connect_modem(self) -> bool:
+        """
+        Verbindung zu den konfigurierten Modems herstellen
+
+        Returns:
+            True wenn mindestens ein Modem verbunden wurde, False bei Fehler
+        """
+        try:
+            # System-Bus verbinden
+            bus = self.get_bus()
+
+            # ModemManager ObjectManager
+            self.manager_proxy = create_manager_proxy(bus)
+
+            self.reconcile_modems()
+
+            if not self.modems:
+                self.logger.error("Kein Modem gefunden. Ist das USB-Modem angeschlossen?")
+                return False
+
+            return True
+
+        except Exception as e:
+            self.logger.error(f"Modem-Verbindung fehlgeschlagen: {e}")
+            return False
+
+    def reconcile_modems(self):
+        """
+        Verbundene Modems mit dem aktuellen Zustand von ModemManager
+        abgleichen
+
+        Entfernte Modems werden abgemeldet, neue (oder nach einem Reset
+        zurückgekehrte) Modems gebunden und ihr Speicher sofort abgearbeitet.
+        """
+        objects = self.get_managed_objects()
+
+        # Nur Modems mit Messaging-Interface (nach mmcli -L Nummer sortiert)
+        modem_paths = list_modem_paths(objects)
+        wanted = self._select_modems(modem_paths) if modem_paths else []
+        wanted_paths = {path for path, _ in wanted}
+
+        for modem in list(self.modems):
+            if modem.path not in wanted_paths:
+                self._unbind_modem(modem)
+
+        for modem_path, label in wanted:
+            modem = self._modem_by_path(modem_path)
+            if not modem:
+                self._bind_modem(modem_path, label)
+            elif label and modem.label != label:
+                # Geändertes Label aus neu geladener Konfiguration
+                modem.label = label
+
+        self._update_primary()
+
+    def _bind_modem(self, modem_path: str, label: str = None):
+        """Modem verbinden und ggf. Signale und Worker einrichten"""
+        modem = ModemConnection(self.get_bus(), modem_path, label)
+        self.modems.append(modem)
+        self.logger.info(f"Modem verbunden [{modem.label}]: {modem.describe()}")
+
+        if self._signal_ids:
+            self._subscribe_modem(modem)
+
+        if self._workers_started:
+            worker = ModemWorker(self, modem)
+            worker.start()
+            self.workers[modem.path] = worker
+            # Rückstau nach Reconnect sofort abarbeiten
+            worker.submit_sweep()
+
+    def _unbind_modem(self, modem: ModemConnection):
+        """Modem abmelden (z.B. nach USB-Reset)"""
+        self.logger.warning(f"Modem getrennt [{modem.label}]: {modem.path}")
+
+        self._unsubscribe_modem(modem)
+        self.modems.remove(modem)
+
+        worker = self.workers.pop(modem.path, None)
+        if worker:
+            # Modem ist weg, ausstehende Löschungen wären vergeblich. Das
+            # Beenden wartet auf laufende D-Bus-Aufrufe und läuft deshalb
+            # nicht im GLib-Mainloop, der die übrigen Modems bedient.
+            thread = threading.Thread(
+                target=self._retire_worker, args=(worker,),
+                name=f"retire-{modem.label}", daemon=True
+            )
+            with self._retiring_lock:
+                self._retiring.add(thread)
+            thread.start()
+
+    def _retire_worker(self, worker: 'ModemWorker'):
+        """Worker eines getrennten Modems im Hintergrund beenden"""
+        try:
+            worker.stop()
+        except Exception as e:
+            self.logger.error(f"Worker [{worker.modem.label}] nicht beendet: {e}")
+        finally:
+            with self._retiring_lock:
+                self._retiring.discard(threading.current_thread())
+
+    def _update_primary(self):
+        """Kompatibilitäts-Attribute auf das erste Modem setzen"""
+        primary = self.modems[0] if self.modems else None
+        self.modem_proxy = primary.modem_proxy if primary else None
+        self.messaging_proxy = primary.messaging_proxy if primary else None
+        self.modem = self.modem_proxy
+        self.messaging = self.messaging_proxy
+        self.modem_path = primary.path if primary else None
+
+    def _resolve_modem(self, modem: Optional[ModemConnection]) -> Optional[ModemConnection]:
+        """Standardmäßig das erste verbundene Modem verwenden"""
+        if modem is not None:
+            return modem
+        return self.modems[0] if self.modems else None
+
+    def get_sms_list(self, modem: ModemConnection = None) -> List:
+        """
+        Liste aller SMS vom Modem abrufen
+
+        Args:
+            modem: Modem (Standard: erstes Modem)
+
+        Returns:
+            Liste von SMS-Pfaden
+        """
+        try:
+            modem = self._resolve_modem(modem)
+            if not modem:
+                self.logger.error("Messaging-Interface nicht verfügbar")
+                self._record_fetch_error()
+                return []
+
+            with metrics.DBUS_CALL_SECONDS.time(call='list'):
+                return modem.list_sms()
+
+        except Exception as e:
+            self.logger.error(f"SMS-Liste konnte nicht abgerufen werden: {e}")
+            self._record_fetch_error()
+            return []
+
+    def _record_fetch_error(self):
+        """Fehlgeschlagenen Abruf zählen (Backoff im Polling-Betrieb)"""
+        with self._dedupe_lock:
+            self.fetch_errors += 1
+
+    def parse_sms(self, sms_path: str, modem: ModemConnection = None) -> Optional[Dict]:
+        """
+        SMS-Daten extrahieren
+
+        Args:
+            sms_path: DBus-Pfad zur SMS
+            modem: Modem (Standard: erstes Modem)
+
+        Returns:
+            Dictionary mit SMS-Daten oder None bei Fehler
+        """
+        try:
+            with metrics.DBUS_CALL_SECONDS.time(call='read'):
+                return self._resolve_modem(modem).read_sms(sms_path)
+        except Exception as e:
+            self.logger.error(f"SMS-Parsing fehlgeschlagen: {e}")
+            return None
+
+    def fetch_sms_batch(self, modem: ModemConnection = None) -> Optional[List[Dict]]:
+        """
+        Alle SMS des Modems inkl. Properties mit einem einzigen
+        GetManagedObjects-Aufruf abrufen
+
+        Args:
+            modem: Modem (Standard: erstes Modem)
+
+        Returns:
+            Liste von SMS-Daten oder None bei Fehler
+        """
+        try:
+            modem = self._resolve_modem(modem)
+            with metrics.DBUS_CALL_SECONDS.time(call='fetch_batch'):
+                batch = modem.read_sms_batch(self.get_managed_objects())
+            if batch is None:
+                self.logger.error(f"Messaging-Interface nicht verfügbar [{modem.label}]")
+            return batch
+
+        except Exception as e:
+            self.logger.error(f"SMS-Sammelabruf fehlgeschlagen: {e}")
+            self._record_fetch_error()
+            return None
+
+    @staticmethod
+    def sms_key(sms_data: Dict) -> str:
+        """Schlüssel für die Duplikaterkennung (modemübergreifend)"""
+        return f"{sms_data['number']}_{sms_data['timestamp']}"
+
+    def is_processed(self, sms_data: Dict) -> bool:
+        """
+        Prüfen ob SMS bereits verarbeitet wurde
+
+        Args:
+            sms_data: SMS-Daten
+
+        Returns:
+            True wenn bereits verarbeitet
+        """
+        return self.sms_key(sms_data) in self.processed_sms
+
+    def save_sms(self, sms_data: Dict) -> Optional[str]:
+        """
+        SMS in der konfigurierten Ablage speichern
+
+        Args:
+            sms_data: SMS-Daten
+
+        Returns:
+            Speicherort (Dateipfad bzw. Datenbank-Referenz) oder None bei Fehler
+        """
+        try:
+            with metrics.SAVE_SECONDS.time():
+                location = self.message_store.save(sms_data)
+                self.logger.info(f"SMS gespeichert: {location}")
+
+                # Als verarbeitet markieren
+                self.processed_sms.add(self.sms_key(sms_data))
+
+            metrics.MESSAGES_SAVED.inc(modem=sms_data.get('modem', ''))
+            self._index_sms(sms_data, location)
+            received = to_epoch(sms_data['timestamp'])
+            if received is not None:
+                metrics.INGEST_LAG_SECONDS.observe(max(0, time.time() - received))
+
+            return location
+
+        except Exception as e:
+            self.logger.error(f"SMS-Speicherung fehlgeschlagen: {e}")
+            return None
+
+    def _index_sms(self, sms_data: Dict, location: str):
+        """SMS in den Suchindex aufnehmen (Fehler sind nicht kritisch)"""
+        if self.search_index is None:
+            return
+
+        try:
+            self.search_index.add(sms_data, location)
+        except Exception as e:
+            self.logger.warning(f"SMS konnte nicht indiziert werden: {e}")
+
+    def delete_sms(self, sms_path: str, modem: ModemConnection = None) -> bool:
+        """
+        SMS vom Modem löschen
+
+        Args:
+            sms_path: D-Bus Pfad der SMS
+            modem: Modem (Standard: erstes Modem)
+
+        Returns:
+            True wenn erfolgreich
+        """
+        try:
+            modem = self._resolve_modem(modem)
+            if not modem:
+                return False
+
+            with metrics.DBUS_CALL_SECONDS.time(call='delete'):
+                modem.delete_sms(sms_path)
+            self.logger.debug(f"SMS vom Modem gelöscht: {sms_path}")
+            return True
+
+        except Exception as e:
+            self.logger.error(f"SMS-Löschung fehlgeschlagen: {e}")
+            return False
+
+    def request_delete(self, sms_path: str, modem: ModemConnection = None):
+        """
+        SMS zum Löschen vormerken
+
+        Laufen Ingest-Worker, übernimmt der Lösch-Pool des Modems den
+        Aufruf im Hintergrund; sonst wird direkt gelöscht.
+
+        Args:
+            sms_path: D-Bus Pfad der SMS
+            modem: Modem (Standard: erstes Modem)
+        """
+        modem = self._resolve_modem(modem)
+        worker = self.workers.get(modem.path) if modem else None
+        if worker is not None:
+            worker.deleter.submit(sms_path)
+        else:
+            self.delete_sms(sms_path, modem)
+
+    def _create_dispatcher(self) -> Optional[WebhookDispatcher]:
+        """
+        Webhook-Dispatcher erstellen (falls Webhooks konfiguriert sind)
+
+        Returns:
+            WebhookDispatcher oder None
+        """
+        webhooks = self.config.get('webhooks', [])
+        if not webhooks:
+            return None
+
+        try:
+            import requests  # noqa: F401
+        except ImportError:
+            self.logger.warning(
+                "requests-Bibliothek nicht installiert, Webhooks deaktiviert. "
+                "Installation: pip install requests"
+            )
+            return None
+
+        return WebhookDispatcher(
+            webhooks,
+            timeout=self.config.get('webhook_timeout', 5),
+            concurrency=self.config.get('webhook_concurrency', 4),
+            failure_threshold=self.config.get('circuit_breaker_threshold', 5),
+            reset_timeout=self.config.get('circuit_breaker_reset', 30)
+        )
+
+    def _create_routes(self) -> Optional[RouteTable]:
+        """
+        Routing-Regeln übersetzen (falls konfiguriert)
+
+        Returns:
+            RouteTable oder None (keine Regeln: alle SMS an alle Webhooks)
+
+        Raises:
+            ValueError bei ungültigen Regeln; diese werden bereits beim
+            Laden der Konfiguration abgewiesen. Ohne gültige Regeln wird
+            nie an alle Webhooks zugestellt.
+        """
+        routes = self.config.get('routes')
+        if not self.config.get('webhooks') or not routes:
+            return None
+
+        table = RouteTable(
+            routes,
+            self.config.get('webhooks', []),
+            default=self.config.get('route_default', 'all')
+        )
+        self.logger.info(f"{len(table)} Routing-Regel(n) geladen")
+        return table
+
+    def _create_outbox(self) -> Optional[WebhookOutbox]:
+        """
+        Persistente Webhook-Outbox erstellen (falls aktiviert)
+
+        Returns:
+            WebhookOutbox oder None
+        """
+        if not self.dispatcher or not self.daemon:
+            return None
+
+        if not self.config.get('webhook_outbox', True):
+            batched = [e.name for e in self.dispatcher.endpoints.values() if e.batched]
+            if batched:
+                self.logger.warning(
+                    f"Batch-Modus nur mit webhook_outbox wirksam, "
+                    f"einzelne Zustellung an: {', '.join(batched)}"
+                )
+            return None
+
+        return WebhookOutbox(
+            self.config.get('outbox_dir'),
+            self._post_webhook,
+            workers=self.config.get('webhook_workers', 2),
+            max_attempts=self.config.get('webhook_max_attempts', 10),
+            backoff_base=self.config.get('webhook_backoff_base', 5),
+            backoff_max=self.config.get('webhook_backoff_max', 3600),
+            batching=self._webhook_batching
+        )
+
+    def _webhook_batching(self, webhook_url: str):
+        """Batch-Einstellungen eines Endpunkts: (batch_size, Sammelzeit in Sekunden)"""
+        dispatcher = self.dispatcher
+        if dispatcher is None:
+            return 1, 0
+
+        endpoint = dispatcher.endpoint(webhook_url)
+        return endpoint.batch_size, endpoint.batch_ms / 1000
+
+    def _post_webhook(self, webhook_url: str, payload):
+        """
+        Einzelnen Webhook aufrufen
+
+        Args:
+            webhook_url: Webhook-URL
+            payload: JSON-Payload (im Batch-Modus eine Liste von Payloads)
+
+        Raises:
+            Exception bei Verbindungs- oder HTTP-Fehler
+        """
+        try:
+            self.dispatcher.post(webhook_url, payload)
+        except CircuitOpenError:
+            raise
+        except Exception:
+            self.stats.record_webhook(webhook_url, False)
+            raise
+
+        self.stats.record_webhook(webhook_url, True)
+        if isinstance(payload, list):
+            self.logger.info(f"Webhook benachrichtigt: {webhook_url} ({len(payload)} SMS)")
+        else:
+            self.logger.info(f"Webhook benachrichtigt: {webhook_url}")
+
+    @staticmethod
+    def build_payload(sms_data: Dict) -> Dict:
+        """
+        Benachrichtigung für Webhooks und die lokale API
+
+        Args:
+            sms_data: SMS-Daten
+
+        Returns:
+            JSON-Payload
+        """
+        payload = {
+            'from': sms_data['number'],
+            'text': sms_data['text'],
+            'timestamp': sms_data['timestamp'],
+            'received_at': datetime.now().isoformat()
+        }
+        if sms_data.get('modem'):
+            payload['modem'] = sms_data['modem']
+        return payload
+
+    def publish_sms(self, payload: Dict):
+        """
+        SMS an die Konsumenten der lokalen API weitergeben
+
+        Die SMS wird einmal in den Feed geschrieben; SSE- und Long-Poll-
+        Verbindungen lesen daraus, ohne den Ingest zu belasten.
+
+        Args:
+            payload: JSON-Payload (siehe build_payload)
+        """
+        if self.feed is None:
+            return
+
+        try:
+            self.feed.publish(payload)
+        except Exception as e:
+            self.logger.error(f"SMS-Feed Fehler: {e}")
+
+    def notify_webhooks(self, sms_data: Dict, payload: Dict = None):
+        """
+        Webhook-Benachrichtigungen senden
+
+        Mit Routing-Regeln erhalten nur die ermittelten Endpunkte die SMS.
+        Ist die Outbox aktiv, werden die Benachrichtigungen nur dauerhaft
+        eingereiht und im Hintergrund zugestellt, sonst parallel gesendet.
+
+        Args:
+            sms_data: SMS-Daten
+            payload: Bereits erstellter Payload (optional)
+        """
+        if not self.dispatcher:
+            return
+
+        routes = self.routes
+        if routes is None:
+            urls = list(self.dispatcher.endpoints)
+        else:
+            urls = routes.route(sms_data)
+            if not urls:
+                self.logger.debug(f"SMS von {sms_data.get('number')} an keinen Webhook geroutet")
+                return
+
+        if payload is None:
+            payload = self.build_payload(sms_data)
+
+        if self.outbox is not None:
+            for webhook_url in urls:
+                try:
+                    self.outbox.enqueue(webhook_url, payload)
+                except Exception as e:
+                    self.logger.error(f"Webhook-Outbox Fehler ({webhook_url}): {e}")
+            return
+
+        results = self.dispatcher.fan_out(payload, urls)
+        for webhook_url, error in results.items():
+            if error is None:
+                self.stats.record_webhook(webhook_url, True)
+                self.logger.info(f"Webhook benachrichtigt: {webhook_url}")
+            else:
+                if not isinstance(error, CircuitOpenError):
+                    self.stats.record_webhook(webhook_url, False)
+                self.logger.error(f"Webhook-Fehler ({webhook_url}): {error}")
+
+    def log_sms(self, sms_data: Dict):
+        """
+        Neue SMS protokollieren
+
+        Mit ``"log_messages": "compact"`` ein einzelner Eintrag ohne Text
+        (Absender, Modem, Zeit und Länge als Zusatzfelder, z.B. für das
+        JSON-Format); der Text erscheint dann nur auf DEBUG-Level.
+
+        Args:
+            sms_data: SMS-Daten
+        """
+        modem = sms_data.get('modem', '')
+
+        if self.config.get('log_messages', 'full') == 'compact':
+            self.logger.info(
+                f"Neue SMS [{modem}] von {sms_data['number']} "
+                f"({len(sms_data['text'])} Zeichen)",
+                extra={
+                    'sms_from': sms_data['number'],
+                    'sms_modem': modem,
+                    'sms_timestamp': sms_data['timestamp'],
+                    'sms_length': len(sms_data['text'])
+                }
+            )
+            self.logger.debug(f"Text: {sms_data['text']}")
+            return
+
+        self.logger.info("=" * 50)
+        self.logger.info(f"NEUE SMS EMPFANGEN [{modem}]")
+        self.logger.info(f"Von: {sms_data['number']}")
+        self.logger.info(f"Zeit: {sms_data['timestamp']}")
+        self.logger.info(f"Text: {sms_data['text']}")
+        self.logger.info("=" * 50)
+
+    def handle_sms(self, sms_path: str, sms_data: Dict = None,
+                   modem: ModemConnection = None) -> bool:
+        """
+        Einzelne SMS verarbeiten (Parsen, Duplikatprüfung, Speichern,
+        Webhooks, Löschen)
+
+        Args:
+            sms_path: D-Bus Pfad der SMS
+            sms_data: Bereits abgerufene SMS-Daten (optional)
+            modem: Modem der SMS (Standard: erstes Modem)
+
+        Returns:
+            True wenn die SMS neu war und verarbeitet wurde
+        """
+        if sms_data is None:
+            sms_data = self.parse_sms(sms_path, modem)
+
+        if not sms_data:
+            return False
+
+        # Mehrteilige SMS erst nach vollständigem Empfang verarbeiten
+        if sms_data['state'] == MM_SMS_STATE_RECEIVING:
+            self.logger.debug(f"SMS wird noch empfangen: {sms_path}")
+            return False
+
+        if sms_data['state'] in MM_SMS_OUTGOING_STATES:
+            return False
+
+        saved = self.persist_sms(sms_data)
+        if saved is False:
+            # Speicherfehler: SMS bleibt auf dem Modem
+            return False
+
+        mark = self._commit_mark()
+        if saved:
+            self.notify_sms(sms_data)
+
+        # SMS vom Modem löschen, sobald sie gesichert ist
+        if self.config.get('delete_after_read', True):
+            self._delete_after_commit(sms_data['path'], modem, mark)
+        self._maybe_commit()
+
+        return saved is not None
+
+    def persist_sms(self, sms_data: Dict) -> Optional[bool]:
+        """
+        Duplikatprüfung und Speicherung
 
-from .config import Config
+        Args:
+            sms_data: SMS-Daten
 
+        Returns:
+            None bei Duplikat, sonst True wenn gespeichert (False bei Fehler)
+        """
+        metrics.MESSAGES_SEEN.inc(modem=sms_data.get('modem', ''))
+        key = self.sms_key(sms_data)
+
+        # Bereits verarbeitet (ggf. über ein anderes Modem)?
+        with self._dedupe_lock:
+            duplicate = key in self._in_progress or self.is_processed(sms_data)
+            if not duplicate:
+                self._in_progress.add(key)
+
+        if duplicate:
+            self.logger.debug(f"SMS bereits verarbeitet: {sms_data['path']}")
+            self.stats.record_duplicate()
+            metrics.MESSAGES_DUPLICATE.inc(modem=sms_data.get('modem', ''))
+            return None
 
-class SMSMonitor:
-    """
-    SMS-Monitor für ModemManager-kompatible USB-Modems
+        try:
+            # Neue SMS gefunden
+            self.log_sms(sms_data)
 
-    Empfängt, speichert und verwaltet SMS-Nachrichten von USB 4G/LTE Modems.
-    """
+            # Journal-Eintrag und Speicherung nicht durch einen Checkpoint trennen
+            with self._persist_cond:
+                self._persist_cond.wait_for(lambda: not self._checkpointing)
+                self._persisting += 1
+            try:
+                if self.journal is not None:
+                    self.journal.append(
+                        sms_data, sync=self.config.get('durability', 'cycle') == 'message'
+                    )
+                saved = self.save_sms(sms_data)
+            finally:
+                with self._persist_cond:
+                    self._persisting -= 1
+                    self._persist_cond.notify_all()
+
+            if not saved:
+                return False
+            self.stats.record_message(sms_data)
+            with self._dedupe_lock:
+                self.messages_ingested += 1
+            return True
+        finally:
+            with self._dedupe_lock:
+                self._in_progress.discard(key)
 
-    def __init__(self, config: Config = None):
+    def notify_sms(self, sms_data: Dict):
+        """Gespeicherte SMS an lokale API und Webhooks melden"""
+        payload = self.build_payload(sms_data)
+        self.publish_sms(payload)
+        self.notify_webhooks(sms_data, payload)
+
+    def _create_pipeline(self) -> Pipeline:
         """
-        Initialisiert den SMS-Monitor
+        Ingest-Pipeline aufbauen
 
-        Args:
-            config: Config-Objekt (optional)
+        Stufen: Parsen (nur ohne Sammelabruf) -> Speichern -> Benachrichtigen;
+        Abruf und Löschen übernehmen ModemWorker und ModemDeleter.
         """
-        self.config = config or Config()
-        self.setup_logging()
-        self.setup_directories()
-        self.processed_sms = self._load_processed()
-        self.modem = None
-        self.messaging = None
-        self.running = True
+        capacity = self.config.get('pipeline_queue_size', 200)
+        return Pipeline([
+            Stage('parse', self._stage_parse,
+                  self.config.get('pipeline_parse_workers', 2), capacity),
+            Stage('persist', self._stage_persist,
+                  self.config.get('pipeline_persist_workers', 1), capacity,
+                  on_idle=self._save_processed),
+            Stage('notify', self._stage_notify,
+                  self.config.get('pipeline_notify_workers', 2), capacity,
+                  on_idle=self._commit_feed),
+        ])
+
+    def _enqueue_sms(self, sms_path: str, sms_data: Optional[Dict],
+                     modem: ModemConnection) -> bool:
+        """
+        SMS an die Pipeline übergeben (blockiert bei voller Queue)
 
-        self.logger.info("SMS-Monitor initialisiert")
+        Returns:
+            False wenn die SMS bereits in der Pipeline ist
+        """
+        with self._dedupe_lock:
+            if sms_path in self._queued_paths:
+                return False
+            self._queued_paths.add(sms_path)
+
+        item = {'path': sms_path, 'data': sms_data, 'modem': modem}
+        stage = self.pipeline['parse' if sms_data is None else 'persist']
+        if not stage.put(item):
+            self._release(item)
+        return True
+
+    def _release(self, item: Dict):
+        """SMS hat die Pipeline verlassen"""
+        with self._dedupe_lock:
+            self._queued_paths.discard(item['path'])
+
+    def _stage_parse(self, item: Dict) -> Optional[Dict]:
+        sms_data = self.parse_sms(item['path'], item['modem'])
+        if not sms_data or sms_data['state'] == MM_SMS_STATE_RECEIVING or \
+                sms_data['state'] in MM_SMS_OUTGOING_STATES:
+            self._release(item)
+            return None
 
-    def setup_logging(self):
-        """Logging-System konfigurieren"""
-        handlers = []
-
-        # File Handler
-        log_file = Path(self.config.get('log_file'))
-        log_file.parent.mkdir(parents=True, exist_ok=True)
-        file_handler = logging.FileHandler(log_file, encoding='utf-8')
-        file_handler.setFormatter(
-            logging.Formatter('[%(asctime)s] %(levelname)s: %(message)s')
-        )
-        handlers.append(file_handler)
+        item['data'] = sms_data
+        return item
 
-        # Console Handler
-        if self.config.get('enable_console_output', True):
-            console_handler = logging.StreamHandler(sys.stdout)
-            console_handler.setFormatter(
-                logging.Formatter('[%(asctime)s] %(levelname)s: %(message)s')
-            )
-            handlers.append(console_handler)
+    def _stage_persist(self, item: Dict) -> Optional[Dict]:
+        try:
+            saved = self.persist_sms(item['data'])
+        except Exception:
+            self._release(item)
+            raise
+
+        if saved is False:
+            # Speicherfehler: SMS bleibt auf dem Modem
+            self._release(item)
+            return None
 
-        # Logger konfigurieren
-        log_level = getattr(logging, self.config.get('log_level', 'INFO').upper())
-        logging.basicConfig(level=log_level, handlers=handlers)
-        self.logger = logging.getLogger(__name__)
+        item['mark'] = self._commit_mark()
+        self._maybe_commit()
+        if saved:
+            return item
 
-    def setup_directories(self):
-        """Benötigte Verzeichnisse erstellen"""
-        sms_dir = Path(self.config.get('sms_dir'))
-        sms_dir.mkdir(parents=True, exist_ok=True)
+        # Duplikat: nichts zu melden, nur löschen
+        self._finish_item(item)
+        return None
 
-        processed_db = Path(self.config.get('processed_db'))
-        processed_db.parent.mkdir(parents=True, exist_ok=True)
+    def _stage_notify(self, item: Dict):
+        try:
+            self.notify_sms(item['data'])
+        finally:
+            self._finish_item(item)
 
-        self.logger.debug("Verzeichnisse eingerichtet")
+    def _finish_item(self, item: Dict):
+        try:
+            if self.config.get('delete_after_read', True):
+                self._delete_after_commit(item['path'], item['modem'], item['mark'])
+        finally:
+            self._release(item)
 
-    def _load_processed(self) -> Dict:
+    def process_sms(self, modem: ModemConnection = None):
         """
-        Datenbank verarbeiteter SMS laden
+        Alle neuen SMS verarbeiten
 
-        Returns:
-            Dictionary mit verarbeiteten SMS
+        Args:
+            modem: Nur dieses Modem verarbeiten (Standard: alle Modems)
         """
-        try:
-            processed_file = Path(self.config.get('processed_db'))
-            if processed_file.exists():
-                with open(processed_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-        except Exception as e:
-            self.logger.warning(f"Processed-DB konnte nicht geladen werden: {e}")
+        if modem is None:
+            for connected_modem in list(self.modems):
+                self.process_sms(connected_modem)
+            return
 
-        return {}
+        batch = None
+        if self.config.get('batch_fetch', True):
+            batch = self.fetch_sms_batch(modem)
+
+        if batch is None:
+            batch = [(sms_path, None) for sms_path in self.get_sms_list(modem)]
+        else:
+            # Unvollständige mehrteilige SMS folgen später; ausgehende SMS
+            # des Versands gehören nicht zum Empfang
+            batch = [
+                (sms_data['path'], sms_data) for sms_data in batch
+                if sms_data['state'] != MM_SMS_STATE_RECEIVING and
+                sms_data['state'] not in MM_SMS_OUTGOING_STATES
+            ]
+
+        metrics.MODEM_BACKLOG.set(len(batch), modem=modem.label)
+
+        # SMS, deren Löschung noch aussteht, sind bereits verarbeitet
+        worker = self.workers.get(modem.path)
+        if worker is not None and len(worker.deleter):
+            batch = [
+                (sms_path, sms_data) for sms_path, sms_data in batch
+                if not worker.deleter.is_pending(sms_path)
+            ]
+
+        if not batch:
+            self.logger.debug(f"Keine SMS im Modem-Speicher [{modem.label}]")
+            return
+
+        if self.pipeline is not None:
+            # Commit übernimmt die Speicher-Stufe, sobald sie leergelaufen ist
+            for sms_path, sms_data in batch:
+                self._enqueue_sms(sms_path, sms_data, modem)
+            return
 
-    def _save_processed(self):
-        """Datenbank verarbeiteter SMS speichern"""
         try:
-            processed_file = Path(self.config.get('processed_db'))
-            with open(processed_file, 'w', encoding='utf-8') as f:
-                json.dump(self.processed_sms, f, indent=2, ensure_ascii=False)
-        except Exception as e:
-            self.logger.error(f"Fehler beim Speichern der Processed-DB: {e}")
+            for sms_path, sms_data in batch:
+                self.handle_sms(sms_path, sms_data, modem)
+        finally:
+            self._save_processed()
 
-    def connect_modem(self) -> bool:
+    def subscribe_signals(self):
         """
-        Verbindung zum Modem herstellen
+        D-Bus Signale für neue SMS und Modem-Hotplug abonnieren
 
-        Returns:
-            True wenn erfolgreich, False bei Fehler
+        Messaging.Added meldet neue SMS-Objekte, PropertiesChanged auf dem
+        Sms-Interface den Übergang von RECEIVING nach RECEIVED bei
+        mehrteiligen Nachrichten. InterfacesAdded/InterfacesRemoved des
+        ObjectManagers und NameOwnerChanged melden An- und Abstecken von
+        Modems bzw. Neustarts von ModemManager.
         """
-        try:
-            # System-Bus verbinden
-            bus = Gio.bus_get_sync(Gio.BusType.SYSTEM, None)
-
-            # ModemManager ObjectManager
-            manager_proxy = Gio.DBusProxy.new_sync(
-                bus,
-                Gio.DBusProxyFlags.NONE,
-                None,
-                'org.freedesktop.ModemManager1',
-                '/org/freedesktop/ModemManager1',
+        bus = self.get_bus()
+
+        self._signal_ids.append(bus.signal_subscribe(
+            MM_DBUS_SERVICE,
+            'org.freedesktop.DBus.Properties',
+            'PropertiesChanged',
+            None,
+            MM_DBUS_INTERFACE_SMS,
+            Gio.DBusSignalFlags.NONE,
+            self._on_sms_properties_changed
+        ))
+
+        for signal_name in ('InterfacesAdded', 'InterfacesRemoved'):
+            self._signal_ids.append(bus.signal_subscribe(
+                MM_DBUS_SERVICE,
                 'org.freedesktop.DBus.ObjectManager',
-                None
-            )
-
-            # Alle verwalteten Objekte abrufen
-            result = manager_proxy.call_sync(
-                'GetManagedObjects',
+                signal_name,
+                MM_DBUS_PATH,
                 None,
-                Gio.DBusCallFlags.NONE,
-                -1,
-                None
-            )
+                Gio.DBusSignalFlags.NONE,
+                self._on_objects_changed
+            ))
+
+        self._signal_ids.append(bus.signal_subscribe(
+            'org.freedesktop.DBus',
+            'org.freedesktop.DBus',
+            'NameOwnerChanged',
+            '/org/freedesktop/DBus',
+            MM_DBUS_SERVICE,
+            Gio.DBusSignalFlags.NONE,
+            self._on_name_owner_changed
+        ))
+
+        for modem in self.modems:
+            self._subscribe_modem(modem)
+
+        self.logger.debug("D-Bus Signale abonniert")
+
+    def _subscribe_modem(self, modem: ModemConnection):
+        """Messaging.Added für ein Modem abonnieren"""
+        modem.signal_ids.append(self.get_bus().signal_subscribe(
+            MM_DBUS_SERVICE,
+            MM_DBUS_INTERFACE_MESSAGING,
+            'Added',
+            modem.path,
+            None,
+            Gio.DBusSignalFlags.NONE,
+            self._on_sms_added
+        ))
+
+    def _unsubscribe_modem(self, modem: ModemConnection):
+        bus = self.get_bus()
+        for signal_id in modem.signal_ids:
+            bus.signal_unsubscribe(signal_id)
+        modem.signal_ids = []
+        modem.pending_sms.clear()
+
+    def unsubscribe_signals(self):
+        """D-Bus Signal-Abonnements entfernen"""
+        bus = self.get_bus()
+
+        for modem in self.modems:
+            self._unsubscribe_modem(modem)
+
+        for signal_id in self._signal_ids:
+            bus.signal_unsubscribe(signal_id)
+        self._signal_ids = []
+
+    def _on_objects_changed(self, connection, sender_name, object_path,
+                            interface_name, signal_name, parameters):
+        """Callback für InterfacesAdded/InterfacesRemoved (Modem-Hotplug)"""
+        changed_path = parameters.unpack()[0]
+        if '/Modem/' not in changed_path:
+            return
 
-            # Modem-Pfade extrahieren
-            objects = result[0]
-            modem_paths = [path for path in objects.keys() if '/Modem/' in path]
+        self.logger.debug(f"Signal: {signal_name} {changed_path}")
+        self._schedule_reconcile()
+
+    def _on_name_owner_changed(self, connection, sender_name, object_path,
+                               interface_name, signal_name, parameters):
+        """Callback für NameOwnerChanged (Neustart von ModemManager)"""
+        _, _, new_owner = parameters.unpack()
+        if new_owner:
+            self.logger.info("ModemManager (neu) gestartet")
+        else:
+            self.logger.warning("ModemManager nicht mehr erreichbar")
+
+        # Alle Modem-Objekte sind ungültig geworden
+        for modem in list(self.modems):
+            self._unbind_modem(modem)
+        self._update_primary()
+        self._schedule_reconcile()
+
+    def _schedule_reconcile(self):
+        """Abgleich der Modems gebündelt im Mainloop ausführen"""
+        if self._reconcile_pending:
+            return
+        self._reconcile_pending = True
+        GLib.timeout_add(self.config.get('reconnect_delay', 500), self._on_reconcile)
 
-            if not modem_paths:
-                self.logger.error("Kein Modem gefunden. Ist das USB-Modem angeschlossen?")
-                return False
+    def _on_reconcile(self) -> bool:
+        self._reconcile_pending = False
+        try:
+            self.reconcile_modems()
+            if not self.modems:
+                self.logger.warning("Kein Modem verfügbar, warte auf Modem...")
+        except Exception as e:
+            self.logger.error(f"Modem-Abgleich fehlgeschlagen: {e}")
+        return False
+
+    def _modem_by_path(self, modem_path: str) -> Optional[ModemConnection]:
+        for modem in self.modems:
+            if modem.path == modem_path:
+                return modem
+        return None
+
+    def _dispatch_sms(self, sms_path: str, modem: ModemConnection):
+        """Per Signal gemeldete SMS an den Worker des Modems übergeben"""
+        worker = self.workers.get(modem.path)
+        if worker:
+            worker.submit_sms(sms_path)
+        else:
+            self._ingest_signalled(sms_path, modem)
+
+    def _on_sms_added(self, connection, sender_name, object_path,
+                      interface_name, signal_name, parameters):
+        """Callback für Messaging.Added"""
+        sms_path, received = parameters.unpack()
+
+        # Lokal erstellte (ausgehende) SMS ignorieren
+        if not received:
+            return
 
-            modem_index = self.config.get('modem_index', 0)
-            if modem_index >= len(modem_paths):
-                self.logger.error(
-                    f"Modem-Index {modem_index} ungültig. "
-                    f"Verfügbare Modems: {len(modem_paths)}"
-                )
-                return False
+        modem = self._modem_by_path(object_path)
+        if not modem:
+            return
 
-            modem_path = modem_paths[modem_index]
+        self.logger.debug(f"Signal: neue SMS {sms_path} [{modem.label}]")
+        modem.pending_sms.add(sms_path)
+        self._dispatch_sms(sms_path, modem)
 
-            # Modem-Proxy erstellen
-            self.modem_proxy = Gio.DBusProxy.new_sync(
-                bus,
-                Gio.DBusProxyFlags.NONE,
-                None,
-                'org.freedesktop.ModemManager1',
-                modem_path,
-                'org.freedesktop.ModemManager1.Modem',
-                None
-            )
+    def _on_sms_properties_changed(self, connection, sender_name, object_path,
+                                   interface_name, signal_name, parameters):
+        """Callback für PropertiesChanged auf Sms-Objekten"""
+        modem = next((m for m in self.modems if object_path in m.pending_sms), None)
+        if not modem:
+            return
 
-            # Messaging-Proxy erstellen
-            self.messaging_proxy = Gio.DBusProxy.new_sync(
-                bus,
-                Gio.DBusProxyFlags.NONE,
-                None,
-                'org.freedesktop.ModemManager1',
-                modem_path,
-                'org.freedesktop.ModemManager1.Modem.Messaging',
-                None
-            )
+        _, changed, _ = parameters.unpack()
+        if changed.get('State') == MM_SMS_STATE_RECEIVED:
+            self.logger.debug(f"Signal: SMS vollständig empfangen {object_path}")
+            self._dispatch_sms(object_path, modem)
 
-            # Modem-Informationen abrufen
-            manufacturer = self.modem_proxy.get_cached_property('Manufacturer')
-            model = self.modem_proxy.get_cached_property('Model')
+    def _ingest_signalled(self, sms_path: str, modem: ModemConnection):
+        """Per Signal gemeldete SMS verarbeiten"""
+        try:
+            sms_data = self.parse_sms(sms_path, modem)
+            if sms_data and sms_data['state'] == MM_SMS_STATE_RECEIVING:
+                # Warten auf PropertiesChanged(State=RECEIVED)
+                return
+
+            modem.pending_sms.discard(sms_path)
+            if self.pipeline is not None:
+                if sms_data:
+                    self._enqueue_sms(sms_path, sms_data, modem)
+            elif self.handle_sms(sms_path, sms_data, modem):
+                self._save_processed()
 
-            if manufacturer and model:
-                manufacturer_str = manufacturer.unpack() if hasattr(manufacturer, 'unpack') else str(manufacturer)
-                model_str = model.unpack() if hasattr(model, 'unpack') else str(model)
-                self.logger.info(f"Modem verbunden: {manufacturer_str} {model_str}")
-            else:
-                self.logger.info(f"Modem verbunden: {modem_path}")
+        except Exception as e:
+            self.logger.error(f"Fehler bei Signal-Verarbeitung: {e}", exc_info=True)
 
-            # Für Kompatibilität
-            self.modem = self.modem_proxy
-            self.messaging = self.messaging_proxy
-            self.modem_path = modem_path
+    def sweep(self):
+        """Durchlauf über alle Modems bei den Ingest-Workern anfordern"""
+        if not self.workers:
+            self.process_sms()
+            return
 
-            return True
+        for worker in self.workers.values():
+            worker.submit_sweep()
 
+    def _on_sweep(self) -> bool:
+        """Periodischer Sicherheits-Durchlauf im Event-Modus"""
+        try:
+            self.sweep()
         except Exception as e:
-            self.logger.error(f"Modem-Verbindung fehlgeschlagen: {e}")
-            return False
+            self.logger.error(f"Fehler im Sicherheits-Durchlauf: {e}", exc_info=True)
 
-    def get_sms_list(self) -> List:
-        """
-        Liste aller SMS vom Modem abrufen
+        return self.running
 
-        Returns:
-            Liste von SMS-Pfaden
-        """
-        try:
-            if not self.messaging:
-                self.logger.error("Messaging-Interface nicht verfügbar")
-                return []
+    def _on_unix_signal(self, signum: int) -> bool:
+        """Signal-Handler für den GLib-Mainloop"""
+        self.logger.info(f"Signal {signum} empfangen, beende Monitor...")
+        self.stop()
+        return False
 
-            # DBus-Call: List() Methode aufrufen
-            result = self.messaging_proxy.call_sync(
-                'List',
-                None,
-                Gio.DBusCallFlags.NONE,
-                -1,
-                None
-            )
+    def _on_sighup(self) -> bool:
+        """SIGHUP im GLib-Mainloop: Konfiguration neu laden"""
+        self.logger.info("SIGHUP empfangen, lade Konfiguration neu...")
+        self.reload_config()
+        return True
 
-            # Ergebnis extrahieren (Liste von SMS-Pfaden)
-            sms_paths = result[0] if result else []
-            return sms_paths
+    def _read_config_stamp(self):
+        """Änderungsmerkmal der Konfigurationsdatei (None wenn nicht vorhanden)"""
+        try:
+            stat = Path(self.config.config_path).stat()
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+    def _check_config_file(self):
+        """Konfiguration neu laden, wenn sich die Datei geändert hat (config_watch)"""
+        stamp = self._read_config_stamp()
+        if stamp is not None and stamp != self._config_stamp:
+            self.logger.info(f"Konfigurationsdatei geändert: {self.config.config_path}")
+            self.reload_config()
+
+    def _on_config_watch(self) -> bool:
+        """Periodische Prüfung der Konfigurationsdatei im Event-Modus"""
+        self._check_config_file()
+        return self.running
+
+    def _schedule_timers(self):
+        """Sicherheits-Durchlauf und Datei-Überwachung (neu) einplanen"""
+        if self._sweep_source is not None:
+            GLib.source_remove(self._sweep_source)
+        self._sweep_source = GLib.timeout_add_seconds(
+            self.config.get('sweep_interval', 300), self._on_sweep
+        )
 
-        except Exception as e:
-            self.logger.error(f"SMS-Liste konnte nicht abgerufen werden: {e}")
-            return []
+        if self._watch_source is not None:
+            GLib.source_remove(self._watch_source)
+            self._watch_source = None
+        if self.config.get('config_watch', False):
+            self._watch_source = GLib.timeout_add_seconds(
+                self.config.get('config_watch_interval', 2), self._on_config_watch
+            )
 
-    def parse_sms(self, sms_path: str) -> Optional[Dict]:
+    def reload_config(self) -> bool:
         """
-        SMS-Daten extrahieren
+        Konfiguration im laufenden Betrieb neu laden (SIGHUP, config_watch)
 
-        Args:
-            sms_path: DBus-Pfad zur SMS
+        Die Datei wird vollständig geprüft und nur bei Erfolg übernommen.
+        Danach werden ausschließlich die betroffenen Komponenten neu
+        aufgebaut; Modem-Verbindungen und Ingest-Worker laufen weiter.
 
         Returns:
-            Dictionary mit SMS-Daten oder None bei Fehler
+            True wenn die neue Konfiguration übernommen wurde
         """
-        try:
-            # System-Bus
-            bus = Gio.bus_get_sync(Gio.BusType.SYSTEM, None)
+        with self._reload_lock:
+            self._config_stamp = self._read_config_stamp()
+            if self.sender is not None:
+                # Versand-Spool ebenfalls neu einlesen (manueller Anstoß ohne inotify)
+                self.sender.rescan()
 
-            # SMS-Proxy erstellen
-            sms_proxy = Gio.DBusProxy.new_sync(
-                bus,
-                Gio.DBusProxyFlags.NONE,
-                None,
-                'org.freedesktop.ModemManager1',
-                sms_path,
-                'org.freedesktop.ModemManager1.Sms',
-                None
-            )
+            try:
+                changed = self.config.reload()
+            except Exception as e:
+                self.logger.error(f"Konfiguration nicht neu geladen, bisherige bleibt aktiv: {e}")
+                return False
 
-            # Properties abrufen
-            number = sms_proxy.get_cached_property('Number')
-            text = sms_proxy.get_cached_property('Text')
-            timestamp = sms_proxy.get_cached_property('Timestamp')
-            state = sms_proxy.get_cached_property('State')
+            if not changed:
+                self.logger.info("Konfiguration neu geladen (keine Änderungen)")
+                return True
 
-            return {
-                'path': sms_path,
-                'number': number.unpack() if number else '',
-                'text': text.unpack() if text else '',
-                'timestamp': timestamp.unpack() if timestamp else '',
-                'state': state.unpack() if state else 0
-            }
-        except Exception as e:
-            self.logger.error(f"SMS-Parsing fehlgeschlagen: {e}")
-            return None
+            self.logger.info(f"Konfiguration neu geladen, geändert: {', '.join(sorted(changed))}")
 
-    def is_processed(self, sms_data: Dict) -> bool:
-        """
-        Prüfen ob SMS bereits verarbeitet wurde
+            try:
+                self._apply_config_changes(changed)
+            except Exception as e:
+                self.logger.error(f"Fehler beim Übernehmen der Konfiguration: {e}", exc_info=True)
 
-        Args:
-            sms_data: SMS-Daten
+            return True
 
-        Returns:
-            True wenn bereits verarbeitet
-        """
-        key = f"{sms_data['number']}_{sms_data['timestamp']}"
-        return key in self.processed_sms
+    def _apply_config_changes(self, changed: set):
+        """Geänderte Optionen auf die laufenden Komponenten anwenden"""
+        if 'log_level' in changed:
+            level = self.config.get('log_level', 'INFO').upper()
+            logging.getLogger().setLevel(getattr(logging, level))
 
-    def save_sms(self, sms_data: Dict) -> Optional[Path]:
-        """
-        SMS in Datei speichern
+        if changed.intersection(WEBHOOK_OPTIONS):
+            self._rebuild_webhooks()
 
-        Args:
-            sms_data: SMS-Daten
+        if 'metrics_listen' in changed:
+            if self.metrics_server:
+                self.metrics_server.stop()
+                self.metrics_server = None
+            self.start_metrics_server()
 
-        Returns:
-            Pfad zur gespeicherten Datei oder None bei Fehler
+        if changed.intersection(('modems', 'modem_index')) and self.manager_proxy is not None:
+            self.reconcile_modems()
+
+        if changed.intersection(('sweep_interval', 'config_watch', 'config_watch_interval')) \
+                and self._sweep_source is not None:
+            self._schedule_timers()
+
+        restart = sorted(changed.intersection(RESTART_OPTIONS))
+        if restart:
+            self.logger.warning(f"Erst nach Neustart wirksam: {', '.join(restart)}")
+
+    def _rebuild_webhooks(self):
         """
-        try:
-            # Sicheren Dateinamen generieren
-            timestamp_str = sms_data['timestamp']
-            try:
-                # ISO 8601 Timestamp parsen
-                dt = datetime.fromisoformat(timestamp_str.replace('Z', '+00:00'))
-                time_part = dt.strftime('%Y%m%d_%H%M%S')
-            except:
-                # Fallback: Aktueller Timestamp
-                time_part = datetime.now().strftime('%Y%m%d_%H%M%S')
-
-            # Telefonnummer sanitieren
-            number = sms_data['number'].replace('+', '').replace(' ', '')
-
-            filename = f"{time_part}_{number}.txt"
-            sms_dir = Path(self.config.get('sms_dir'))
-            filepath = sms_dir / filename
-
-            # SMS speichern
-            with open(filepath, 'w', encoding='utf-8') as f:
-                f.write(f"Von: {sms_data['number']}\n")
-                f.write(f"Zeit: {sms_data['timestamp']}\n")
-                f.write(f"Status: {sms_data['state']}\n")
-                f.write(f"\nNachricht:\n")
-                f.write(f"{sms_data['text']}\n")
-
-            self.logger.info(f"SMS gespeichert: {filepath}")
-
-            # Als verarbeitet markieren
-            key = f"{sms_data['number']}_{sms_data['timestamp']}"
-            self.processed_sms[key] = {
-                'saved_at': datetime.now().isoformat(),
-                'filepath': str(filepath),
-                'from': sms_data['number']
-            }
-            self._save_processed()
+        Webhook-Dispatcher, Routing-Regeln und Outbox mit der neuen Konfiguration ersetzen
+
+        Neue Benachrichtigungen gehen sofort an die neuen Objekte. Die alte
+        Outbox wird im Hintergrund beendet; erst wenn alle ihre laufenden
+        Zustellungen abgeschlossen sind, startet die neue Outbox und
+        übernimmt die offenen Aufträge aus dem Outbox-Verzeichnis. So wird
+        kein Auftrag doppelt zugestellt. Mehrere Neuladevorgänge werden
+        nacheinander übergeben; eine inzwischen ersetzte Outbox startet nicht.
+        """
+        old_dispatcher, old_outbox = self.dispatcher, self.outbox
+
+        # Regeln zuerst: schlägt das fehl, bleibt die bisherige Zustellung aktiv
+        routes = self._create_routes()
+        self.dispatcher = self._create_dispatcher()
+        self.routes = routes
+        new_outbox = self.outbox = self._create_outbox()
+
+        def retire():
+            with self._outbox_lock:
+                if old_outbox is not None:
+                    old_outbox.stop(join_timeout=None)
+                if new_outbox is not None and new_outbox is self.outbox and \
+                        self._workers_started:
+                    new_outbox.start()
+            if old_dispatcher:
+                old_dispatcher.close()
+
+        threading.Thread(target=retire, name='webhook-reload', daemon=True).start()
+        self.logger.info(
+            f"Webhook-Zustellung neu aufgebaut: "
+            f"{len(self.dispatcher.endpoints) if self.dispatcher else 0} Endpunkt(e)"
+        )
+
+    def start_workers(self):
+        """Hintergrund-Worker (Ingest pro Modem, Pipeline, Webhook-Outbox, Versand) starten"""
+        if self.outbox is not None:
+            self.outbox.start()
+        if self.sender is not None:
+            self.sender.start()
+
+        self.pipeline = self._create_pipeline()
+        self.pipeline.start()
+
+        for modem in self.modems:
+            worker = ModemWorker(self, modem)
+            worker.start()
+            self.workers[modem.path] = worker
+
+        self._workers_started = True
+
+    def start_metrics_server(self):
+        """Metrik-Endpunkt starten (falls metrics_listen konfiguriert ist)"""
+        listen = self.config.get('metrics_listen')
+        if not listen:
+            return
 
-            return filepath
+        metrics.OUTBOX_PENDING.set_function(
+            lambda: len(self.outbox) if self.outbox is not None else 0
+        )
+        metrics.SEND_PENDING.set_function(
+            lambda: len(self.sender) if self.sender is not None else 0
+        )
 
+        try:
+            self.metrics_server = metrics.MetricsServer(listen)
+            self.metrics_server.start()
         except Exception as e:
-            self.logger.error(f"SMS-Speicherung fehlgeschlagen: {e}")
-            return None
+            self.metrics_server = None
+            self.logger.error(f"Metrik-Endpunkt {listen} konnte nicht gestartet werden: {e}")
 
-    def delete_sms(self, sms_path: str) -> bool:
+    def _create_feed(self) -> Optional[MessageFeed]:
         """
-        SMS vom Modem löschen
-
-        Args:
-            sms_path: D-Bus Pfad der SMS
+        Feed für die lokale API öffnen (falls api_listen konfiguriert ist)
 
         Returns:
-            True wenn erfolgreich
+            MessageFeed oder None
         """
-        try:
-            if not self.messaging:
-                return False
+        if not self.config.get('api_listen'):
+            return None
 
-            # DBus-Call: Delete() Methode aufrufen
-            self.messaging_proxy.call_sync(
-                'Delete',
-                GLib.Variant('(o)', (sms_path,)),
-                Gio.DBusCallFlags.NONE,
-                -1,
-                None
+        try:
+            return MessageFeed(
+                self.config.get('api_feed_file'),
+                capacity=self.config.get('api_buffer', 10000)
             )
-            self.logger.debug(f"SMS vom Modem gelöscht: {sms_path}")
-            return True
-
         except Exception as e:
-            self.logger.error(f"SMS-Löschung fehlgeschlagen: {e}")
-            return False
+            self.logger.error(f"SMS-Feed konnte nicht geöffnet werden: {e}")
+            return None
 
-    def notify_webhooks(self, sms_data: Dict):
+    def _create_sender(self) -> Optional[SMSSender]:
         """
-        Webhook-Benachrichtigungen senden
+        Versand-Scheduler mit Spool erstellen
 
-        Args:
-            sms_data: SMS-Daten
+        Returns:
+            SMSSender oder None (einmaliger Befehl oder Spool nicht nutzbar)
         """
-        webhooks = self.config.get('webhooks', [])
-        if not webhooks:
-            return
+        if not self.daemon:
+            return None
 
         try:
-            import requests
-        except ImportError:
-            self.logger.warning(
-                "requests-Bibliothek nicht installiert, Webhooks deaktiviert. "
-                "Installation: pip install requests"
-            )
-            return
+            queue = SendQueue(self.config.get('send_dir'))
+        except OSError as e:
+            self.logger.error(f"Versand-Spool nicht nutzbar, SMS-Versand deaktiviert: {e}")
+            return None
 
-        payload = {
-            'from': sms_data['number'],
-            'text': sms_data['text'],
-            'timestamp': sms_data['timestamp'],
-            'received_at': datetime.now().isoformat()
-        }
+        return SMSSender(self.config, queue, lambda: list(self.modems), self.send_sms)
 
-        for webhook_url in webhooks:
-            try:
-                response = requests.post(
-                    webhook_url,
-                    json=payload,
-                    timeout=5,
-                    headers={'Content-Type': 'application/json'}
-                )
-                response.raise_for_status()
-                self.logger.info(f"Webhook benachrichtigt: {webhook_url}")
+    def send_sms(self, modem: ModemConnection, number: str, text: str):
+        """
+        SMS über ein Modem versenden
 
-            except Exception as e:
-                self.logger.error(f"Webhook-Fehler ({webhook_url}): {e}")
+        Args:
+            modem: Modem
+            number: Empfängernummer
+            text: Nachricht
 
-    def process_sms(self):
-        """Alle neuen SMS verarbeiten"""
-        sms_list = self.get_sms_list()
+        Raises:
+            Exception bei D-Bus- oder Versandfehler
+        """
+        timeout = int(self.config.get('send_timeout', 60) * 1000)
+        with metrics.DBUS_CALL_SECONDS.time(call='send'):
+            modem.send_sms(number, text, timeout)
 
-        if not sms_list:
-            self.logger.debug("Keine SMS im Modem-Speicher")
+    def start_api_server(self):
+        """Lokale SSE-/Long-Poll-API starten (falls api_listen konfiguriert ist)"""
+        if self.feed is None:
             return
 
-        for sms in sms_list:
-            sms_data = self.parse_sms(sms)
-
-            if not sms_data:
-                continue
+        listen = self.config.get('api_listen')
+        sender = self.sender if self.config.get('api_send', False) else None
+        try:
+            self.api_server = APIServer(listen, self.feed, sender)
+            self.api_server.start()
+        except Exception as e:
+            self.api_server = None
+            self.logger.error(f"SMS-API {listen} konnte nicht gestartet werden: {e}")
+
+    def shutdown(self):
+        """Hintergrund-Worker beenden, Verbindungen und Datenbanken schließen"""
+        self._workers_started = False
+        for worker in self.workers.values():
+            worker.stop_ingest()
+        with self._retiring_lock:
+            retiring = list(self._retiring)
+        for thread in retiring:
+            thread.join()
+        if self.pipeline is not None:
+            # Bereits abgerufene SMS noch speichern und melden
+            self.pipeline.stop()
+            self.pipeline = None
+        if self.sender is not None:
+            # Laufende Sendevorgänge abschließen, Rest bleibt im Spool
+            self.sender.stop(self.config.get('send_timeout', 60))
+        for worker in self.workers.values():
+            worker.deleter.stop(self.config.get('delete_drain_timeout', 5))
+        self.workers = {}
+
+        with self._outbox_lock:
+            if self.outbox is not None:
+                self.outbox.stop(self.config.get('outbox_drain_timeout', 5))
+        if self.dispatcher:
+            self.dispatcher.close()
+        if self.metrics_server:
+            self.metrics_server.stop()
+            self.metrics_server = None
+        if self.api_server:
+            self.api_server.stop()
+            self.api_server = None
+        if self.feed is not None:
+            self.feed.close()
+        if self.journal is not None:
+            try:
+                self._checkpoint_journal()
+            except Exception as e:
+                self.logger.error(f"Ingest-Journal: Checkpoint fehlgeschlagen: {e}")
+            self.journal.close()
+        self.stats.flush()
+        self.message_store.close()
+        self.processed_sms.close()
+        if self.search_index is not None:
+            self.search_index.close()
+
+    def stop(self):
+        """Monitor beenden"""
+        self.running = False
+        self._wakeup.set()
+        if self.loop and self.loop.is_running():
+            self.loop.quit()
+
+    def run_event_loop(self):
+        """
+        Event-gesteuerter Betrieb
 
-            # Bereits verarbeitet?
-            if self.is_processed(sms_data):
-                self.logger.debug(f"SMS bereits verarbeitet: {sms_data['path']}")
-                continue
+        Neue SMS werden über D-Bus Signale sofort verarbeitet. Ein langsamer
+        Sicherheits-Durchlauf (sweep_interval) fängt verpasste Signale ab.
+        """
+        load_gi()
+        self.loop = GLib.MainLoop()
 
-            # Neue SMS gefunden
-            self.logger.info("=" * 50)
-            self.logger.info("NEUE SMS EMPFANGEN")
-            self.logger.info(f"Von: {sms_data['number']}")
-            self.logger.info(f"Zeit: {sms_data['timestamp']}")
-            self.logger.info(f"Text: {sms_data['text']}")
-            self.logger.info("=" * 50)
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            GLib.unix_signal_add(
+                GLib.PRIORITY_DEFAULT, signum, self._on_unix_signal, signum
+            )
 
-            # SMS speichern
-            filepath = self.save_sms(sms_data)
+        self.subscribe_signals()
 
-            # Webhooks benachrichtigen
-            if filepath:
-                self.notify_webhooks(sms_data)
+        # Vorhandene SMS sofort verarbeiten
+        self.sweep()
 
-            # SMS vom Modem löschen
-            if self.config.get('delete_after_read', True):
-                self.delete_sms(sms_data['path'])
+        GLib.unix_signal_add(GLib.PRIORITY_DEFAULT, signal.SIGHUP, self._on_sighup)
+        self._schedule_timers()
 
-    def run(self):
-        """
-        Hauptloop des SMS-Monitors
+        try:
+            self.loop.run()
+        finally:
+            self.unsubscribe_signals()
+            self._sweep_source = None
+            self._watch_source = None
 
-        Läuft kontinuierlich und prüft in konfigurierten Intervallen auf neue SMS.
-        """
-        self.logger.info("SMS-Monitor wird gestartet...")
+    def run_poll_loop(self):
+        """Polling-Betrieb mit fester Rate und adaptivem Intervall (PollScheduler)"""
 
         # Signal Handler für sauberes Beenden
         def signal_handler(sig, frame):
             self.logger.info(f"Signal {sig} empfangen, beende Monitor...")
             self.running = False
+            self._wakeup.set()
+
+        def reload_handler(sig, frame):
+            self._reload_requested = True
+            self._wakeup.set()
 
         signal.signal(signal.SIGINT, signal_handler)
         signal.signal(signal.SIGTERM, signal_handler)
+        signal.signal(signal.SIGHUP, reload_handler)
 
-        # Modem verbinden
-        if not self.connect_modem():
-            self.logger.error("Modem-Verbindung fehlgeschlagen, Programm wird beendet")
-            sys.exit(1)
-
-        self.logger.info("SMS-Monitor läuft. Drücke Strg+C zum Beenden.")
-
-        # Hauptloop
-        check_interval = self.config.get('check_interval', 30)
+        scheduler = PollScheduler(self.config)
+        seen_messages, seen_errors = self.messages_ingested, self.fetch_errors
 
         while self.running:
+            scheduler.begin(time.monotonic())
+            error = False
+
             try:
-                self.process_sms()
-                time.sleep(check_interval)
+                # Hotplug: Modems vor jedem Durchlauf abgleichen
+                self.reconcile_modems()
+                if not self.modems:
+                    if not scheduler.errors:
+                        self.logger.warning("Kein Modem verfügbar, warte auf Modem...")
+                    error = True
+                else:
+                    busy = [
+                        worker.modem.label for worker in self.workers.values()
+                        if worker.sweep_pending()
+                    ]
+                    if busy:
+                        scheduler.overrun(f"vorheriger Durchlauf läuft noch ({', '.join(busy)})")
+                    self.sweep()
 
             except KeyboardInterrupt:
                 self.logger.info("Beenden durch Benutzer...")
@@ -484,6 +2437,76 @@ class SMSMonitor:
 
             except Exception as e:
                 self.logger.error(f"Fehler im Hauptloop: {e}", exc_info=True)
-                time.sleep(10)  # Kurze Pause bei Fehlern
+                error = True
+
+            # Ergebnisse der Ingest-Worker fließen mit einem Durchlauf Verzögerung ein
+            messages, errors = self.messages_ingested, self.fetch_errors
+            delay = scheduler.end(
+                time.monotonic(), messages - seen_messages, error or errors > seen_errors
+            )
+            seen_messages, seen_errors = messages, errors
+
+            self._wait_poll_interval(delay)
+
+    def _wait_poll_interval(self, delay: float):
+        """
+        Bis zum nächsten Durchlauf warten
+
+        Schläft ohne periodisches Aufwachen; SIGHUP bzw. Beenden wecken
+        sofort. Nur mit config_watch wird im Abstand von
+        config_watch_interval die Konfigurationsdatei geprüft.
+        """
+        deadline = time.monotonic() + delay
+        next_watch = time.monotonic()
+
+        while self.running and time.monotonic() < deadline:
+            if self._reload_requested:
+                self._reload_requested = False
+                self.logger.info("SIGHUP empfangen, lade Konfiguration neu...")
+                self.reload_config()
+                # Neues check_interval ab sofort
+                deadline = min(deadline, time.monotonic() + self.config.get('check_interval', 30))
+
+            timeout = deadline - time.monotonic()
+            if self.config.get('config_watch', False):
+                if time.monotonic() >= next_watch:
+                    self._check_config_file()
+                    next_watch = time.monotonic() + self.config.get('config_watch_interval', 2)
+                timeout = min(timeout, next_watch - time.monotonic())
+
+            self._wakeup.wait(max(0, timeout))
+            self._wakeup.clear()
+
+    def run(self):
+        """
+        Hauptloop des SMS-Monitors
+
+        Läuft kontinuierlich und verarbeitet neue SMS entweder per D-Bus
+        Signal (event_driven) oder in konfigurierten Intervallen. Jedes
+        Modem wird von einem eigenen Ingest-Worker bearbeitet.
+        """
+        self.logger.info("SMS-Monitor wird gestartet...")
+
+        # Modem verbinden
+        if not self.connect_modem():
+            if not self.config.get('wait_for_modem', True) or self.manager_proxy is None:
+                self.logger.error("Modem-Verbindung fehlgeschlagen, Programm wird beendet")
+                sys.exit(1)
+            self.logger.warning("Kein Modem verfügbar, warte auf Modem...")
+
+        self.logger.info(
+            f"SMS-Monitor läuft ({len(self.modems)} Modem(s)). Drücke Strg+C zum Beenden."
+        )
+
+        self.start_metrics_server()
+        self.start_api_server()
+        self.start_workers()
+        try:
+            if self.config.get('event_driven', True):
+                self.run_event_loop()
+            else:
+                self.run_poll_loop()
+        finally:
+            self.shutdown()
 
         self.logger.info("SMS-Monitor wurde beendet")
@@ -0,0 +1,400 @@
+"""
+Persistente Webhook-Outbox
+
+Webhook-Benachrichtigungen werden als einzelne JSON-Dateien im
+Outbox-Verzeichnis abgelegt und von Hintergrund-Workern zugestellt.
+Fehlgeschlagene Zustellungen werden mit exponentiellem Backoff (inkl.
+Jitter) wiederholt und nach ``max_attempts`` Versuchen in das
+Dead-Letter-Verzeichnis verschoben.
+
+Für Endpunkte im Batch-Modus sammelt die Outbox fällige Aufträge derselben
+URL (bis ``batch_size`` Aufträge bzw. ``batch_ms`` nach dem ältesten) und
+stellt sie mit einem Aufruf als JSON-Array zu. Jeder Auftrag bleibt dabei
+eine eigene Datei; ein fehlgeschlagener Batch wird gemeinsam wiederholt.
+"""
+
+import heapq
+import json
+import logging
+import os
+import random
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .utils import write_json_atomic
+
+logger = logging.getLogger(__name__)
+
+
+class WebhookOutbox:
+    """
+    Dateibasierte Warteschlange für Webhook-Zustellungen
+
+    Jeder Auftrag (eine URL, ein Payload) liegt als ``<id>.json`` in
+    ``<outbox_dir>/pending``. Nach erfolgreicher Zustellung wird die Datei
+    gelöscht, nach zu vielen Fehlversuchen nach ``<outbox_dir>/dead``
+    verschoben. Nicht zugestellte Aufträge überstehen Neustarts.
+    """
+
+    def __init__(self, outbox_dir: str, deliver: Callable[[str, Dict], None],
+                 workers: int = 2, max_attempts: int = 10,
+                 backoff_base: float = 5.0, backoff_max: float = 3600.0,
+                 batching: Callable[[str], Tuple[int, float]] = None):
+        """
+        Args:
+            outbox_dir: Basisverzeichnis der Outbox
+            deliver: Zustellfunktion ``deliver(url, payload)``, wirft bei
+                Fehler. Exceptions mit Attribut ``retry_after`` verschieben
+                den Auftrag, ohne als Fehlversuch zu zählen.
+            workers: Anzahl der Zustell-Threads
+            max_attempts: Maximale Zustellversuche bis Dead-Letter
+            backoff_base: Wartezeit nach dem ersten Fehlversuch in Sekunden
+            backoff_max: Obergrenze der Wartezeit in Sekunden
+            batching: ``batching(url)`` liefert ``(batch_size, batch_wait)``
+                mit der Sammelzeit in Sekunden; bei ``batch_size`` größer 1
+                erhält ``deliver`` eine Liste von Payloads
+        """
+        self.pending_dir = Path(outbox_dir) / 'pending'
+        self.dead_dir = Path(outbox_dir) / 'dead'
+        self.pending_dir.mkdir(parents=True, exist_ok=True)
+        self.dead_dir.mkdir(parents=True, exist_ok=True)
+
+        self.deliver = deliver
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.batching = batching
+
+        self._queue = []  # Heap aus (next_attempt, job_id)
+        self._jobs = {}
+        # Job-ID -> gültiger Eintrag im Heap (ältere Einträge werden übersprungen)
+        self._scheduled = {}
+        # URL -> Heap aus (next_attempt, job_id) der Aufträge dieser URL
+        self._waiting = {}
+        # URL -> noch sammelnde Aufträge im Batch-Modus (in Eingangsreihenfolge)
+        self._lingering = {}
+        self._in_flight = 0
+        self._cond = threading.Condition()
+        self._threads = []
+        self._running = False
+
+    def _job_path(self, job_id: str) -> Path:
+        return self.pending_dir / f"{job_id}.json"
+
+    def _batch_settings(self, url: str) -> Tuple[int, float]:
+        if self.batching is None:
+            return 1, 0
+        return self.batching(url)
+
+    def _push(self, job: Dict):
+        """Auftrag in die Warteschlange einreihen (Lock muss gehalten werden)"""
+        self._jobs[job['id']] = job
+        self._schedule(job['id'], job['next_attempt'])
+
+    def _schedule(self, job_id: str, when: float):
+        self._scheduled[job_id] = when
+        heapq.heappush(self._queue, (when, job_id))
+        heapq.heappush(self._waiting.setdefault(self._jobs[job_id]['url'], []), (when, job_id))
+        self._cond.notify_all()
+
+    def enqueue(self, url: str, payload: Dict) -> str:
+        """
+        Webhook-Zustellung dauerhaft einreihen
+
+        Args:
+            url: Webhook-URL
+            payload: JSON-Payload
+
+        Returns:
+            ID des Auftrags
+        """
+        batch_size, batch_wait = self._batch_settings(url)
+        now = time.time()
+        job = {
+            'id': f"{time.time_ns()}-{uuid.uuid4().hex[:8]}",
+            'url': url,
+            'payload': payload,
+            'attempts': 0,
+            'next_attempt': now + batch_wait if batch_size > 1 else now,
+            'last_error': None
+        }
+        write_json_atomic(self._job_path(job['id']), job)
+
+        with self._cond:
+            self._push(job)
+            if batch_size > 1:
+                lingering = self._lingering.setdefault(url, {})
+                lingering[job['id']] = None
+                if len(lingering) >= batch_size:
+                    # Batch voll: ältesten Auftrag sofort fällig machen
+                    self._schedule(next(iter(lingering)), now)
+
+        return job['id']
+
+    def _load_pending(self):
+        """Unzugestellte Aufträge aus dem Outbox-Verzeichnis laden"""
+        count = 0
+        for job_file in sorted(self.pending_dir.glob('*.json')):
+            try:
+                with open(job_file, 'r', encoding='utf-8') as f:
+                    job = json.load(f)
+            except Exception as e:
+                logger.warning(f"Outbox-Auftrag {job_file.name} unlesbar: {e}")
+                self._move_to_dead_letter(job_file)
+                continue
+
+            with self._cond:
+                if job['id'] not in self._jobs:
+                    self._push(job)
+                    count += 1
+
+        if count:
+            logger.info(f"Outbox: {count} unzugestellte Webhooks geladen")
+
+    def _move_to_dead_letter(self, job_file: Path):
+        try:
+            os.replace(job_file, self.dead_dir / job_file.name)
+        except OSError as e:
+            logger.error(f"Outbox-Auftrag {job_file.name} nicht verschiebbar: {e}")
+
+    def backoff(self, attempts: int) -> float:
+        """
+        Wartezeit bis zum nächsten Versuch (exponentiell, mit Jitter)
+
+        Args:
+            attempts: Bisherige Fehlversuche
+
+        Returns:
+            Wartezeit in Sekunden
+        """
+        delay = min(self.backoff_max, self.backoff_base * (2 ** (attempts - 1)))
+        return delay / 2 + random.uniform(0, delay / 2)
+
+    def _next_batch(self) -> Tuple[List[Dict], bool]:
+        """
+        Nächste fällige Aufträge holen (blockiert bis fällig oder Stopp)
+
+        Returns:
+            (Aufträge, Batch-Modus); leere Liste bei Stopp
+        """
+        with self._cond:
+            while self._running:
+                if not self._queue:
+                    self._cond.wait()
+                    continue
+
+                # Veraltete Einträge (vorgezogen, bereits im Batch oder neu
+                # geplant) überspringen
+                next_attempt = self._next_due()
+                if not self._queue:
+                    continue
+
+                delay = next_attempt - time.time()
+                if delay > 0:
+                    self._cond.wait(delay)
+                    continue
+
+                _, job_id = heapq.heappop(self._queue)
+                del self._scheduled[job_id]
+                jobs = [self._jobs[job_id]]
+                url = jobs[0]['url']
+                batch_size, batch_wait = self._batch_settings(url)
+                if batch_size > 1:
+                    jobs.extend(self._collect(url, batch_size - 1, time.time() + batch_wait))
+                    lingering = self._lingering.get(url)
+                    if lingering is not None:
+                        for job in jobs:
+                            lingering.pop(job['id'], None)
+                        if not lingering:
+                            del self._lingering[url]
+                else:
+                    self._prune(url)
+
+                self._in_flight += 1
+                return jobs, batch_size > 1
+
+        return [], False
+
+    def _next_due(self) -> float:
+        """Zeitpunkt des nächsten gültigen Heap-Eintrags (Lock muss gehalten werden)"""
+        while self._queue:
+            when, job_id = self._queue[0]
+            if self._scheduled.get(job_id) == when:
+                return when
+            heapq.heappop(self._queue)
+        return float('inf')
+
+    def _prune(self, url: str) -> List[Tuple[float, str]]:
+        """
+        Veraltete Einträge vom Anfang des URL-Heaps entfernen (Lock muss gehalten werden)
+
+        Returns:
+            Heap der URL (leer, wenn kein Auftrag mehr wartet)
+        """
+        waiting = self._waiting.get(url, [])
+        while waiting:
+            when, job_id = waiting[0]
+            if self._scheduled.get(job_id) == when:
+                return waiting
+            heapq.heappop(waiting)
+        self._waiting.pop(url, None)
+        return waiting
+
+    def _collect(self, url: str, limit: int, until: float) -> List[Dict]:
+        """Weitere wartende Aufträge derselben URL (Lock muss gehalten werden)"""
+        jobs = []
+        waiting = self._prune(url)
+        while waiting and len(jobs) < limit and waiting[0][0] <= until:
+            _, job_id = heapq.heappop(waiting)
+            del self._scheduled[job_id]
+            jobs.append(self._jobs[job_id])
+            waiting = self._prune(url)
+        return jobs
+
+    def _finish(self, jobs: List[Dict]):
+        with self._cond:
+            for job in jobs:
+                self._jobs.pop(job['id'], None)
+            self._in_flight -= 1
+            self._cond.notify_all()
+
+    def _requeue(self, jobs: List[Dict]):
+        with self._cond:
+            self._in_flight -= 1
+            for job in jobs:
+                self._push(job)
+
+    def _process(self, jobs: List[Dict], batched: bool):
+        """Auftrag bzw. Batch von Aufträgen derselben URL zustellen"""
+        url = jobs[0]['url']
+
+        try:
+            if batched:
+                self.deliver(url, [job['payload'] for job in jobs])
+            else:
+                self.deliver(url, jobs[0]['payload'])
+        except Exception as e:
+            retry_after = getattr(e, 'retry_after', None)
+            if retry_after is not None:
+                # Endpunkt vorübergehend gesperrt, zählt nicht als Versuch
+                for job in jobs:
+                    job['next_attempt'] = time.time() + retry_after
+                self._requeue(jobs)
+                return
+
+            retry, dead = [], []
+            for job in jobs:
+                job['attempts'] += 1
+                job['last_error'] = str(e)
+                (dead if job['attempts'] >= self.max_attempts else retry).append(job)
+
+            for job in dead:
+                logger.error(
+                    f"Webhook endgültig fehlgeschlagen ({url}) nach "
+                    f"{job['attempts']} Versuchen: {e}"
+                )
+                job_file = self._job_path(job['id'])
+                write_json_atomic(job_file, job)
+                self._move_to_dead_letter(job_file)
+
+            if retry:
+                # Ein gemeinsamer Zeitpunkt, damit der Batch zusammen bleibt
+                attempts = max(job['attempts'] for job in retry)
+                delay = self.backoff(attempts)
+                suffix = f" ({len(retry)} SMS)" if batched else ""
+                logger.warning(
+                    f"Webhook-Fehler ({url}){suffix}: {e} - "
+                    f"Versuch {attempts}/{self.max_attempts}, "
+                    f"nächster in {delay:.0f}s"
+                )
+                for job in retry:
+                    job['next_attempt'] = time.time() + delay
+                    write_json_atomic(self._job_path(job['id']), job)
+
+            with self._cond:
+                self._in_flight -= 1
+                for job in dead:
+                    self._jobs.pop(job['id'], None)
+                for job in retry:
+                    self._push(job)
+                self._cond.notify_all()
+            return
+
+        for job in jobs:
+            try:
+                self._job_path(job['id']).unlink()
+            except FileNotFoundError:
+                pass
+        self._finish(jobs)
+
+    def _worker(self):
+        while True:
+            jobs, batched = self._next_batch()
+            if not jobs:
+                return
+
+            try:
+                self._process(jobs, batched)
+            except Exception as e:
+                logger.error(f"Outbox-Worker Fehler: {e}", exc_info=True)
+                self._finish(jobs)
+
+    def start(self):
+        """Gespeicherte Aufträge laden und Zustell-Worker starten"""
+        if self._running:
+            return
+
+        self._running = True
+        self._load_pending()
+
+        for i in range(self.workers):
+            thread = threading.Thread(
+                target=self._worker, name=f"webhook-outbox-{i}", daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout: float = 0, join_timeout: Optional[float] = 10):
+        """
+        Zustell-Worker beenden
+
+        Nicht zugestellte Aufträge bleiben im Outbox-Verzeichnis erhalten.
+
+        Args:
+            timeout: Maximale Wartezeit in Sekunden, bis fällige Aufträge
+                zugestellt sind (0 = nicht warten)
+            join_timeout: Wartezeit pro Worker auf das Ende einer laufenden
+                Zustellung (None = bis sie abgeschlossen ist)
+        """
+        deadline = time.monotonic() + timeout
+
+        with self._cond:
+            if timeout > 0:
+                # Sammelnde Batches nicht bis zum Ablauf von batch_ms zurückhalten
+                now = time.time()
+                for lingering in self._lingering.values():
+                    for job_id in lingering:
+                        if job_id in self._scheduled:
+                            self._schedule(job_id, now)
+
+            while self._running:
+                due = self._next_due() <= time.time()
+                remaining = deadline - time.monotonic()
+                if not (due or self._in_flight) or remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+
+            self._running = False
+            self._cond.notify_all()
+
+        for thread in self._threads:
+            thread.join(timeout=join_timeout)
+        self._threads = []
+
+    def __len__(self) -> int:
+        with self._cond:
+            return len(self._jobs)
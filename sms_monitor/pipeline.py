@@ -0,0 +1,177 @@
+"""
+Ingest-Pipeline aus nebenläufigen Stufen
+
+Jede Stufe hat eine begrenzte Eingangs-Queue und eine eigene Anzahl
+Worker-Threads. Ist die Queue einer Stufe voll, blockiert die vorherige
+Stufe beim Weiterreichen (Backpressure) - bei einem Stau wächst also kein
+Puffer unbegrenzt, sondern der Abruf vom Modem wird gebremst. Der
+Durchsatz ergibt sich aus der langsamsten Stufe und deren Parallelität,
+nicht aus der Summe aller Latenzen.
+"""
+
+import logging
+import threading
+from collections import deque
+from typing import Any, Callable, List, Optional
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class Stage:
+    """
+    Pipeline-Stufe mit begrenzter Queue und Worker-Threads
+
+    ``handler(item)`` verarbeitet ein Element; ein Rückgabewert ungleich
+    None wird an die nächste Stufe weitergereicht.
+    """
+
+    def __init__(self, name: str, handler: Callable[[Any], Any], workers: int = 1,
+                 capacity: int = 100, on_idle: Callable[[], None] = None):
+        """
+        Args:
+            name: Name der Stufe (Threads, Metriken, Log)
+            handler: Verarbeitung eines Elements
+            workers: Anzahl Worker-Threads
+            capacity: Maximale Anzahl wartender Elemente
+            on_idle: Wird aufgerufen, sobald die Queue leergelaufen ist
+                (z.B. für Gruppen-Commits)
+        """
+        self.name = name
+        self.handler = handler
+        self.workers = max(workers, 1)
+        self.capacity = max(capacity, 1)
+        self.on_idle = on_idle
+        self.next_stage: Optional['Stage'] = None
+        self._items = deque()
+        self._busy = 0
+        self._running = False
+        self._threads = []
+        self._cond = threading.Condition()
+
+    def __len__(self) -> int:
+        with self._cond:
+            return len(self._items) + self._busy
+
+    def put(self, item) -> bool:
+        """
+        Element einreihen (blockiert, solange die Queue voll ist)
+
+        Returns:
+            False wenn die Stufe beendet ist
+        """
+        with self._cond:
+            while self._running and len(self._items) >= self.capacity:
+                self._cond.wait()
+            if not self._running:
+                return False
+
+            self._items.append(item)
+            metrics.PIPELINE_QUEUE.set(len(self._items), stage=self.name)
+            self._cond.notify_all()
+            return True
+
+    def _get(self):
+        with self._cond:
+            while self._running and not self._items:
+                self._cond.wait()
+            if not self._items:
+                return None
+
+            item = self._items.popleft()
+            self._busy += 1
+            metrics.PIPELINE_QUEUE.set(len(self._items), stage=self.name)
+            # Wartende Produzenten wecken
+            self._cond.notify_all()
+            return item
+
+    def _done(self) -> bool:
+        """Element abgeschlossen; True wenn die Stufe danach leer ist"""
+        with self._cond:
+            self._busy -= 1
+            idle = not self._items and not self._busy
+            self._cond.notify_all()
+            return idle
+
+    def _run(self):
+        while True:
+            item = self._get()
+            if item is None:
+                return
+
+            try:
+                with metrics.PIPELINE_STAGE_SECONDS.time(stage=self.name):
+                    result = self.handler(item)
+                if result is not None and self.next_stage is not None:
+                    self.next_stage.put(result)
+            except Exception as e:
+                logger.error(f"Fehler in Pipeline-Stufe {self.name}: {e}", exc_info=True)
+            finally:
+                idle = self._done()
+
+            if idle and self.on_idle is not None:
+                try:
+                    self.on_idle()
+                except Exception as e:
+                    logger.error(f"Fehler in Pipeline-Stufe {self.name}: {e}", exc_info=True)
+
+    def start(self):
+        if self._running:
+            return
+
+        self._running = True
+        for i in range(self.workers):
+            thread = threading.Thread(
+                target=self._run, name=f"pipeline-{self.name}-{i}", daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def drain(self, timeout: float = None) -> bool:
+        """
+        Warten bis alle Elemente verarbeitet sind
+
+        Returns:
+            True wenn die Stufe leer ist
+        """
+        with self._cond:
+            return self._cond.wait_for(lambda: not self._items and not self._busy, timeout)
+
+    def stop(self):
+        """Worker beenden (noch wartende Elemente werden abgearbeitet)"""
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+
+class Pipeline:
+    """Hintereinander geschaltete Stufen"""
+
+    def __init__(self, stages: List[Stage]):
+        self.stages = stages
+        for stage, next_stage in zip(stages, stages[1:]):
+            stage.next_stage = next_stage
+
+    def __getitem__(self, name: str) -> Stage:
+        for stage in self.stages:
+            if stage.name == name:
+                return stage
+        raise KeyError(name)
+
+    def __len__(self) -> int:
+        return sum(len(stage) for stage in self.stages)
+
+    def start(self):
+        for stage in reversed(self.stages):
+            stage.start()
+
+    def stop(self):
+        """Stufen in Reihenfolge leeren und beenden"""
+        for stage in self.stages:
+            stage.drain()
+            stage.stop()
@@ -0,0 +1,358 @@
+"""
+Routing von SMS auf Webhooks
+
+Regeln aus ``routes`` legen fest, welche Webhooks eine SMS erhalten. Eine
+Regel trifft zu, wenn alle ihre Bedingungen erfüllt sind:
+
+- ``sender_prefix``: Absendernummer beginnt mit einem der Präfixe
+- ``text_regex``: regulärer Ausdruck kommt im Text vor
+- ``modem``: SMS kam über eines der Modems (Label)
+
+Treffen mehrere Regeln zu, werden ihre ``webhooks`` vereinigt; trifft eine
+Regel mit ``"drop": true`` zu, geht die SMS an keinen Webhook. SMS ohne
+passende Regel behandelt ``route_default`` (``all`` oder ``drop``).
+
+Die Regeln werden beim Start einmal übersetzt: alle Präfixe in einen
+gemeinsamen Präfixbaum, alle Ausdrücke ohne eigene Gruppen in einen
+kombinierten Ausdruck mit einer benannten Gruppe pro Regel. Eine SMS wird
+damit in einem Durchlauf über Nummer und Text geprüft, unabhängig von der
+Anzahl der Regeln. Ausdrücke mit Gruppen (benannte Gruppen könnten
+kollidieren, Rückverweise wie ``\1`` würden verschoben) werden einzeln
+geprüft.
+"""
+
+import logging
+import re
+from typing import Dict, List, Optional, Set
+
+from .metrics import WEBHOOK_ROUTES
+from .webhooks import parse_webhooks
+
+logger = logging.getLogger(__name__)
+
+# Führende globale Flags wie "(?i)", die im kombinierten Ausdruck nicht
+# mehr am Anfang stehen und deshalb auf die Regel begrenzt werden
+_GLOBAL_FLAGS = re.compile(r'^\(\?([aiLmsux]+)\)')
+
+# Zeichen, die beim Vergleich der Absendernummer ignoriert werden
+_NUMBER_SEPARATORS = str.maketrans('', '', ' -/().')
+
+RULE_KEYS = ('name', 'sender_prefix', 'text_regex', 'modem', 'webhooks', 'drop')
+
+
+def normalize_number(number: str) -> str:
+    """Absendernummer ohne Leer- und Trennzeichen"""
+    return (number or '').translate(_NUMBER_SEPARATORS)
+
+
+def _as_list(value) -> List[str]:
+    if value is None:
+        return []
+    if isinstance(value, str):
+        return [value]
+    return list(value)
+
+
+class _TrieNode:
+    __slots__ = ('children', 'rules')
+
+    def __init__(self):
+        self.children = {}
+        self.rules = []
+
+
+class Route:
+    """Übersetzte Regel"""
+
+    def __init__(self, index: int, entry: Dict, targets: List[str]):
+        self.index = index
+        self.name = entry.get('name') or f"#{index + 1}"
+        self.prefixes = [normalize_number(p) for p in _as_list(entry.get('sender_prefix'))]
+        self.pattern = entry.get('text_regex')
+        self.modems = _as_list(entry.get('modem'))
+        self.targets = targets
+        self.drop = bool(entry.get('drop'))
+        self.regex = re.compile(self.pattern) if self.pattern is not None else None
+
+    @property
+    def combinable(self) -> bool:
+        """Ausdruck kann ohne Änderung der Bedeutung kombiniert werden"""
+        return self.regex is not None and self.regex.groups == 0
+
+
+def _combine(routes: List[Route]):
+    """
+    Kombinierten Ausdruck für Regeln ohne eigene Gruppen übersetzen
+
+    Returns:
+        (kompilierter Ausdruck oder None, Gruppennummer -> Regelindex)
+
+    Raises:
+        re.error wenn sich die Ausdrücke nicht kombinieren lassen
+    """
+    parts = []
+    for route in routes:
+        pattern = route.pattern
+        flags = _GLOBAL_FLAGS.match(pattern)
+        if flags:
+            pattern = f"(?{flags.group(1)}:{pattern[flags.end():]})"
+        # Leere Markierungsgruppe am Ende: eine Gruppe am Anfang jeder
+        # Alternative verhindert, dass re Textstellen anhand der
+        # möglichen Anfangszeichen überspringt
+        parts.append(f"(?:{pattern})(?P<r{route.index}>)")
+
+    if not parts:
+        return None, {}
+
+    combined = re.compile('|'.join(parts))
+    groups = {}
+    for group, number in combined.groupindex.items():
+        if group.startswith('r') and group[1:].isdigit():
+            groups[number] = int(group[1:])
+    return combined, groups
+
+
+class RouteTable:
+    """Übersetzte Routing-Regeln"""
+
+    def __init__(self, routes: List[Dict], webhooks: List, default: str = 'all'):
+        """
+        Args:
+            routes: Regeln aus der Konfiguration
+            webhooks: Webhook-Einträge (Ziele per Name oder URL)
+            default: Behandlung von SMS ohne passende Regel (all, drop)
+
+        Raises:
+            ValueError bei ungültigen Regeln
+        """
+        errors = check_routes(routes, webhooks)
+        if errors:
+            raise ValueError('; '.join(errors))
+
+        endpoints = parse_webhooks(webhooks)
+        self.all_targets = [entry['url'] for entry in endpoints]
+        by_name = {entry['name']: entry['url'] for entry in endpoints}
+        self.default_drop = default == 'drop'
+
+        self.routes = []
+        for index, entry in enumerate(routes or []):
+            targets = [by_name.get(target, target) for target in _as_list(entry.get('webhooks'))]
+            self.routes.append(Route(index, entry, targets))
+
+        # Präfixbaum über alle Absender-Präfixe
+        self._trie = _TrieNode()
+        self._any_sender = set()
+        for route in self.routes:
+            if not route.prefixes:
+                self._any_sender.add(route.index)
+            for prefix in route.prefixes:
+                node = self._trie
+                for char in prefix:
+                    node = node.children.setdefault(char, _TrieNode())
+                node.rules.append(route.index)
+
+        # Modem-Label -> Regeln
+        self._by_modem = {}
+        self._any_modem = set()
+        for route in self.routes:
+            if not route.modems:
+                self._any_modem.add(route.index)
+            for modem in route.modems:
+                self._by_modem.setdefault(modem, set()).add(route.index)
+
+        # Ein Ausdruck mit einer Gruppe pro kombinierbarer Regel, die
+        # übrigen Ausdrücke werden einzeln geprüft
+        self._text_rules = {route.index for route in self.routes if route.regex is not None}
+        self._text_drops = any(self.routes[index].drop for index in self._text_rules)
+        self._text_targets = set()
+        for index in self._text_rules:
+            self._text_targets.update(self.routes[index].targets)
+        self._separate = {route.index for route in self.routes
+                          if route.regex is not None and not route.combinable}
+        try:
+            self._combined, self._groups = _combine(
+                [route for route in self.routes if route.combinable]
+            )
+        except re.error as e:
+            raise ValueError(f"routes: Ausdrücke lassen sich nicht kombinieren: {e}")
+
+    def __len__(self) -> int:
+        return len(self.routes)
+
+    def _match_sender(self, number: str) -> Set[int]:
+        matched = set(self._any_sender)
+        node = self._trie
+        for char in normalize_number(number):
+            node = node.children.get(char)
+            if node is None:
+                break
+            matched.update(node.rules)
+        return matched
+
+    def match(self, sms_data: Dict) -> List[Route]:
+        """
+        Zutreffende Regeln
+
+        Regeln mit Textbedingung, deren Ziele bereits abgedeckt sind, werden
+        nur gemeldet, wenn der kombinierte Ausdruck sie direkt gefunden hat.
+
+        Args:
+            sms_data: SMS-Daten (number, text, modem)
+
+        Returns:
+            Zutreffende Regeln in Konfigurationsreihenfolge
+        """
+        candidates = self._match_sender(sms_data.get('number'))
+        candidates &= self._any_modem | self._by_modem.get(sms_data.get('modem'), set())
+        if not candidates:
+            return []
+
+        matched = candidates - self._text_rules
+        text_candidates = candidates & self._text_rules
+        if text_candidates:
+            text = sms_data.get('text') or ''
+            found = set()
+            if self._combined is not None and text_candidates - self._separate:
+                for m in self._combined.finditer(text):
+                    found.add(self._groups[m.lastindex])
+            for index in sorted(text_candidates & self._separate):
+                if self.routes[index].regex.search(text):
+                    found.add(index)
+            matched |= found & text_candidates
+
+            # Der kombinierte Ausdruck meldet pro Textstelle nur eine Regel;
+            # überlappende Treffer anderer Regeln nur prüfen, wenn sie das
+            # Ergebnis noch ändern können
+            if found:
+                self._match_overlapping(
+                    text, text_candidates - found - self._separate, matched
+                )
+
+        return [self.routes[index] for index in sorted(matched)]
+
+    def _match_overlapping(self, text: str, remaining: Set[int], matched: Set[int]):
+        if any(self.routes[index].drop for index in matched):
+            return
+
+        covered = set()
+        for index in matched:
+            covered.update(self.routes[index].targets)
+
+        for index in sorted(remaining):
+            if not self._text_drops and covered.issuperset(self._text_targets):
+                return
+            route = self.routes[index]
+            if not route.drop and covered.issuperset(route.targets):
+                continue
+            if route.regex.search(text):
+                matched.add(index)
+                if route.drop:
+                    return
+                covered.update(route.targets)
+
+    def route(self, sms_data: Dict) -> Optional[List[str]]:
+        """
+        Ziel-Webhooks einer SMS
+
+        Args:
+            sms_data: SMS-Daten (number, text, modem)
+
+        Returns:
+            Liste der Webhook-URLs (leer wenn die SMS verworfen wird)
+        """
+        routes = self.match(sms_data)
+        if not routes:
+            WEBHOOK_ROUTES.inc(route='default')
+            return [] if self.default_drop else list(self.all_targets)
+
+        for route in routes:
+            WEBHOOK_ROUTES.inc(route=route.name)
+
+        if any(route.drop for route in routes):
+            return []
+
+        targets = []
+        for route in routes:
+            for target in route.targets:
+                if target not in targets:
+                    targets.append(target)
+        return targets
+
+
+def check_routes(routes, webhooks) -> List[str]:
+    """
+    Routing-Regeln prüfen
+
+    Args:
+        routes: Regeln aus der Konfiguration
+        webhooks: Webhook-Einträge
+
+    Returns:
+        Liste der Fehler (leer wenn gültig)
+    """
+    if routes is None:
+        return []
+    if not isinstance(routes, list):
+        return [f"routes: Liste erwartet, nicht {routes!r}"]
+
+    try:
+        endpoints = parse_webhooks(webhooks)
+    except (KeyError, TypeError, ValueError):
+        # Fehler meldet bereits die Prüfung von webhooks
+        endpoints = []
+    known = {entry['name'] for entry in endpoints} | {entry['url'] for entry in endpoints}
+
+    errors = []
+    for index, entry in enumerate(routes):
+        where = f"routes[{index}]"
+        if not isinstance(entry, dict):
+            errors.append(f"{where}: Objekt erwartet, nicht {entry!r}")
+            continue
+
+        unknown = sorted(set(entry) - set(RULE_KEYS))
+        if unknown:
+            errors.append(f"{where}: unbekannte Schlüssel: {', '.join(unknown)}")
+
+        for key in ('sender_prefix', 'modem', 'webhooks'):
+            value = entry.get(key)
+            if value is None or isinstance(value, str):
+                continue
+            if not isinstance(value, list) or not all(isinstance(v, str) for v in value):
+                errors.append(f"{where}: {key}: Text oder Liste erwartet, nicht {value!r}")
+
+        pattern = entry.get('text_regex')
+        if pattern is not None:
+            if not isinstance(pattern, str):
+                errors.append(f"{where}: text_regex: Text erwartet, nicht {pattern!r}")
+            else:
+                try:
+                    re.compile(pattern)
+                except re.error as e:
+                    errors.append(f"{where}: text_regex ungültig: {e}")
+
+        if not isinstance(entry.get('drop', False), bool):
+            errors.append(f"{where}: drop: bool erwartet")
+
+        targets = entry.get('webhooks')
+        if entry.get('drop'):
+            if targets:
+                errors.append(f"{where}: drop und webhooks schließen sich aus")
+        elif not targets:
+            errors.append(f"{where}: webhooks oder drop erforderlich")
+        elif isinstance(targets, (str, list)):
+            for target in _as_list(targets):
+                if isinstance(target, str) and target not in known:
+                    errors.append(f"{where}: unbekannter Webhook '{target}'")
+
+    if not errors:
+        # Auch der kombinierte Ausdruck muss sich übersetzen lassen
+        try:
+            _combine([
+                route for route in (Route(index, entry, [])
+                                    for index, entry in enumerate(routes))
+                if route.combinable
+            ])
+        except re.error as e:
+            errors.append(f"routes: Ausdrücke lassen sich nicht kombinieren: {e}")
+
+    return errors
@@ -0,0 +1,105 @@
+"""
+Zeitplan für den Polling-Betrieb
+
+Durchläufe starten mit fester Rate (gemessen ab Beginn des vorherigen
+Durchlaufs, nicht ab dessen Ende), sodass lange Durchläufe das Intervall
+nicht verschieben. Mit ``poll_adaptive`` wird das Intervall bei
+eintreffenden SMS auf ``poll_min_interval`` verkürzt und im Leerlauf
+schrittweise bis ``poll_max_interval`` verlängert. Nach Fehlern wird mit
+exponentiell wachsendem Abstand (höchstens ``poll_backoff_max``) erneut
+versucht.
+"""
+
+import logging
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class PollScheduler:
+    """Berechnet den Zeitpunkt des nächsten Durchlaufs"""
+
+    def __init__(self, config):
+        """
+        Args:
+            config: Config-Objekt (wird bei jedem Durchlauf neu gelesen)
+        """
+        self.config = config
+        self.interval = config.get('check_interval', 30)
+        self.errors = 0
+        self.overruns = 0
+        self._started = None
+        self._overrun_streak = 0
+        self._overrun_in_cycle = False
+
+    def _bounds(self):
+        interval = self.config.get('check_interval', 30)
+        if not self.config.get('poll_adaptive', True):
+            return interval, interval
+        return (
+            min(self.config.get('poll_min_interval', 2), interval),
+            max(self.config.get('poll_max_interval', 120), interval)
+        )
+
+    def begin(self, now: float):
+        """Beginn eines Durchlaufs (monotone Zeit)"""
+        self._started = now
+        self._overrun_in_cycle = False
+
+    def overrun(self, reason: str):
+        """Durchlauf konnte nicht rechtzeitig starten bzw. enden"""
+        self.overruns += 1
+        metrics.POLL_OVERRUNS.inc()
+        if not self._overrun_in_cycle:
+            self._overrun_streak += 1
+        self._overrun_in_cycle = True
+
+        # Bei anhaltender Überlast (z.B. großer Rückstau) nur einmal warnen
+        if self._overrun_streak == 1:
+            logger.warning(f"Polling-Durchlauf überfällig: {reason}")
+        else:
+            logger.debug(f"Polling-Durchlauf überfällig: {reason}")
+
+    def end(self, now: float, new_messages: int = 0, error: bool = False) -> float:
+        """
+        Ende eines Durchlaufs
+
+        Args:
+            now: Monotone Zeit
+            new_messages: Seit dem letzten Durchlauf eingegangene SMS
+            error: Durchlauf bzw. Abruf ist fehlgeschlagen
+
+        Returns:
+            Wartezeit bis zum nächsten Durchlauf in Sekunden
+        """
+        started = self._started if self._started is not None else now
+        min_interval, max_interval = self._bounds()
+
+        if error:
+            self.errors += 1
+            delay = min(
+                max(min_interval, 1) * 2 ** self.errors,
+                self.config.get('poll_backoff_max', 300)
+            )
+            metrics.POLL_INTERVAL_SECONDS.set(delay)
+            logger.debug(f"Polling: {self.errors}. Fehler in Folge, nächster Versuch in {delay}s")
+            return delay
+
+        self.errors = 0
+        if new_messages:
+            self.interval = min_interval
+        else:
+            # Im Leerlauf schrittweise verlängern
+            self.interval = min(max(self.interval * 2, min_interval), max_interval)
+        self.interval = max(min(self.interval, max_interval), min_interval)
+        metrics.POLL_INTERVAL_SECONDS.set(self.interval)
+
+        elapsed = now - started
+        if elapsed > self.interval:
+            self.overrun(f"Dauer {elapsed:.1f}s > Intervall {self.interval}s")
+            return 0
+
+        if not self._overrun_in_cycle:
+            self._overrun_streak = 0
+        return self.interval - elapsed
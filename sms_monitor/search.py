@@ -0,0 +1,296 @@
+"""
+Volltextsuche über gespeicherte SMS
+
+Invertierter Index in einer eigenen SQLite-Datenbank (FTS5). Der Daemon
+pflegt den Index beim Speichern jeder SMS; ``sms-monitor reindex`` nimmt
+nur neue oder geänderte Dateien (bzw. neue Datenbankeinträge) auf und
+entfernt gelöschte.
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, Optional
+
+from .archive import SQLiteMessageStore, TextFileStore, to_epoch
+
+logger = logging.getLogger(__name__)
+
+
+def fts5_available() -> bool:
+    """True wenn das SQLite-Modul FTS5 unterstützt"""
+    try:
+        conn = sqlite3.connect(':memory:')
+        conn.execute("CREATE VIRTUAL TABLE t USING fts5(x)")
+        conn.close()
+        return True
+    except sqlite3.OperationalError:
+        return False
+
+
+def quote_query(query: str) -> str:
+    """Suchbegriffe einzeln als FTS5-Phrasen quoten (z.B. für ``+49...``)"""
+    return ' '.join('"' + term.replace('"', '""') + '"' for term in query.split())
+
+
+class SearchIndex:
+    """FTS5-Index über die SMS-Texte mit Absender, Zeit und Modem"""
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: Pfad zur Index-Datenbank
+        """
+        self.path = Path(path)
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(
+            "CREATE TABLE IF NOT EXISTS docs ("
+            " id INTEGER PRIMARY KEY,"
+            " ref TEXT NOT NULL UNIQUE,"
+            " sender TEXT,"
+            " timestamp TEXT,"
+            " ts INTEGER,"
+            " modem TEXT,"
+            " text TEXT,"
+            " mtime INTEGER,"
+            " size INTEGER"
+            ");"
+            "CREATE INDEX IF NOT EXISTS idx_docs_ts ON docs (ts);"
+            "CREATE VIRTUAL TABLE IF NOT EXISTS docs_fts USING fts5("
+            " text, content='docs', content_rowid='id',"
+            " tokenize='unicode61 remove_diacritics 2'"
+            ");"
+            "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);"
+        )
+        self._conn.commit()
+
+    def add(self, sms_data: Dict, ref: str, stat: os.stat_result = None):
+        """
+        SMS in den Index aufnehmen (ersetzt einen vorhandenen Eintrag)
+
+        Args:
+            sms_data: SMS-Daten
+            ref: Speicherort (Dateipfad bzw. Datenbank-Referenz)
+            stat: Dateistatus für die Änderungserkennung beim Reindex
+        """
+        if stat is None:
+            try:
+                stat = os.stat(ref)
+            except OSError:
+                stat = None
+
+        ts = to_epoch(sms_data['timestamp'])
+
+        with self._lock:
+            self._remove(ref)
+            cursor = self._conn.execute(
+                "INSERT INTO docs (ref, sender, timestamp, ts, modem, text, mtime, size)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    ref,
+                    sms_data['number'],
+                    sms_data['timestamp'],
+                    ts if ts is not None else int(datetime.now().timestamp()),
+                    sms_data.get('modem') or None,
+                    sms_data['text'],
+                    stat.st_mtime_ns if stat else None,
+                    stat.st_size if stat else None
+                )
+            )
+            self._conn.execute(
+                "INSERT INTO docs_fts (rowid, text) VALUES (?, ?)",
+                (cursor.lastrowid, sms_data['text'])
+            )
+
+    def _remove(self, ref: str):
+        row = self._conn.execute(
+            "SELECT id, text FROM docs WHERE ref = ?", (ref,)
+        ).fetchone()
+        if row is None:
+            return
+
+        self._conn.execute(
+            "INSERT INTO docs_fts (docs_fts, rowid, text) VALUES ('delete', ?, ?)",
+            (row['id'], row['text'])
+        )
+        self._conn.execute("DELETE FROM docs WHERE id = ?", (row['id'],))
+
+    def search(self, query: str, sender: str = None, since: datetime = None,
+               until: datetime = None, modem: str = None,
+               limit: int = 20) -> Iterator[Dict]:
+        """
+        Volltextsuche (neueste Treffer zuerst)
+
+        ``query`` nutzt die FTS5-Syntax: ``"exakte phrase"``, ``code AND 4821``,
+        Präfixe wie ``48*``. Ist die Anfrage keine gültige FTS5-Syntax,
+        werden die Begriffe einzeln als Phrasen gesucht.
+
+        Args:
+            query: Suchanfrage
+            sender: Nur SMS dieses Absenders
+            since: Nur SMS ab diesem Zeitpunkt
+            until: Nur SMS vor diesem Zeitpunkt
+            modem: Nur SMS dieses Modems
+            limit: Maximale Anzahl Treffer
+
+        Yields:
+            SMS-Daten inkl. ``ref`` und ``snippet``
+        """
+        clauses = ["docs_fts MATCH ?"]
+        params = []
+        if sender:
+            clauses.append("docs.sender = ?")
+            params.append(sender)
+        if modem:
+            clauses.append("docs.modem = ?")
+            params.append(modem)
+        if since:
+            clauses.append("docs.ts >= ?")
+            params.append(int(since.timestamp()))
+        if until:
+            clauses.append("docs.ts < ?")
+            params.append(int(until.timestamp()))
+
+        sql = (
+            "SELECT docs.*, snippet(docs_fts, 0, '[', ']', '…', 12) AS snippet"
+            " FROM docs_fts JOIN docs ON docs.id = docs_fts.rowid"
+            f" WHERE {' AND '.join(clauses)}"
+            " ORDER BY docs.ts DESC"
+        )
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+
+        # Eigene Verbindung, damit Suchen den Ingest nicht blockieren
+        conn = sqlite3.connect(str(self.path))
+        conn.row_factory = sqlite3.Row
+        try:
+            try:
+                rows = conn.execute(sql, [query] + params).fetchall()
+            except sqlite3.OperationalError:
+                rows = conn.execute(sql, [quote_query(query)] + params).fetchall()
+
+            for row in rows:
+                yield {
+                    'ref': row['ref'],
+                    'number': row['sender'],
+                    'timestamp': row['timestamp'],
+                    'modem': row['modem'] or '',
+                    'text': row['text'],
+                    'snippet': row['snippet'],
+                    'state': ''
+                }
+        finally:
+            conn.close()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM docs").fetchone()[0]
+
+    def _get_meta(self, key: str) -> Optional[str]:
+        row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row['value'] if row else None
+
+    def _set_meta(self, key: str, value: str):
+        self._conn.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value)
+        )
+
+    def reindex(self, store) -> Dict[str, int]:
+        """
+        Index mit der SMS-Ablage abgleichen
+
+        Bei der Datei-Ablage werden nur neue oder geänderte Dateien (mtime,
+        Größe) gelesen und gelöschte entfernt; bei der SQLite-Ablage nur
+        Einträge nach der zuletzt indizierten ID.
+
+        Args:
+            store: MessageStore
+
+        Returns:
+            Zähler ``added``, ``updated``, ``removed``
+        """
+        if isinstance(store, SQLiteMessageStore):
+            counts = self._reindex_database(store)
+        elif isinstance(store, TextFileStore):
+            counts = self._reindex_files(store)
+        else:
+            raise ValueError(f"Reindex für {type(store).__name__} nicht unterstützt")
+
+        self.commit()
+        return counts
+
+    def _reindex_files(self, store: TextFileStore) -> Dict[str, int]:
+        counts = {'added': 0, 'updated': 0, 'removed': 0}
+
+        for filepath in store.matching_files():
+            ref = str(filepath)
+            stat = filepath.stat()
+
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT mtime, size FROM docs WHERE ref = ?", (ref,)
+                ).fetchone()
+            if row and row['mtime'] == stat.st_mtime_ns and row['size'] == stat.st_size:
+                continue
+
+            self.add(store.read_file(filepath), ref, stat)
+            counts['updated' if row else 'added'] += 1
+
+            if sum(counts.values()) % 1000 == 0:
+                self.commit()
+
+        with self._lock:
+            prefix = str(store.sms_dir) + os.sep
+            stale = [
+                row['ref'] for row in self._conn.execute("SELECT ref FROM docs")
+                if row['ref'].startswith(prefix) and not os.path.exists(row['ref'])
+            ]
+            for ref in stale:
+                self._remove(ref)
+            counts['removed'] = len(stale)
+
+        return counts
+
+    def _reindex_database(self, store: SQLiteMessageStore) -> Dict[str, int]:
+        counts = {'added': 0, 'updated': 0, 'removed': 0}
+        meta_key = f"last_id:{store.path}"
+
+        with self._lock:
+            last_id = int(self._get_meta(meta_key) or 0)
+
+        for sms_data in store.query_after_id(last_id):
+            with self._lock:
+                known = self._conn.execute(
+                    "SELECT 1 FROM docs WHERE ref = ?", (sms_data['ref'],)
+                ).fetchone()
+            if not known:
+                self.add(sms_data, sms_data['ref'])
+                counts['added'] += 1
+
+            last_id = sms_data['id']
+            if last_id % 1000 == 0:
+                with self._lock:
+                    self._set_meta(meta_key, str(last_id))
+                self.commit()
+
+        with self._lock:
+            self._set_meta(meta_key, str(last_id))
+
+        return counts
+
+    def commit(self):
+        with self._lock:
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.commit()
+            self._conn.close()
@@ -0,0 +1,611 @@
+"""
+Versand von SMS über ModemManager
+
+Ausgehende SMS liegen als einzelne JSON-Dateien in ``send_dir/pending``
+(Spool). ``sms-monitor send`` legt sie dort ab, auch ohne Verbindung zum
+Daemon; der Daemon bemerkt neue Dateien per inotify (SpoolWatch) und liest
+den Spool nur dann neu ein. Ohne inotify wird alle ``send_scan_interval``
+Sekunden geprüft. Die lokale API reiht direkt ein.
+
+Der SMSSender verschickt jede SMS mit ``Messaging.Create`` und
+``Sms.Send`` über eines der verbundenen Modems. Jedes Modem hat einen
+Token-Bucket (``send_rate`` SMS pro Minute, Spitzen bis ``send_burst``),
+damit die Grenzen des Mobilfunkanbieters eingehalten werden. Pro Modem
+läuft höchstens ein Versand gleichzeitig; eine SMS geht an das freie Modem
+mit den meisten verfügbaren Tokens, mehrere Modems senden also parallel.
+Fehlgeschlagene Versuche werden mit wachsendem Abstand wiederholt und nach
+``send_max_attempts`` Versuchen nach ``send_dir/failed`` verschoben.
+"""
+
+import ctypes
+import heapq
+import itertools
+import json
+import logging
+import os
+import select
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from . import metrics
+from .utils import write_json_atomic
+
+logger = logging.getLogger(__name__)
+
+# Anzahl zuletzt versendeter SMS, deren Status abgefragt werden kann
+RECENT_RESULTS = 1000
+
+
+class SendUnconfirmedError(Exception):
+    """
+    Versand fehlgeschlagen, die SMS ist aber möglicherweise beim Empfänger
+
+    Z.B. Zeitüberschreitung von ``Sms.Send``, während die SMS noch im
+    Zustand SENDING ist. Solche Aufträge werden nicht wiederholt, damit
+    der Empfänger keine Duplikate erhält.
+    """
+
+
+# inotify-Ereignisse (linux/inotify.h)
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+
+
+class TokenBucket:
+    """Token-Bucket für die Senderate eines Modems"""
+
+    def __init__(self, rate: float, burst: int):
+        """
+        Args:
+            rate: Tokens pro Sekunde
+            burst: Maximale Anzahl angesparter Tokens
+        """
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+
+    def configure(self, rate: float, burst: int):
+        """Rate und Größe ändern (z.B. nach Neuladen der Konfiguration)"""
+        self._refill(time.monotonic())
+        self.rate = rate
+        self.burst = burst
+        self.tokens = min(self.tokens, burst)
+
+    def _refill(self, now: float):
+        # Ein vor dem Anlegen gemessenes "now" darf keine Tokens abziehen
+        if now > self.updated:
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+
+    def delay(self, now: float) -> float:
+        """Sekunden bis ein Token verfügbar ist (0 = sofort)"""
+        self._refill(now)
+        if self.tokens >= 1:
+            return 0
+        return (1 - self.tokens) / self.rate
+
+    def take(self, now: float):
+        self._refill(now)
+        self.tokens -= 1
+
+
+class SendQueue:
+    """
+    Dateibasierter Spool ausgehender SMS
+
+    Jede SMS liegt als ``<id>.json`` in ``pending/``; nach dem Versand wird
+    die Datei gelöscht, nach zu vielen Fehlversuchen nach ``failed/``
+    verschoben.
+    """
+
+    def __init__(self, send_dir: str, create: bool = True):
+        """
+        Args:
+            send_dir: Basisverzeichnis des Spools
+            create: Verzeichnisse anlegen (False für reine Abfragen)
+        """
+        self.pending_dir = Path(send_dir) / 'pending'
+        self.failed_dir = Path(send_dir) / 'failed'
+        if create:
+            self.pending_dir.mkdir(parents=True, exist_ok=True)
+            self.failed_dir.mkdir(parents=True, exist_ok=True)
+
+    def job_path(self, job_id: str) -> Path:
+        return self.pending_dir / f"{job_id}.json"
+
+    def create(self, number: str, text: str, modem: str = None) -> Dict:
+        """
+        SMS dauerhaft einreihen
+
+        Args:
+            number: Empfängernummer
+            text: Nachricht
+            modem: Label des zu verwendenden Modems (Standard: beliebiges)
+
+        Returns:
+            Auftrag
+        """
+        job = {
+            'id': f"{time.time_ns()}-{uuid.uuid4().hex[:8]}",
+            'number': number,
+            'text': text,
+            'modem': modem,
+            'created_at': datetime.now().isoformat(),
+            'attempts': 0,
+            'next_attempt': time.time(),
+            'last_error': None
+        }
+        write_json_atomic(self.job_path(job['id']), job)
+        return job
+
+    def save(self, job: Dict):
+        write_json_atomic(self.job_path(job['id']), job)
+
+    def remove(self, job: Dict):
+        try:
+            self.job_path(job['id']).unlink()
+        except FileNotFoundError:
+            pass
+
+    def fail(self, job: Dict):
+        """Auftrag endgültig als fehlgeschlagen ablegen"""
+        write_json_atomic(self.failed_dir / f"{job['id']}.json", job)
+        self.remove(job)
+
+    def _read(self, directory: Path) -> List[Dict]:
+        jobs = []
+        for job_file in sorted(directory.glob('*.json')):
+            try:
+                with open(job_file, 'r', encoding='utf-8') as f:
+                    jobs.append(json.load(f))
+            except FileNotFoundError:
+                continue
+            except ValueError as e:
+                logger.warning(f"Versandauftrag {job_file.name} unlesbar: {e}")
+        return jobs
+
+    def pending(self) -> List[Dict]:
+        """Noch nicht versendete SMS"""
+        return self._read(self.pending_dir)
+
+    def failed(self) -> List[Dict]:
+        """Endgültig fehlgeschlagene SMS"""
+        return self._read(self.failed_dir)
+
+    def failed_job(self, job_id: str) -> Optional[Dict]:
+        try:
+            with open(self.failed_dir / f"{job_id}.json", 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+
+
+class SpoolWatch:
+    """
+    Neue Dateien in einem Verzeichnis per inotify melden (nur Linux)
+
+    Ein eigener Thread blockiert in ``poll()`` und ruft bei jeder neuen
+    oder umbenannten Datei ``callback()`` auf; im Leerlauf wacht er nicht auf.
+    """
+
+    def __init__(self, directory: Path, callback: Callable[[], None]):
+        """
+        Args:
+            directory: Zu überwachendes Verzeichnis
+            callback: Wird nach neuen Dateien aufgerufen
+
+        Raises:
+            OSError wenn inotify nicht verfügbar ist
+        """
+        try:
+            libc = ctypes.CDLL(None, use_errno=True)
+            inotify_init1 = libc.inotify_init1
+            inotify_add_watch = libc.inotify_add_watch
+        except (OSError, AttributeError) as e:
+            raise OSError(f"inotify nicht verfügbar: {e}")
+
+        self.callback = callback
+        self._fd = inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, f"inotify_init1: {os.strerror(errno)}")
+
+        if inotify_add_watch(self._fd, os.fsencode(directory),
+                             IN_CLOSE_WRITE | IN_MOVED_TO) < 0:
+            errno = ctypes.get_errno()
+            os.close(self._fd)
+            raise OSError(errno, f"inotify_add_watch {directory}: {os.strerror(errno)}")
+
+        self._stop_r, self._stop_w = os.pipe()
+        self._thread = None
+
+    def _run(self):
+        poller = select.poll()
+        poller.register(self._fd, select.POLLIN)
+        poller.register(self._stop_r, select.POLLIN)
+
+        while True:
+            ready = {fd for fd, _ in poller.poll()}
+            if self._stop_r in ready:
+                return
+            try:
+                # Ereignisse nur verwerfen: der Aufrufer liest das Verzeichnis neu
+                while os.read(self._fd, 65536):
+                    pass
+            except BlockingIOError:
+                pass
+            self.callback()
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name='send-spool-watch', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is not None:
+            os.write(self._stop_w, b'x')
+            self._thread.join()
+            self._thread = None
+        for fd in (self._fd, self._stop_r, self._stop_w):
+            os.close(fd)
+
+
+class SMSSender:
+    """Scheduler für den Versand über alle verbundenen Modems"""
+
+    def __init__(self, config, queue: SendQueue, modems: Callable[[], List],
+                 send: Callable[[object, str, str], None]):
+        """
+        Args:
+            config: Config-Objekt (Raten und Versuche werden laufend neu gelesen)
+            queue: Spool der ausgehenden SMS
+            modems: Liefert die verbundenen Modems (mit ``label`` und ``path``)
+            send: ``send(modem, number, text)``, wirft bei Fehler
+        """
+        self.config = config
+        self.queue = queue
+        self.modems = modems
+        self.send = send
+
+        self._heap = []  # (next_attempt, seq, job_id)
+        self._seq = itertools.count()
+        self._jobs = {}
+        self._ready = []
+        self._busy = {}  # Modem-Label -> Job-ID
+        self._buckets = {}
+        self._recent = OrderedDict()
+        self._threads = set()
+        self._cond = threading.Condition()
+        self._running = False
+        self._thread = None
+        self._watch = None
+        self._scan_requested = False
+        self._next_scan = 0
+
+    def __len__(self) -> int:
+        """Noch nicht versendete SMS"""
+        with self._cond:
+            return len(self._jobs)
+
+    def _push(self, job: Dict):
+        """Auftrag einplanen (Lock muss gehalten werden)"""
+        self._jobs[job['id']] = job
+        heapq.heappush(self._heap, (job['next_attempt'], next(self._seq), job['id']))
+        self._cond.notify_all()
+
+    def submit(self, number: str, text: str, modem: str = None) -> str:
+        """
+        SMS dauerhaft einreihen und zum Versand einplanen
+
+        Returns:
+            ID des Auftrags
+        """
+        with self._cond:
+            job = self.queue.create(number, text, modem)
+            self._push(job)
+        logger.info(f"SMS an {number} eingereiht ({job['id']})")
+        return job['id']
+
+    def status(self, job_id: str) -> Optional[Dict]:
+        """
+        Status eines Auftrags
+
+        Returns:
+            Dictionary mit ``status`` (pending, sending, sent, failed) oder
+            None wenn unbekannt
+        """
+        with self._cond:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                sending = job_id in self._busy.values()
+                return {
+                    'id': job_id,
+                    'status': 'sending' if sending else 'pending',
+                    'attempts': job['attempts'],
+                    'last_error': job['last_error']
+                }
+            if job_id in self._recent:
+                return dict(self._recent[job_id], id=job_id)
+
+        job = self.queue.failed_job(job_id)
+        if job is not None:
+            return {
+                'id': job_id,
+                'status': 'failed',
+                'attempts': job['attempts'],
+                'last_error': job['last_error']
+            }
+        return None
+
+    def _scan(self):
+        """Neue Dateien im Spool übernehmen (Lock muss gehalten werden)"""
+        count = 0
+        for job in self.queue.pending():
+            if job.get('id') in self._jobs or job.get('id') in self._recent:
+                continue
+            self._push(job)
+            count += 1
+        if count:
+            logger.info(f"{count} SMS zum Versand übernommen")
+
+    def rescan(self):
+        """Spool beim nächsten Durchlauf neu einlesen (z.B. nach SIGHUP)"""
+        with self._cond:
+            self._scan_requested = True
+            self._cond.notify_all()
+
+    def _bucket(self, label: str) -> TokenBucket:
+        rate = self.config.get('send_rate', 10) / 60
+        burst = self.config.get('send_burst', 5)
+        bucket = self._buckets.get(label)
+        if bucket is None:
+            bucket = self._buckets[label] = TokenBucket(rate, burst)
+        elif bucket.rate != rate or bucket.burst != burst:
+            bucket.configure(rate, burst)
+        return bucket
+
+    def _dispatch(self) -> float:
+        """
+        Fällige SMS auf freie Modems verteilen (Lock muss gehalten werden)
+
+        Returns:
+            Maximale Wartezeit bis zum nächsten Aufruf in Sekunden
+        """
+        now = time.time()
+        while self._heap and self._heap[0][0] <= now:
+            _, _, job_id = heapq.heappop(self._heap)
+            if job_id in self._jobs:
+                self._ready.append(self._jobs[job_id])
+
+        timeout = self._heap[0][0] - now if self._heap else None
+        if not self._ready:
+            return timeout
+
+        # Ohne (passendes) Modem nichts verwerfen, auf (Wieder-)Verbindung warten
+        modems = self.modems()
+        labels = {modem.label for modem in modems}
+        mono = time.monotonic()
+        free = {}
+        for modem in modems:
+            if modem.label in self._busy:
+                continue
+            delay = self._bucket(modem.label).delay(mono)
+            if delay > 0:
+                timeout = delay if timeout is None else min(timeout, delay)
+            else:
+                free[modem.label] = modem
+
+        remaining = []
+        absent = False
+        for job in self._ready:
+            wanted = job.get('modem')
+            if not modems or (wanted and wanted not in labels):
+                error = self._unreachable(job) if wanted else None
+                if error is not None:
+                    self._give_up(job, error)
+                else:
+                    remaining.append(job)
+                    absent = True
+                continue
+
+            candidates = [free[wanted]] if wanted in free else \
+                [] if wanted else list(free.values())
+            if not candidates:
+                remaining.append(job)
+                continue
+
+            modem = max(candidates, key=lambda m: self._buckets[m.label].tokens)
+            del free[modem.label]
+            self._start(job, modem)
+
+        self._ready = remaining
+        if absent:
+            timeout = 5 if timeout is None else min(timeout, 5)
+        return timeout
+
+    def _unreachable(self, job: Dict) -> Optional[str]:
+        """
+        Prüfen, ob ein Auftrag weiter auf sein nicht verbundenes Modem warten soll
+
+        Returns:
+            Fehlermeldung, wenn das Modem nicht konfiguriert ist oder
+            send_modem_wait verstrichen ist, sonst None
+        """
+        wanted = job['modem']
+        selection = self.config.get('modems')
+        if isinstance(selection, list) and \
+                all(isinstance(entry, dict) and entry.get('label') for entry in selection):
+            # Nur wenn alle Modems ein festes Label haben, ist die Menge bekannt
+            # (sonst gilt die IMEI, die erst beim Verbinden feststeht)
+            if wanted not in {entry['label'] for entry in selection}:
+                return f"Modem {wanted} nicht konfiguriert"
+
+        wait = self.config.get('send_modem_wait', 3600)
+        try:
+            waited = (datetime.now() - datetime.fromisoformat(job['created_at'])).total_seconds()
+        except (KeyError, TypeError, ValueError):
+            return None
+        if waited >= wait:
+            return f"Modem {wanted} seit {wait}s nicht verbunden"
+        return None
+
+    def _give_up(self, job: Dict, error: str):
+        """Auftrag ohne Versuch endgültig ablegen (Lock muss gehalten werden)"""
+        metrics.SMS_SENT.inc(modem=job['modem'], result='error')
+        job['last_error'] = error
+        logger.error(f"SMS an {job['number']} nicht gesendet: {error}")
+        self.queue.fail(job)
+        self._jobs.pop(job['id'], None)
+
+    def _start(self, job: Dict, modem):
+        """Versand in einem eigenen Thread starten (Lock muss gehalten werden)"""
+        self._bucket(modem.label).take(time.monotonic())
+        self._busy[modem.label] = job['id']
+
+        thread = threading.Thread(
+            target=self._send_job, args=(job, modem),
+            name=f"send-{modem.label}", daemon=True
+        )
+        self._threads.add(thread)
+        thread.start()
+
+    def _send_job(self, job: Dict, modem):
+        error = None
+        try:
+            self.send(modem, job['number'], job['text'])
+        except Exception as e:
+            error = e
+
+        try:
+            if error is None:
+                self._succeeded(job, modem.label)
+            else:
+                self._failed(job, modem.label, error)
+        except Exception as e:
+            logger.error(f"Versandauftrag {job['id']}: {e}", exc_info=True)
+        finally:
+            with self._cond:
+                self._busy.pop(modem.label, None)
+                self._threads.discard(threading.current_thread())
+                self._cond.notify_all()
+
+    def _succeeded(self, job: Dict, label: str):
+        metrics.SMS_SENT.inc(modem=label, result='sent')
+        logger.info(f"SMS an {job['number']} gesendet [{label}]")
+        with self._cond:
+            self.queue.remove(job)
+            self._jobs.pop(job['id'], None)
+            self._recent[job['id']] = {
+                'status': 'sent',
+                'modem': label,
+                'sent_at': datetime.now().isoformat()
+            }
+            while len(self._recent) > RECENT_RESULTS:
+                self._recent.popitem(last=False)
+
+    def _failed(self, job: Dict, label: str, error: Exception):
+        metrics.SMS_SENT.inc(modem=label, result='error')
+        job['attempts'] += 1
+        job['last_error'] = str(error)
+        max_attempts = self.config.get('send_max_attempts', 5)
+
+        with self._cond:
+            if isinstance(error, SendUnconfirmedError):
+                logger.error(
+                    f"SMS an {job['number']} nicht wiederholt, evtl. bereits "
+                    f"zugestellt [{label}]: {error}"
+                )
+                self.queue.fail(job)
+                self._jobs.pop(job['id'], None)
+                return
+
+            if job['attempts'] >= max_attempts:
+                logger.error(
+                    f"SMS an {job['number']} endgültig fehlgeschlagen nach "
+                    f"{job['attempts']} Versuchen: {error}"
+                )
+                self.queue.fail(job)
+                self._jobs.pop(job['id'], None)
+                return
+
+            delay = min(
+                self.config.get('send_retry_delay', 30) * 2 ** (job['attempts'] - 1),
+                self.config.get('send_retry_max', 900)
+            )
+            job['next_attempt'] = time.time() + delay
+            logger.warning(
+                f"SMS an {job['number']} nicht gesendet [{label}]: {error} - "
+                f"Versuch {job['attempts']}/{max_attempts}, nächster in {delay:.0f}s"
+            )
+            self.queue.save(job)
+            self._push(job)
+
+    def _run(self):
+        with self._cond:
+            while self._running:
+                # Mit inotify nur bei Bedarf, sonst im Abstand von send_scan_interval
+                if self._scan_requested or \
+                        (self._watch is None and time.monotonic() >= self._next_scan):
+                    self._scan_requested = False
+                    try:
+                        self._scan()
+                    except OSError as e:
+                        logger.error(f"Versand-Spool nicht lesbar: {e}")
+                    self._next_scan = time.monotonic() + self.config.get('send_scan_interval', 5)
+
+                try:
+                    timeout = self._dispatch()
+                except Exception as e:
+                    logger.error(f"Fehler beim SMS-Versand: {e}", exc_info=True)
+                    timeout = 5
+
+                if self._watch is None:
+                    until_scan = max(self._next_scan - time.monotonic(), 0)
+                    timeout = until_scan if timeout is None else min(timeout, until_scan)
+                self._cond.wait(timeout)
+
+    def start(self):
+        """Spool laden und Scheduler starten"""
+        if self._running:
+            return
+
+        try:
+            self._watch = SpoolWatch(self.queue.pending_dir, self.rescan)
+            self._watch.start()
+        except OSError as e:
+            self._watch = None
+            logger.warning(
+                f"Versand-Spool wird alle {self.config.get('send_scan_interval', 5)}s "
+                f"geprüft ({e})"
+            )
+
+        self._running = True
+        self._scan_requested = True
+        self._thread = threading.Thread(target=self._run, name='sms-sender', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 0):
+        """
+        Scheduler beenden
+
+        Nicht versendete SMS bleiben im Spool erhalten.
+
+        Args:
+            timeout: Maximale Wartezeit für laufende Sendevorgänge in Sekunden
+        """
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+            self._cond.wait_for(lambda: not self._threads, timeout)
+
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self._watch is not None:
+            self._watch.stop()
+            self._watch = None
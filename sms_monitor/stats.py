@@ -0,0 +1,152 @@
+"""
+Laufend gepflegte Statistiken
+
+Der Daemon zählt während des Empfangs mit (pro Absender, Stunde, Tag und
+Modem sowie Webhook-Erfolge/-Fehler) und schreibt die Zähler regelmäßig
+als kleinen JSON-Snapshot. ``sms-monitor stats`` liest nur diesen
+Snapshot und muss weder die Processed-DB noch das SMS-Verzeichnis
+durchsuchen.
+"""
+
+import json
+import logging
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional
+
+from .utils import write_json_atomic
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_VERSION = 1
+
+
+class StatsCollector:
+    """Inkrementelle Zähler mit periodischem Snapshot"""
+
+    def __init__(self, path: str, flush_interval: float = 10,
+                 hours_retention: int = 168, days_retention: int = 400):
+        """
+        Args:
+            path: Pfad des Snapshots
+            flush_interval: Mindestabstand zwischen zwei Snapshots in Sekunden
+            hours_retention: Anzahl aufbewahrter Stunden-Buckets
+            days_retention: Anzahl aufbewahrter Tages-Buckets
+        """
+        self.path = Path(path)
+        self.flush_interval = flush_interval
+        self.hours_retention = hours_retention
+        self.days_retention = days_retention
+
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._dirty = False
+        self._last_flush = time.monotonic()
+
+        snapshot = load_snapshot(self.path) or {}
+        self.exists = bool(snapshot)
+        self.started_at = snapshot.get('started_at') or datetime.now().isoformat()
+        self.total = snapshot.get('total', 0)
+        self.duplicates = snapshot.get('duplicates', 0)
+        self.by_sender = Counter(snapshot.get('by_sender', {}))
+        self.by_hour = Counter(snapshot.get('by_hour', {}))
+        self.by_day = Counter(snapshot.get('by_day', {}))
+        self.by_modem = Counter(snapshot.get('by_modem', {}))
+        self.webhooks = {
+            url: Counter(counts) for url, counts in snapshot.get('webhooks', {}).items()
+        }
+
+    def seed_total(self, total: int):
+        """Gesamtzahl beim ersten Start aus der Processed-DB übernehmen"""
+        with self._lock:
+            if not self.exists:
+                self.total = total
+                self._dirty = True
+
+    def record_message(self, sms_data: Dict):
+        """Neu verarbeitete SMS zählen"""
+        now = datetime.now()
+        with self._lock:
+            self.total += 1
+            self.by_sender[sms_data['number']] += 1
+            self.by_hour[now.strftime('%Y-%m-%dT%H')] += 1
+            self.by_day[now.strftime('%Y-%m-%d')] += 1
+            if sms_data.get('modem'):
+                self.by_modem[sms_data['modem']] += 1
+            self._dirty = True
+        self.maybe_flush()
+
+    def record_duplicate(self):
+        """Bereits verarbeitete SMS zählen"""
+        with self._lock:
+            self.duplicates += 1
+            self._dirty = True
+
+    def record_webhook(self, url: str, success: bool):
+        """Ergebnis eines Webhook-Aufrufs zählen"""
+        with self._lock:
+            counts = self.webhooks.setdefault(url, Counter())
+            counts['success' if success else 'failure'] += 1
+            self._dirty = True
+        self.maybe_flush()
+
+    def _prune(self, counter: Counter, keep: int):
+        for key in sorted(counter)[:-keep]:
+            del counter[key]
+
+    def snapshot(self) -> Dict:
+        """Aktuellen Stand als Dictionary"""
+        with self._lock:
+            self._prune(self.by_hour, self.hours_retention)
+            self._prune(self.by_day, self.days_retention)
+            return {
+                'version': SNAPSHOT_VERSION,
+                'started_at': self.started_at,
+                'updated_at': datetime.now().isoformat(),
+                'total': self.total,
+                'duplicates': self.duplicates,
+                'by_sender': dict(self.by_sender),
+                'by_hour': dict(self.by_hour),
+                'by_day': dict(self.by_day),
+                'by_modem': dict(self.by_modem),
+                'webhooks': {url: dict(counts) for url, counts in self.webhooks.items()}
+            }
+
+    def maybe_flush(self):
+        """Snapshot schreiben, falls geändert und flush_interval abgelaufen"""
+        if time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        """Snapshot schreiben (falls geändert)"""
+        with self._flush_lock:
+            if not self._dirty:
+                return
+
+            self._dirty = False
+            self._last_flush = time.monotonic()
+            try:
+                write_json_atomic(self.path, self.snapshot())
+            except Exception as e:
+                self._dirty = True
+                logger.error(f"Statistik-Snapshot konnte nicht gespeichert werden: {e}")
+
+
+def load_snapshot(path) -> Optional[Dict]:
+    """
+    Statistik-Snapshot lesen
+
+    Returns:
+        Snapshot oder None wenn nicht vorhanden/lesbar
+    """
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.warning(f"Statistik-Snapshot {path} nicht lesbar: {e}")
+        return None
@@ -0,0 +1,512 @@
+"""
+Datenbank verarbeiteter SMS (Duplikaterkennung)
+
+Zwei austauschbare Backends:
+
+- ``sqlite``: SQLite im WAL-Modus, Abfragen über den Primärschlüssel
+- ``log``: Append-only JSON-Lines-Datei mit periodischer Kompaktierung
+
+Beide schreiben pro SMS nur einen Datensatz (O(1)) und bündeln die
+Schreibvorgänge eines Verarbeitungsdurchlaufs in einem Commit.
+
+Gespeichert wird pro SMS nur ein 16-Byte-Digest (BLAKE2b) des Schlüssels
+``<number>_<timestamp>`` und der Zeitpunkt der Verarbeitung. Über
+``retention_days`` bzw. ``max_entries`` werden alte Einträge verworfen,
+sodass der Speicherbedarf auch bei langer Laufzeit konstant bleibt. Ein
+optionaler Bloom-Filter beantwortet die Frage "neu?" für neue SMS ohne
+Datenbankzugriff.
+"""
+
+import hashlib
+import json
+import logging
+import math
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+DIGEST_SIZE = 16
+
+
+def digest_key(key: str) -> bytes:
+    """Kompakter Digest eines SMS-Schlüssels"""
+    return hashlib.blake2b(key.encode('utf-8'), digest_size=DIGEST_SIZE).digest()
+
+
+def _to_epoch(value) -> float:
+    """saved_at aus alten Einträgen (ISO-String) in Unix-Zeit umrechnen"""
+    if isinstance(value, (int, float)):
+        return value
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except (TypeError, ValueError):
+        return time.time()
+
+
+class ProcessedStore:
+    """Basisklasse für Datenbanken verarbeiteter SMS"""
+
+    # Mindestabstand zwischen zwei Aufräumläufen in Sekunden
+    PRUNE_INTERVAL = 3600
+
+    def __init__(self, retention_days: float = None, max_entries: int = None):
+        """
+        Args:
+            retention_days: Einträge nach so vielen Tagen verwerfen
+            max_entries: Höchstens so viele (neueste) Einträge behalten
+        """
+        self.retention = retention_days * 86400 if retention_days else None
+        self.max_entries = max_entries
+        self._last_prune = None
+
+    def __contains__(self, key: str) -> bool:
+        return self.contains_digest(digest_key(key))
+
+    def __len__(self) -> int:
+        raise NotImplementedError
+
+    def contains_digest(self, digest: bytes) -> bool:
+        raise NotImplementedError
+
+    def add(self, key: str, saved_at: float = None):
+        """
+        SMS als verarbeitet vormerken
+
+        Der Eintrag ist sofort über ``in`` sichtbar, wird aber erst mit
+        ``commit()`` dauerhaft gespeichert.
+
+        Args:
+            key: Schlüssel der SMS (``<number>_<timestamp>``)
+            saved_at: Zeitpunkt der Verarbeitung (Unix-Zeit, Standard: jetzt)
+        """
+        self.add_digest(digest_key(key), saved_at if saved_at is not None else time.time())
+
+    def add_digest(self, digest: bytes, saved_at: float):
+        raise NotImplementedError
+
+    def digests(self) -> Iterator[bytes]:
+        """Alle gespeicherten Digests"""
+        raise NotImplementedError
+
+    def commit(self):
+        """Vorgemerkte Einträge dauerhaft speichern (Gruppen-Commit)"""
+        raise NotImplementedError
+
+    def prune(self) -> int:
+        """
+        Einträge außerhalb von retention_days / max_entries verwerfen
+
+        Returns:
+            Anzahl verworfener Einträge
+        """
+        raise NotImplementedError
+
+    def maybe_prune(self):
+        """prune() höchstens alle PRUNE_INTERVAL Sekunden ausführen"""
+        if not self.retention and not self.max_entries:
+            return
+
+        now = time.monotonic()
+        if self._last_prune is not None and now - self._last_prune < self.PRUNE_INTERVAL:
+            return
+
+        self._last_prune = now
+        removed = self.prune()
+        if removed:
+            logger.info(f"Duplikaterkennung: {removed} alte Einträge verworfen")
+
+    def cutoff(self) -> Optional[float]:
+        """Älteste noch aufzubewahrende Verarbeitungszeit"""
+        return time.time() - self.retention if self.retention else None
+
+    def close(self):
+        """Datenbank schließen"""
+        self.commit()
+
+    def is_empty(self) -> bool:
+        """True wenn noch keine Einträge vorhanden sind"""
+        return len(self) == 0
+
+
+class SQLiteProcessedStore(ProcessedStore):
+    """Verarbeitete SMS in SQLite (WAL-Modus)"""
+
+    def __init__(self, path: Path, **retention):
+        """
+        Args:
+            path: Pfad zur SQLite-Datenbank
+            retention: retention_days / max_entries (siehe ProcessedStore)
+        """
+        super().__init__(**retention)
+        self.path = Path(path)
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(
+            "CREATE TABLE IF NOT EXISTS seen ("
+            " digest BLOB PRIMARY KEY,"
+            " saved_at INTEGER NOT NULL"
+            ") WITHOUT ROWID;"
+            "CREATE INDEX IF NOT EXISTS idx_seen_saved_at ON seen (saved_at);"
+        )
+        self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM seen").fetchone()[0]
+
+    def contains_digest(self, digest: bytes) -> bool:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM seen WHERE digest = ?", (digest,)
+            ).fetchone()
+        return row is not None
+
+    def is_empty(self) -> bool:
+        with self._lock:
+            row = self._conn.execute("SELECT 1 FROM seen LIMIT 1").fetchone()
+        return row is None
+
+    def add_digest(self, digest: bytes, saved_at: float):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO seen (digest, saved_at) VALUES (?, ?)",
+                (digest, int(saved_at))
+            )
+
+    def digests(self):
+        # Eigene Verbindung, damit das Einlesen den Ingest nicht blockiert
+        conn = sqlite3.connect(str(self.path))
+        try:
+            for (digest,) in conn.execute("SELECT digest FROM seen"):
+                yield digest
+        finally:
+            conn.close()
+
+    def commit(self):
+        with self._lock:
+            self._conn.commit()
+        self.maybe_prune()
+
+    def prune(self) -> int:
+        removed = 0
+        with self._lock:
+            cutoff = self.cutoff()
+            if cutoff is not None:
+                removed += self._conn.execute(
+                    "DELETE FROM seen WHERE saved_at < ?", (int(cutoff),)
+                ).rowcount
+
+            if self.max_entries:
+                removed += self._conn.execute(
+                    "DELETE FROM seen WHERE digest IN ("
+                    " SELECT digest FROM seen ORDER BY saved_at DESC LIMIT -1 OFFSET ?"
+                    ")",
+                    (self.max_entries,)
+                ).rowcount
+
+            self._conn.commit()
+        return removed
+
+    def close(self):
+        with self._lock:
+            self._conn.commit()
+            self._conn.close()
+
+
+class LogProcessedStore(ProcessedStore):
+    """
+    Verarbeitete SMS als Append-only JSON-Lines-Log
+
+    Jede Zeile enthält einen Eintrag (``{"d": <digest>, "t": <unix-zeit>}``).
+    Eine abgeschnittene letzte Zeile (Absturz während des Schreibens) wird
+    beim Laden verworfen. Sobald das Log deutlich mehr Zeilen als Einträge
+    enthält, wird es kompaktiert.
+    """
+
+    COMPACT_MIN_LINES = 10000
+
+    def __init__(self, path: Path, **retention):
+        """
+        Args:
+            path: Pfad zur Log-Datei
+            retention: retention_days / max_entries (siehe ProcessedStore)
+        """
+        super().__init__(**retention)
+        self.path = Path(path)
+        self._lock = threading.RLock()
+        self._entries = {}
+        self._pending = []
+        self._lines = 0
+        truncated = self._load()
+        self._file = open(self.path, 'a', encoding='utf-8')
+        if truncated:
+            # Abgeschnittene Zeile abschließen, damit neue Einträge lesbar bleiben
+            self._file.write('\n')
+
+    def _load(self) -> bool:
+        """
+        Log einlesen
+
+        Returns:
+            True wenn die letzte Zeile abgeschnitten ist
+        """
+        if not self.path.exists():
+            return False
+
+        line = '\n'
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                    digest = bytes.fromhex(entry['d'])
+                    saved_at = entry['t']
+                except (ValueError, KeyError, TypeError):
+                    logger.warning(f"Ungültige Zeile in {self.path} übersprungen")
+                    continue
+                self._entries[digest] = int(saved_at)
+                self._lines += 1
+
+        return not line.endswith('\n')
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def contains_digest(self, digest: bytes) -> bool:
+        return digest in self._entries
+
+    def add_digest(self, digest: bytes, saved_at: float):
+        with self._lock:
+            self._entries[digest] = int(saved_at)
+            self._pending.append(f'{{"d": "{digest.hex()}", "t": {int(saved_at)}}}\n')
+
+    def digests(self):
+        with self._lock:
+            return iter(list(self._entries))
+
+    def commit(self):
+        with self._lock:
+            if self._pending:
+                self._file.write(''.join(self._pending))
+                self._file.flush()
+                os.fsync(self._file.fileno())
+                self._lines += len(self._pending)
+                self._pending = []
+
+            self.maybe_prune()
+
+            if self._lines > max(self.COMPACT_MIN_LINES, 2 * len(self._entries)):
+                self.compact()
+
+    def prune(self) -> int:
+        with self._lock:
+            before = len(self._entries)
+            cutoff = self.cutoff()
+            entries = self._entries.items()
+
+            if cutoff is not None:
+                entries = [(digest, saved_at) for digest, saved_at in entries
+                           if saved_at >= cutoff]
+            if self.max_entries and len(entries) > self.max_entries:
+                entries = sorted(entries, key=lambda item: item[1])[-self.max_entries:]
+
+            self._entries = dict(entries)
+            return before - len(self._entries)
+
+    def compact(self):
+        """Log neu schreiben (nur aktuelle Einträge, atomar per rename)"""
+        with self._lock:
+            tmp_path = self.path.with_name(self.path.name + '.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                for digest, saved_at in self._entries.items():
+                    f.write(f'{{"d": "{digest.hex()}", "t": {saved_at}}}\n')
+                f.flush()
+                os.fsync(f.fileno())
+
+            self._file.close()
+            os.replace(tmp_path, self.path)
+            self._file = open(self.path, 'a', encoding='utf-8')
+            self._lines = len(self._entries)
+            logger.debug(f"Processed-Log kompaktiert: {self._lines} Einträge")
+
+    def close(self):
+        with self._lock:
+            self.commit()
+            self._file.close()
+
+
+class BloomFilter:
+    """Bloom-Filter über SMS-Digests (k Bitpositionen per Double Hashing)"""
+
+    def __init__(self, capacity: int, error_rate: float = 0.01):
+        """
+        Args:
+            capacity: Erwartete Anzahl Einträge
+            error_rate: Falsch-positiv-Rate bei voller Auslastung
+        """
+        self.capacity = max(capacity, 1)
+        self.error_rate = error_rate
+        self.size = max(8, int(-self.capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / self.capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, digest: bytes):
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:16], 'little') | 1
+        for i in range(self.hashes):
+            yield (h1 + i * h2) % self.size
+
+    def add(self, digest: bytes):
+        for position in self._positions(digest):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, digest: bytes) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7))
+                   for position in self._positions(digest))
+
+
+class BloomFilteredStore(ProcessedStore):
+    """
+    Bloom-Filter vor einem ProcessedStore
+
+    Neue SMS (der Normalfall) werden ohne Datenbankzugriff erkannt; nur bei
+    einem Treffer im Filter wird die Datenbank gefragt. Ist der Filter
+    voll, wird er aus der Datenbank neu aufgebaut.
+    """
+
+    def __init__(self, store: ProcessedStore, capacity: int = 100000,
+                 error_rate: float = 0.01):
+        """
+        Args:
+            store: Eigentliche Datenbank
+            capacity: Anfangskapazität des Filters
+            error_rate: Falsch-positiv-Rate bei voller Auslastung
+        """
+        super().__init__()
+        self.store = store
+        self.error_rate = error_rate
+        self._lock = threading.Lock()
+        self._rebuild(max(capacity, 2 * len(store)))
+
+    def _rebuild(self, capacity: int):
+        bloom = BloomFilter(capacity, self.error_rate)
+        for digest in self.store.digests():
+            bloom.add(digest)
+        self.bloom = bloom
+
+    def __len__(self) -> int:
+        return len(self.store)
+
+    def contains_digest(self, digest: bytes) -> bool:
+        if digest not in self.bloom:
+            return False
+        return self.store.contains_digest(digest)
+
+    def add_digest(self, digest: bytes, saved_at: float):
+        self.store.add_digest(digest, saved_at)
+        with self._lock:
+            self.bloom.add(digest)
+
+    def digests(self):
+        return self.store.digests()
+
+    def commit(self):
+        self.store.commit()
+        if self.bloom.count > self.bloom.capacity:
+            with self._lock:
+                self._rebuild(2 * len(self.store))
+
+    def prune(self) -> int:
+        return self.store.prune()
+
+    def close(self):
+        self.store.close()
+
+    def is_empty(self) -> bool:
+        return self.store.is_empty()
+
+
+BACKENDS = {
+    'sqlite': ('.sqlite3', SQLiteProcessedStore),
+    'log': ('.log', LogProcessedStore),
+}
+
+
+def migrate_json(store: ProcessedStore, json_path: Path) -> int:
+    """
+    Einmalige Migration aus der alten processed.json
+
+    Die JSON-Datei wird nach erfolgreicher Übernahme in
+    ``<name>.migrated`` umbenannt.
+
+    Args:
+        store: Ziel-Datenbank
+        json_path: Pfad zur alten JSON-Datenbank
+
+    Returns:
+        Anzahl übernommener Einträge
+    """
+    with open(json_path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+
+    for key, record in data.items():
+        store.add(key, _to_epoch(record.get('saved_at')))
+    store.commit()
+
+    json_path.rename(json_path.with_name(json_path.name + '.migrated'))
+    return len(data)
+
+
+def open_processed_store(processed_db: str, backend: str = 'sqlite',
+                         retention_days: float = None, max_entries: int = None,
+                         bloom: bool = False) -> ProcessedStore:
+    """
+    Datenbank verarbeiteter SMS öffnen (inkl. Migration aus JSON)
+
+    Args:
+        processed_db: Konfigurierter Pfad (``processed_db``); die Endung
+            wird durch die des Backends ersetzt
+        backend: ``sqlite`` oder ``log``
+        retention_days: Einträge nach so vielen Tagen verwerfen
+        max_entries: Höchstens so viele (neueste) Einträge behalten
+        bloom: Bloom-Filter vor die Datenbank schalten
+
+    Returns:
+        ProcessedStore-Instanz
+    """
+    if backend not in BACKENDS:
+        raise ValueError(
+            f"Unbekanntes Processed-Backend '{backend}' "
+            f"(verfügbar: {', '.join(BACKENDS)})"
+        )
+
+    suffix, store_class = BACKENDS[backend]
+    json_path = Path(processed_db)
+    store = store_class(
+        json_path.with_suffix(suffix),
+        retention_days=retention_days,
+        max_entries=max_entries
+    )
+
+    if json_path.suffix == '.json' and json_path.exists() and store.is_empty():
+        try:
+            count = migrate_json(store, json_path)
+            logger.info(f"Processed-DB migriert: {count} Einträge aus {json_path}")
+        except Exception as e:
+            logger.warning(f"Migration von {json_path} fehlgeschlagen: {e}")
+
+    store.maybe_prune()
+
+    if bloom:
+        store = BloomFilteredStore(store, capacity=max_entries or 100000)
+
+    return store
@@ -0,0 +1,77 @@
+"""
+Hilfsfunktionen für Dateizugriffe
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Any
+
+
+def write_json_atomic(path: Path, data: Any, **dump_kwargs):
+    """
+    JSON-Datei atomar schreiben (temporäre Datei + fsync + rename)
+
+    Args:
+        path: Zielpfad
+        data: Zu schreibende Daten
+        **dump_kwargs: Weitere Argumente für json.dump
+    """
+    path = Path(path)
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, **dump_kwargs)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def write_text_atomic(path: Path, text: str, fsync: bool = True):
+    """
+    Textdatei atomar schreiben (temporäre Datei + rename)
+
+    Leser sehen immer entweder die alte oder die vollständige neue Datei.
+
+    Args:
+        path: Zielpfad
+        text: Dateiinhalt
+        fsync: Inhalt vor dem rename auf den Datenträger schreiben
+            (ohne: später mit fsync_paths nachholen)
+    """
+    path = Path(path)
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+        if fsync:
+            f.flush()
+            os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def fsync_paths(paths):
+    """
+    Dateien und ihre Verzeichnisse (für die Verzeichniseinträge) auf den
+    Datenträger schreiben
+
+    Args:
+        paths: Dateipfade
+    """
+    directories = set()
+    for path in paths:
+        path = Path(path)
+        try:
+            fd = os.open(path, os.O_RDONLY)
+        except FileNotFoundError:
+            continue
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+        directories.add(path.parent)
+
+    for directory in directories:
+        fd = os.open(directory, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
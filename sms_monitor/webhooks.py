@@ -0,0 +1,314 @@
+"""
+Webhook-Zustellung
+
+Jeder Webhook-Endpunkt besitzt eine eigene HTTP-Session (Keep-Alive,
+Connection-Pooling), ein eigenes Timeout und einen Circuit Breaker, der
+einen dauerhaft fehlschlagenden Endpunkt vorübergehend überspringt.
+Der WebhookDispatcher verteilt Benachrichtigungen parallel über einen
+begrenzten Thread-Pool.
+
+Endpunkte mit ``batch_size`` größer 1 erhalten statt einzelner Objekte
+JSON-Arrays mehrerer SMS (gesammelt von der Outbox), mit ``gzip`` wird der
+Request-Body komprimiert.
+"""
+
+import gzip
+import json
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from .metrics import WEBHOOK_BATCH_SIZE, WEBHOOK_REQUESTS, WEBHOOK_SECONDS
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitOpenError(Exception):
+    """Endpunkt wird wegen offenem Circuit Breaker übersprungen"""
+
+    def __init__(self, url: str, retry_after: float):
+        super().__init__(f"Circuit Breaker offen für {url} (erneut in {retry_after:.0f}s)")
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """
+    Einfacher Circuit Breaker
+
+    Nach ``failure_threshold`` aufeinanderfolgenden Fehlern wird der
+    Endpunkt für ``reset_timeout`` Sekunden gesperrt. Danach ist genau ein
+    Probeaufruf erlaubt (half-open); erst dessen Erfolg schließt den
+    Breaker wieder.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    def before_call(self) -> Optional[float]:
+        """
+        Prüfen ob ein Aufruf erlaubt ist
+
+        Returns:
+            None wenn erlaubt, sonst Sekunden bis zum nächsten Probeaufruf
+        """
+        with self._lock:
+            if self.opened_at is None:
+                return None
+
+            remaining = self.opened_at + self.reset_timeout - time.monotonic()
+            if remaining > 0:
+                return remaining
+
+            if self._trial_running:
+                return self.reset_timeout
+
+            self._trial_running = True
+            return None
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial_running = False
+
+    def record_failure(self) -> bool:
+        """
+        Fehlschlag erfassen
+
+        Returns:
+            True wenn der Breaker dadurch (erneut) geöffnet wurde
+        """
+        with self._lock:
+            self.failures += 1
+            self._trial_running = False
+            if self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+                return True
+            return False
+
+    @property
+    def is_open(self) -> bool:
+        return self.opened_at is not None
+
+
+class WebhookEndpoint:
+    """Webhook-Endpunkt mit eigener Session, Timeout und Circuit Breaker"""
+
+    def __init__(self, url: str, name: str = None, timeout: float = 5,
+                 pool_size: int = 4, failure_threshold: int = 5,
+                 reset_timeout: float = 30.0, batch_size: int = 1,
+                 batch_ms: float = 1000, compress: bool = False):
+        """
+        Args:
+            url: Webhook-URL
+            name: Anzeigename (Standard: URL)
+            timeout: Timeout pro Aufruf in Sekunden
+            pool_size: Maximale Anzahl offener Verbindungen
+            failure_threshold: Fehler bis zum Öffnen des Circuit Breakers
+            reset_timeout: Sperrzeit des Circuit Breakers in Sekunden
+            batch_size: Maximale Anzahl SMS pro Aufruf (1 = einzeln)
+            batch_ms: Maximale Sammelzeit eines Batches in Millisekunden
+            compress: Request-Body mit gzip komprimieren
+        """
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        self.url = url
+        self.name = name or url
+        self.timeout = timeout
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+        self.batch_size = max(batch_size, 1)
+        self.batch_ms = batch_ms
+        self.compress = compress
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+        self.headers = {'Content-Type': 'application/json'}
+        if compress:
+            self.headers['Content-Encoding'] = 'gzip'
+
+    @property
+    def batched(self) -> bool:
+        return self.batch_size > 1
+
+    def _encode(self, payload: Any) -> bytes:
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        if self.compress:
+            body = gzip.compress(body, compresslevel=6)
+        return body
+
+    def post(self, payload: Any):
+        """
+        Payload an den Endpunkt senden
+
+        Raises:
+            CircuitOpenError wenn der Endpunkt gesperrt ist,
+            sonst Verbindungs- oder HTTP-Fehler
+        """
+        retry_after = self.breaker.before_call()
+        if retry_after is not None:
+            WEBHOOK_REQUESTS.inc(endpoint=self.name, result='circuit_open')
+            raise CircuitOpenError(self.url, retry_after)
+
+        start = time.perf_counter()
+        try:
+            response = self.session.post(
+                self.url, data=self._encode(payload), headers=self.headers, timeout=self.timeout
+            )
+            response.raise_for_status()
+        except Exception:
+            WEBHOOK_SECONDS.observe(time.perf_counter() - start, endpoint=self.name)
+            WEBHOOK_REQUESTS.inc(endpoint=self.name, result='error')
+            if self.breaker.record_failure():
+                logger.warning(
+                    f"Webhook {self.name} nach {self.breaker.failures} Fehlern "
+                    f"für {self.breaker.reset_timeout:.0f}s gesperrt"
+                )
+            raise
+
+        WEBHOOK_SECONDS.observe(time.perf_counter() - start, endpoint=self.name)
+        WEBHOOK_REQUESTS.inc(endpoint=self.name, result='success')
+        if isinstance(payload, list):
+            WEBHOOK_BATCH_SIZE.observe(len(payload), endpoint=self.name)
+        self.breaker.record_success()
+
+    def close(self):
+        self.session.close()
+
+
+def parse_webhooks(webhooks: List) -> List[Dict]:
+    """
+    Webhook-Konfiguration normalisieren
+
+    Einträge können einfache URLs oder Objekte mit ``url`` und optionalen
+    Einstellungen (``name``, ``timeout``, ``batch_size``, ``batch_ms``,
+    ``gzip``) sein.
+
+    Args:
+        webhooks: Liste aus der Konfiguration
+
+    Returns:
+        Liste von Dictionaries mit mindestens ``url`` und ``name``
+    """
+    result = []
+    for entry in webhooks or []:
+        if isinstance(entry, str):
+            entry = {'url': entry}
+        else:
+            entry = dict(entry)
+        entry.setdefault('name', entry['url'])
+        result.append(entry)
+    return result
+
+
+class WebhookDispatcher:
+    """Parallele Webhook-Zustellung über einen begrenzten Thread-Pool"""
+
+    def __init__(self, webhooks: List, timeout: float = 5, concurrency: int = 4,
+                 failure_threshold: int = 5, reset_timeout: float = 30.0):
+        """
+        Args:
+            webhooks: Webhook-Einträge aus der Konfiguration
+            timeout: Standard-Timeout pro Aufruf in Sekunden
+            concurrency: Maximale Anzahl paralleler Aufrufe
+            failure_threshold: Fehler bis zum Öffnen des Circuit Breakers
+            reset_timeout: Sperrzeit des Circuit Breakers in Sekunden
+        """
+        self.timeout = timeout
+        self.concurrency = concurrency
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.endpoints = {}
+        self._lock = threading.Lock()
+        self._executor = None
+
+        for entry in parse_webhooks(webhooks):
+            self.endpoints[entry['url']] = self._create_endpoint(entry)
+
+    def _create_endpoint(self, entry: Dict) -> WebhookEndpoint:
+        return WebhookEndpoint(
+            entry['url'],
+            name=entry.get('name'),
+            timeout=entry.get('timeout', self.timeout),
+            pool_size=self.concurrency,
+            failure_threshold=self.failure_threshold,
+            reset_timeout=self.reset_timeout,
+            batch_size=entry.get('batch_size', 1),
+            batch_ms=entry.get('batch_ms', 1000),
+            compress=entry.get('gzip', False)
+        )
+
+    def endpoint(self, url: str) -> WebhookEndpoint:
+        """Endpunkt zu einer URL (unbekannte URLs mit Standardwerten)"""
+        with self._lock:
+            endpoint = self.endpoints.get(url)
+            if endpoint is None:
+                endpoint = self._create_endpoint({'url': url})
+                self.endpoints[url] = endpoint
+            return endpoint
+
+    def post(self, url: str, payload: Any):
+        """
+        Payload an einen einzelnen Endpunkt senden
+
+        Raises:
+            CircuitOpenError, Verbindungs- oder HTTP-Fehler
+        """
+        self.endpoint(url).post(payload)
+
+    def fan_out(self, payload: Any, urls: List[str] = None) -> Dict[str, Optional[Exception]]:
+        """
+        Payload parallel an mehrere Endpunkte senden
+
+        Gesperrte Endpunkte werden sofort übersprungen, die Laufzeit wird
+        damit vom langsamsten gesunden Endpunkt bestimmt.
+
+        Args:
+            payload: JSON-Payload
+            urls: Ziel-URLs (Standard: alle konfigurierten)
+
+        Returns:
+            Dictionary URL -> None bei Erfolg bzw. Exception
+        """
+        if urls is None:
+            urls = list(self.endpoints)
+
+        executor = self._executor
+        if executor is None:
+            # fan_out läuft in mehreren Notify- und Outbox-Threads
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.concurrency, thread_name_prefix='webhook'
+                    )
+                executor = self._executor
+
+        futures = {url: executor.submit(self.post, url, payload) for url in urls}
+
+        results = {}
+        for url, future in futures.items():
+            try:
+                future.result()
+                results[url] = None
+            except Exception as e:
+                results[url] = e
+        return results
+
+    def close(self):
+        """Thread-Pool und Sessions schließen"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor:
+            executor.shutdown(wait=True)
+        for endpoint in self.endpoints.values():
+            endpoint.close()
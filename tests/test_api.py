@@ -0,0 +1,127 @@
+"""Tests für den SMS-Feed der lokalen API (sms_monitor.api)"""
+
+import json
+import threading
+
+from sms_monitor.api import MessageFeed
+
+
+def ids(events):
+    return [event['id'] for event in events]
+
+
+def publish(feed, count):
+    return [feed.publish({'number': '+49', 'text': f"SMS {i}"}) for i in range(count)]
+
+
+def test_ids_and_cursor():
+    feed = MessageFeed()
+    assert feed.last_id == 0
+    assert feed.read(0) == ([], 0)
+
+    assert publish(feed, 3) == [1, 2, 3]
+    events, missed = feed.read(0)
+    assert ids(events) == [1, 2, 3] and missed == 0
+    assert events[0]['text'] == 'SMS 0'
+    assert feed.read(2) == ([events[2]], 0)
+    assert feed.read(3) == ([], 0)
+    assert ids(feed.read(0, limit=2)[0]) == [1, 2]
+
+
+def test_missed_after_overflow():
+    feed = MessageFeed(capacity=3)
+    publish(feed, 5)
+    assert len(feed) == 3
+
+    events, missed = feed.read(0)
+    assert ids(events) == [3, 4, 5] and missed == 2
+    events, missed = feed.read(1)
+    assert ids(events) == [3, 4, 5] and missed == 1
+    events, missed = feed.read(2)
+    assert ids(events) == [3, 4, 5] and missed == 0
+
+
+def test_cursor_beyond_last_id_restarts():
+    # Z.B. nach Löschen der Feed-Datei: der Client hat eine neuere ID
+    feed = MessageFeed()
+    publish(feed, 2)
+    events, missed = feed.read(10)
+    assert ids(events) == [1, 2] and missed == 1
+
+    empty = MessageFeed()
+    assert empty.read(10) == ([], 1)
+
+
+def test_wait_wakes_on_publish():
+    feed = MessageFeed()
+    assert feed.wait(0, timeout=0.01) is False
+
+    timer = threading.Timer(0.05, publish, (feed, 1))
+    timer.start()
+    assert feed.wait(0, timeout=5) is True
+    timer.join()
+
+
+def test_wait_returns_on_close():
+    feed = MessageFeed()
+    threading.Timer(0.05, feed.close).start()
+    assert feed.wait(0, timeout=5) is False
+
+
+def test_file_entries_visible_after_commit(tmp_path):
+    feed = MessageFeed(str(tmp_path / 'feed.jsonl'))
+    assert publish(feed, 2) == [1, 2]
+    assert feed.last_id == 0
+    assert feed.read(0) == ([], 0)
+    assert feed.wait(0, timeout=0.01) is False
+
+    feed.commit()
+    assert feed.last_id == 2
+    assert ids(feed.read(0)[0]) == [1, 2]
+    feed.close()
+
+
+def test_file_ids_survive_restart(tmp_path):
+    path = tmp_path / 'feed.jsonl'
+    feed = MessageFeed(str(path))
+    publish(feed, 2)
+    feed.commit()
+    # Nicht committete Einträge gehen verloren, ihre IDs waren nie sichtbar
+    publish(feed, 1)
+    feed._file.close()
+
+    feed = MessageFeed(str(path))
+    assert feed.last_id == 2
+    assert publish(feed, 1) == [3]
+    feed.close()
+
+
+def test_file_truncated_last_line(tmp_path):
+    path = tmp_path / 'feed.jsonl'
+    feed = MessageFeed(str(path))
+    publish(feed, 2)
+    feed.close()
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write('{"id": 3, "te')
+
+    feed = MessageFeed(str(path))
+    assert feed.last_id == 2
+    publish(feed, 1)
+    feed.close()
+
+    feed = MessageFeed(str(path))
+    assert ids(feed.read(0)[0]) == [1, 2, 3]
+    feed.close()
+
+
+def test_file_is_compacted(tmp_path):
+    path = tmp_path / 'feed.jsonl'
+    feed = MessageFeed(str(path), capacity=2)
+    for _ in range(5):
+        publish(feed, 1)
+        feed.commit()
+    feed.close()
+
+    lines = path.read_text(encoding='utf-8').splitlines()
+    assert len(lines) <= 4
+    assert [json.loads(line)['id'] for line in lines][-2:] == [4, 5]
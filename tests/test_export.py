@@ -0,0 +1,133 @@
+"""Tests für inkrementelle Exporte (sms_monitor.export)"""
+
+import json
+import os
+
+from sms_monitor.archive import SQLiteMessageStore, TextFileStore
+from sms_monitor.export import CURSOR_OVERLAP_NS, export_messages, iter_messages, load_cursor
+
+SECOND = 10 ** 9
+BASE_NS = 1_700_000_000 * SECOND
+
+
+def sms(i, modem='lte1'):
+    return {
+        'number': '+491701234567',
+        'timestamp': f"2025-01-01T12:00:{i:02d}",
+        'state': 3,
+        'modem': modem,
+        'text': f"SMS {i}",
+    }
+
+
+def texts(rows):
+    return [sms_data['text'] for sms_data, _ in rows]
+
+
+def save_file(store, i, mtime_ns, **kwargs):
+    path = store.save(sms(i, **kwargs))
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+    return path
+
+
+def test_sqlite_cursor(tmp_path):
+    store = SQLiteMessageStore(str(tmp_path / 'sms.sqlite3'))
+    for i in range(3):
+        store.save(sms(i))
+    store.commit()
+
+    rows = list(iter_messages(store))
+    assert texts(rows) == ['SMS 0', 'SMS 1', 'SMS 2']
+    cursor = rows[-1][1]
+    assert cursor == {'last_id': 3}
+
+    store.save(sms(3))
+    store.commit()
+    assert texts(iter_messages(store, cursor)) == ['SMS 3']
+    store.close()
+
+
+def test_files_cursor(tmp_path):
+    store = TextFileStore(str(tmp_path / 'sms'))
+    store.sms_dir.mkdir()
+    for i in range(3):
+        save_file(store, i, BASE_NS + i * SECOND)
+
+    rows = list(iter_messages(store))
+    assert texts(rows) == ['SMS 0', 'SMS 1', 'SMS 2']
+    cursor = rows[-1][1]
+    assert cursor['mtime_ns'] == BASE_NS + 2 * SECOND
+    assert len(cursor['files']) == 3
+
+    assert list(iter_messages(store, cursor)) == []
+    save_file(store, 3, BASE_NS + 3 * SECOND)
+    assert texts(iter_messages(store, cursor)) == ['SMS 3']
+
+
+def test_files_cursor_finds_late_file(tmp_path):
+    # Atomar geschriebene Dateien tragen den Zeitpunkt der temporären Datei
+    # und können nach einem Export mit jüngeren Dateien erscheinen
+    store = TextFileStore(str(tmp_path / 'sms'))
+    store.sms_dir.mkdir()
+    save_file(store, 0, BASE_NS + 10 * SECOND)
+    cursor = list(iter_messages(store))[-1][1]
+
+    save_file(store, 1, BASE_NS + 5 * SECOND)
+    save_file(store, 2, BASE_NS - CURSOR_OVERLAP_NS)
+    assert texts(iter_messages(store, cursor)) == ['SMS 1']
+
+
+def test_files_cursor_forgets_names_outside_overlap(tmp_path):
+    store = TextFileStore(str(tmp_path / 'sms'))
+    store.sms_dir.mkdir()
+    old = save_file(store, 0, BASE_NS)
+    paths = [save_file(store, i, BASE_NS + CURSOR_OVERLAP_NS + i * SECOND) for i in (1, 2)]
+
+    cursor = list(iter_messages(store))[-1][1]
+    assert set(cursor['files']) == {os.path.basename(path) for path in paths}
+    assert os.path.basename(old) not in cursor['files']
+    assert list(iter_messages(store, cursor)) == []
+
+
+def test_files_cursor_without_names(tmp_path):
+    # Cursor älterer Versionen: nur der Zeitpunkt, ohne Überlappung
+    store = TextFileStore(str(tmp_path / 'sms'))
+    store.sms_dir.mkdir()
+    save_file(store, 0, BASE_NS)
+    save_file(store, 1, BASE_NS + SECOND)
+    assert texts(iter_messages(store, {'mtime_ns': BASE_NS})) == ['SMS 1']
+
+
+def test_files_cursor_with_modem_filter(tmp_path):
+    store = TextFileStore(str(tmp_path / 'sms'))
+    store.sms_dir.mkdir()
+    save_file(store, 0, BASE_NS, modem='lte1')
+    save_file(store, 1, BASE_NS + SECOND, modem='lte2')
+    assert texts(iter_messages(store, modem='lte2')) == ['SMS 1']
+
+
+def test_export_saves_cursor(tmp_path):
+    store = SQLiteMessageStore(str(tmp_path / 'sms.sqlite3'))
+    cursor_path = tmp_path / 'state' / 'export.cursor'
+    output = tmp_path / 'out.jsonl'
+    for i in range(2):
+        store.save(sms(i))
+    store.commit()
+
+    assert export_messages(store, output=str(output), cursor_path=str(cursor_path)) == 2
+    assert load_cursor(str(cursor_path)) == {'last_id': 2}
+
+    store.save(sms(2))
+    store.commit()
+    assert export_messages(store, output=str(output), cursor_path=str(cursor_path)) == 1
+    lines = output.read_text(encoding='utf-8').splitlines()
+    assert [json.loads(line)['text'] for line in lines] == ['SMS 2']
+
+    # Ohne neue SMS bleibt der Cursor unverändert
+    assert export_messages(store, output=str(output), cursor_path=str(cursor_path)) == 0
+    assert load_cursor(str(cursor_path)) == {'last_id': 3}
+    store.close()
+
+
+def test_load_cursor_missing(tmp_path):
+    assert load_cursor(str(tmp_path / 'fehlt')) == {}
@@ -0,0 +1,82 @@
+"""Tests für das Ingest-Journal (sms_monitor.journal)"""
+
+import pytest
+
+from sms_monitor.journal import IngestJournal, JournalLockedError
+
+
+def sms(i):
+    return {'number': '+49', 'timestamp': f"2025-01-01T12:00:0{i}", 'text': f"SMS {i}"}
+
+
+def test_entries_are_recovered(tmp_path):
+    path = tmp_path / 'journal.jsonl'
+    journal = IngestJournal(path)
+    assert journal.recovered() == []
+    journal.append(sms(1))
+    journal.append(sms(2), sync=True)
+    assert len(journal) == 2
+    journal.close()
+
+    journal = IngestJournal(path)
+    assert journal.recovered() == [sms(1), sms(2)]
+    assert len(journal) == 2
+    journal.close()
+
+
+def test_checkpoint_empties_journal(tmp_path):
+    path = tmp_path / 'journal.jsonl'
+    journal = IngestJournal(path)
+    journal.append(sms(1), sync=True)
+    journal.checkpoint()
+    assert len(journal) == 0
+    assert journal.recovered() == []
+    journal.append(sms(2))
+    journal.close()
+
+    journal = IngestJournal(path)
+    assert journal.recovered() == [sms(2)]
+    journal.close()
+
+
+def test_truncated_last_line_is_skipped(tmp_path):
+    path = tmp_path / 'journal.jsonl'
+    journal = IngestJournal(path)
+    journal.append(sms(1))
+    journal.close()
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write('{"number": "+49", "te')
+
+    journal = IngestJournal(path)
+    assert journal.recovered() == [sms(1)]
+    journal.append(sms(2))
+    journal.close()
+
+    # Der neue Eintrag steht in einer eigenen, lesbaren Zeile
+    journal = IngestJournal(path)
+    assert journal.recovered() == [sms(1), sms(2)]
+    journal.close()
+
+
+def test_only_line_truncated(tmp_path):
+    path = tmp_path / 'journal.jsonl'
+    path.write_text('{"number": "+49", "te', encoding='utf-8')
+
+    journal = IngestJournal(path)
+    assert journal.recovered() == []
+    journal.append(sms(1))
+    journal.close()
+
+    journal = IngestJournal(path)
+    assert journal.recovered() == [sms(1)]
+    journal.close()
+
+
+def test_second_process_is_locked_out(tmp_path):
+    path = tmp_path / 'journal.jsonl'
+    journal = IngestJournal(path)
+    with pytest.raises(JournalLockedError):
+        IngestJournal(path)
+    journal.close()
+
+    IngestJournal(path).close()
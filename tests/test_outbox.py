@@ -0,0 +1,150 @@
+"""Tests für die persistente Webhook-Outbox (sms_monitor.outbox)"""
+
+import json
+import threading
+import time
+
+import pytest
+
+from sms_monitor.outbox import WebhookOutbox
+
+
+class Recorder:
+    """Zustellfunktion, die Aufrufe mitschreibt und auf Wunsch fehlschlägt"""
+
+    def __init__(self, failures=0, error=None):
+        self.calls = []
+        self.failures = failures
+        self.error = error or RuntimeError('HTTP 500')
+        self.lock = threading.Lock()
+
+    def __call__(self, url, payload):
+        with self.lock:
+            if self.failures:
+                self.failures -= 1
+                raise self.error
+            self.calls.append((url, payload))
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            pytest.fail('Zeitüberschreitung')
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def outboxes():
+    started = []
+    yield started
+    for outbox in started:
+        outbox.stop()
+
+
+def make_outbox(tmp_path, started, deliver, **kwargs):
+    outbox = WebhookOutbox(str(tmp_path / 'outbox'), deliver, **kwargs)
+    started.append(outbox)
+    return outbox
+
+
+def test_backoff_bounds(tmp_path):
+    outbox = WebhookOutbox(str(tmp_path), lambda url, payload: None,
+                           backoff_base=5, backoff_max=60)
+    for attempts, delay in [(1, 5), (2, 10), (3, 20), (4, 40), (5, 60), (20, 60)]:
+        for _ in range(50):
+            assert delay / 2 <= outbox.backoff(attempts) <= delay
+
+
+def test_delivery_removes_job(tmp_path, outboxes):
+    deliver = Recorder()
+    outbox = make_outbox(tmp_path, outboxes, deliver)
+    outbox.start()
+    outbox.enqueue('http://a', {'i': 1})
+
+    wait_for(lambda: len(outbox) == 0)
+    assert deliver.calls == [('http://a', {'i': 1})]
+    assert list(outbox.pending_dir.iterdir()) == []
+
+
+def test_pending_jobs_survive_restart(tmp_path, outboxes):
+    WebhookOutbox(str(tmp_path / 'outbox'), Recorder()).enqueue('http://a', {'i': 1})
+
+    deliver = Recorder()
+    outbox = make_outbox(tmp_path, outboxes, deliver)
+    outbox.start()
+    wait_for(lambda: deliver.calls)
+    assert deliver.calls == [('http://a', {'i': 1})]
+
+
+def test_dead_letter_after_max_attempts(tmp_path, outboxes):
+    deliver = Recorder(failures=100)
+    outbox = make_outbox(tmp_path, outboxes, deliver, max_attempts=3,
+                         backoff_base=0.01, backoff_max=0.02)
+    outbox.start()
+    job_id = outbox.enqueue('http://a', {'i': 1})
+
+    wait_for(lambda: len(outbox) == 0)
+    assert deliver.failures == 97
+    assert list(outbox.pending_dir.iterdir()) == []
+    job = json.loads((outbox.dead_dir / f"{job_id}.json").read_text(encoding='utf-8'))
+    assert job['attempts'] == 3
+    assert job['last_error'] == 'HTTP 500'
+
+
+def test_retry_after_is_not_an_attempt(tmp_path, outboxes):
+    error = RuntimeError('HTTP 429')
+    error.retry_after = 0.01
+    deliver = Recorder(failures=5, error=error)
+    outbox = make_outbox(tmp_path, outboxes, deliver, max_attempts=2)
+    outbox.start()
+    outbox.enqueue('http://a', {'i': 1})
+
+    wait_for(lambda: deliver.calls)
+    assert list(outbox.dead_dir.iterdir()) == []
+
+
+def test_batches_full_batches_immediately(tmp_path, outboxes):
+    deliver = Recorder()
+    outbox = make_outbox(tmp_path, outboxes, deliver, workers=1,
+                         batching=lambda url: (3, 60) if url == 'http://b' else (1, 0))
+    outbox.start()
+    for i in range(7):
+        outbox.enqueue('http://b', {'i': i})
+    outbox.enqueue('http://s', {'i': 0})
+
+    wait_for(lambda: len(deliver.calls) == 3)
+    batches = [payload for url, payload in deliver.calls if url == 'http://b']
+    assert batches == [[{'i': 0}, {'i': 1}, {'i': 2}], [{'i': 3}, {'i': 4}, {'i': 5}]]
+    assert ('http://s', {'i': 0}) in deliver.calls
+
+    # Der letzte Auftrag sammelt noch bis batch_ms, stop() stellt ihn sofort zu
+    assert len(outbox) == 1
+    outbox.stop(timeout=2)
+    assert deliver.calls[-1] == ('http://b', [{'i': 6}])
+    assert len(outbox) == 0
+
+
+def test_batch_is_sent_after_batch_wait(tmp_path, outboxes):
+    deliver = Recorder()
+    outbox = make_outbox(tmp_path, outboxes, deliver, batching=lambda url: (50, 0.1))
+    outbox.start()
+    for i in range(3):
+        outbox.enqueue('http://b', {'i': i})
+
+    time.sleep(0.03)
+    assert deliver.calls == []
+    wait_for(lambda: deliver.calls)
+    assert deliver.calls == [('http://b', [{'i': 0}, {'i': 1}, {'i': 2}])]
+
+
+def test_failed_batch_is_retried_together(tmp_path, outboxes):
+    deliver = Recorder(failures=1)
+    outbox = make_outbox(tmp_path, outboxes, deliver, backoff_base=0.05,
+                         batching=lambda url: (3, 60))
+    outbox.start()
+    for i in range(3):
+        outbox.enqueue('http://b', {'i': i})
+
+    wait_for(lambda: len(outbox) == 0)
+    assert deliver.calls == [('http://b', [{'i': 0}, {'i': 1}, {'i': 2}])]
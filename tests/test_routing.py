@@ -0,0 +1,142 @@
+"""Tests für das Routing von SMS auf Webhooks (sms_monitor.routing)"""
+
+import pytest
+
+from sms_monitor.routing import RouteTable, check_routes
+
+WEBHOOKS = [
+    {'name': 'bank', 'url': 'http://bank.example/hook'},
+    {'name': 'otp', 'url': 'http://otp.example/hook'},
+    'http://all.example/hook',
+]
+BANK, OTP, ALL = 'http://bank.example/hook', 'http://otp.example/hook', 'http://all.example/hook'
+
+
+def sms(number='+491701234567', text='', modem=None):
+    return {'number': number, 'text': text, 'modem': modem}
+
+
+def test_no_rule_uses_default():
+    table = RouteTable([{'sender_prefix': '+4930', 'webhooks': ['bank']}], WEBHOOKS)
+    assert table.route(sms()) == [BANK, OTP, ALL]
+
+    table = RouteTable([{'sender_prefix': '+4930', 'webhooks': ['bank']}], WEBHOOKS,
+                       default='drop')
+    assert table.route(sms()) == []
+
+
+def test_sender_prefix_ignores_separators():
+    table = RouteTable([{'sender_prefix': '+49 170', 'webhooks': ['bank']}], WEBHOOKS,
+                       default='drop')
+    assert table.route(sms(number='+49 (170) 123-4567')) == [BANK]
+    assert table.route(sms(number='+49171')) == []
+
+
+def test_longer_prefixes_match_too():
+    table = RouteTable([
+        {'name': 'kurz', 'sender_prefix': '+49', 'webhooks': ['otp']},
+        {'name': 'lang', 'sender_prefix': '+49170', 'webhooks': ['bank']},
+    ], WEBHOOKS)
+    assert [route.name for route in table.match(sms())] == ['kurz', 'lang']
+
+
+def test_conditions_are_combined():
+    table = RouteTable([{
+        'sender_prefix': '+49170', 'text_regex': 'Code', 'modem': 'lte1',
+        'webhooks': ['otp'],
+    }], WEBHOOKS, default='drop')
+    assert table.route(sms(text='Code 1234', modem='lte1')) == [OTP]
+    assert table.route(sms(text='Code 1234', modem='lte2')) == []
+    assert table.route(sms(text='Hallo', modem='lte1')) == []
+    assert table.route(sms(number='+4930', text='Code 1234', modem='lte1')) == []
+
+
+def test_targets_are_united_in_rule_order():
+    table = RouteTable([
+        {'text_regex': 'Konto', 'webhooks': ['bank', ALL]},
+        {'text_regex': 'Code', 'webhooks': ['otp', 'bank']},
+    ], WEBHOOKS)
+    assert table.route(sms(text='Konto Code')) == [BANK, ALL, OTP]
+
+
+def test_drop_wins():
+    table = RouteTable([
+        {'text_regex': 'Code', 'webhooks': ['otp']},
+        {'text_regex': 'Werbung', 'drop': True},
+    ], WEBHOOKS)
+    assert table.route(sms(text='Werbung: Code 10% Rabatt')) == []
+    assert table.route(sms(text='Code 1234')) == [OTP]
+
+
+def test_overlapping_matches_are_found():
+    # Beide Ausdrücke treffen dieselbe Textstelle; der kombinierte Ausdruck
+    # meldet dort nur die erste Regel
+    table = RouteTable([
+        {'name': 'tan', 'text_regex': 'TAN', 'webhooks': ['bank']},
+        {'name': 'tan-nummer', 'text_regex': 'TAN[- ]?\\d+', 'webhooks': ['otp']},
+    ], WEBHOOKS)
+    assert [route.name for route in table.match(sms(text='Ihre TAN 123456'))] == [
+        'tan', 'tan-nummer'
+    ]
+    assert table.route(sms(text='Ihre TAN 123456')) == [BANK, OTP]
+
+
+def test_overlapping_drop_is_found():
+    table = RouteTable([
+        {'text_regex': 'Code', 'webhooks': ['otp']},
+        {'text_regex': 'Code \\d+ ungültig', 'drop': True},
+    ], WEBHOOKS)
+    assert table.route(sms(text='Code 1234 ungültig')) == []
+
+
+def test_global_flags_stay_local_to_rule():
+    table = RouteTable([
+        {'name': 'gross', 'text_regex': '(?i)code', 'webhooks': ['otp']},
+        {'name': 'klein', 'text_regex': 'konto', 'webhooks': ['bank']},
+    ], WEBHOOKS, default='drop')
+    assert table.route(sms(text='CODE')) == [OTP]
+    assert table.route(sms(text='KONTO')) == []
+
+
+def test_rules_with_groups_are_matched_separately():
+    table = RouteTable([
+        {'name': 'doppelt', 'text_regex': '(\\d)\\1', 'webhooks': ['otp']},
+        {'name': 'benannt', 'text_regex': '(?P<x>Konto)', 'webhooks': ['bank']},
+        {'name': 'einfach', 'text_regex': 'Konto', 'webhooks': [ALL]},
+    ], WEBHOOKS, default='drop')
+    assert table.route(sms(text='Code 1223')) == [OTP]
+    assert table.route(sms(text='Code 1234')) == []
+    assert [route.name for route in table.match(sms(text='Konto 11'))] == [
+        'doppelt', 'benannt', 'einfach'
+    ]
+
+
+def test_invalid_rules_are_rejected():
+    with pytest.raises(ValueError):
+        RouteTable([{'text_regex': '(', 'webhooks': ['otp']}], WEBHOOKS)
+    with pytest.raises(ValueError):
+        RouteTable([{'webhooks': ['unbekannt']}], WEBHOOKS)
+
+
+@pytest.mark.parametrize('entry, message', [
+    ({'text_regex': '(', 'webhooks': ['otp']}, 'text_regex ungültig'),
+    ({'webhooks': ['unbekannt']}, "unbekannter Webhook 'unbekannt'"),
+    ({'drop': 'ja'}, 'drop: bool erwartet'),
+    ({'drop': True, 'webhooks': ['otp']}, 'drop und webhooks schließen sich aus'),
+    ({'sender_prefix': '+49'}, 'webhooks oder drop erforderlich'),
+    ({'sender_prefix': 49, 'webhooks': ['otp']}, 'sender_prefix: Text oder Liste erwartet'),
+    ({'webhook': ['otp']}, 'unbekannte Schlüssel: webhook'),
+])
+def test_check_routes_reports_errors(entry, message):
+    errors = check_routes([entry], WEBHOOKS)
+    assert any(error.startswith('routes[0]: ') and message in error for error in errors), errors
+
+
+def test_check_routes_accepts_valid_rules():
+    assert check_routes(None, WEBHOOKS) == []
+    assert check_routes([
+        {'name': 'otp', 'sender_prefix': ['+49170', '+49171'], 'text_regex': 'Code',
+         'webhooks': 'otp'},
+        {'modem': 'lte1', 'webhooks': [ALL]},
+        {'text_regex': 'Werbung', 'drop': True},
+    ], WEBHOOKS) == []
@@ -0,0 +1,76 @@
+"""Tests für den Zeitplan des Polling-Betriebs (sms_monitor.scheduler)"""
+
+import pytest
+
+from sms_monitor.scheduler import PollScheduler
+
+
+class Config(dict):
+    """Minimaler Ersatz für das Config-Objekt"""
+
+    def get(self, key, default=None):
+        return super().get(key, default)
+
+
+def cycle(scheduler, now, duration=0.0, **result):
+    scheduler.begin(now)
+    return scheduler.end(now + duration, **result)
+
+
+def test_fixed_rate_subtracts_cycle_duration():
+    scheduler = PollScheduler(Config(check_interval=30, poll_adaptive=False))
+    assert cycle(scheduler, 100, duration=4) == pytest.approx(26)
+    assert cycle(scheduler, 200, duration=0, new_messages=3) == 30
+
+
+def test_overrun_starts_next_cycle_immediately():
+    scheduler = PollScheduler(Config(check_interval=10, poll_adaptive=False))
+    assert cycle(scheduler, 100, duration=12) == 0
+    assert scheduler.overruns == 1
+
+
+def test_adaptive_interval():
+    scheduler = PollScheduler(Config(check_interval=30, poll_min_interval=2,
+                                     poll_max_interval=120))
+    # Neue SMS: sofort auf das kürzeste Intervall
+    assert cycle(scheduler, 0, new_messages=1) == 2
+    # Leerlauf: schrittweise verdoppeln bis poll_max_interval
+    assert [cycle(scheduler, 0) for _ in range(8)] == [4, 8, 16, 32, 64, 120, 120, 120]
+    assert cycle(scheduler, 0, new_messages=1) == 2
+
+
+def test_bounds_include_check_interval():
+    scheduler = PollScheduler(Config(check_interval=300, poll_min_interval=2,
+                                     poll_max_interval=120))
+    assert scheduler._bounds() == (2, 300)
+
+    scheduler = PollScheduler(Config(check_interval=1, poll_min_interval=2,
+                                     poll_max_interval=120))
+    assert scheduler._bounds() == (1, 120)
+
+
+def test_error_backoff():
+    scheduler = PollScheduler(Config(check_interval=30, poll_min_interval=2,
+                                     poll_backoff_max=60))
+    delays = [cycle(scheduler, 0, error=True) for _ in range(6)]
+    assert delays == [4, 8, 16, 32, 60, 60]
+    assert scheduler.errors == 6
+
+    # Erfolgreicher Durchlauf setzt den Backoff zurück
+    cycle(scheduler, 0)
+    assert scheduler.errors == 0
+    assert cycle(scheduler, 0, error=True) == 4
+
+
+def test_error_backoff_starts_at_one_second():
+    scheduler = PollScheduler(Config(check_interval=30, poll_min_interval=0.5))
+    assert cycle(scheduler, 0, error=True) == 2
+
+
+def test_config_changes_apply_to_next_cycle():
+    config = Config(check_interval=30, poll_adaptive=False)
+    scheduler = PollScheduler(config)
+    assert cycle(scheduler, 0) == 30
+
+    config['check_interval'] = 10
+    assert cycle(scheduler, 0) == 10
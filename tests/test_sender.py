@@ -0,0 +1,201 @@
+"""Tests für den SMS-Versand (sms_monitor.sender)"""
+
+import threading
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from sms_monitor.sender import SendQueue, SendUnconfirmedError, SMSSender, TokenBucket
+
+
+class Config(dict):
+    """Minimaler Ersatz für das Config-Objekt"""
+
+    def get(self, key, default=None):
+        return super().get(key, default)
+
+
+class Modem:
+    def __init__(self, label):
+        self.label = label
+        self.path = f"/org/freedesktop/ModemManager1/Modem/{label}"
+
+
+class Harness:
+    """SMSSender ohne Scheduler-Thread; _dispatch() wird direkt aufgerufen"""
+
+    def __init__(self, tmp_path, connected=(), error=None, **config):
+        self.modems = [Modem(label) for label in connected]
+        self.sent = []
+        self.error = error
+        self.release = threading.Event()
+        self.release.set()
+        self.queue = SendQueue(str(tmp_path / 'send'))
+        self.sender = SMSSender(Config(config), self.queue, lambda: list(self.modems), self.send)
+
+    def send(self, modem, number, text):
+        self.release.wait(5)
+        self.sent.append((modem.label, number))
+        if self.error is not None:
+            raise self.error
+
+    def dispatch(self):
+        with self.sender._cond:
+            return self.sender._dispatch()
+
+    def join(self):
+        with self.sender._cond:
+            assert self.sender._cond.wait_for(lambda: not self.sender._threads, 5)
+
+    def status(self, job_id):
+        return self.sender.status(job_id)['status']
+
+
+def test_token_bucket_burst_and_refill():
+    bucket = TokenBucket(rate=2, burst=3)
+    now = bucket.updated
+    for _ in range(3):
+        assert bucket.delay(now) == 0
+        bucket.take(now)
+    assert bucket.delay(now) == pytest.approx(0.5)
+    assert bucket.delay(now + 0.5) == 0
+
+    # Nicht über burst hinaus ansparen
+    assert bucket.delay(now + 100) == 0
+    assert bucket.tokens == 3
+
+
+def test_token_bucket_ignores_earlier_time():
+    # _dispatch() misst die Zeit vor dem Anlegen neuer Buckets
+    bucket = TokenBucket(rate=1, burst=1)
+    assert bucket.delay(bucket.updated - 0.001) == 0
+
+
+def test_token_bucket_configure_limits_tokens():
+    bucket = TokenBucket(rate=1, burst=10)
+    bucket.configure(rate=1, burst=2)
+    assert bucket.tokens <= 2
+
+
+def test_dispatch_sends_over_free_modems(tmp_path):
+    h = Harness(tmp_path, connected=['a', 'b'])
+    jobs = [h.sender.submit(f"+49{i}", 'Hallo') for i in range(3)]
+
+    h.release.clear()
+    h.dispatch()
+    # Ein Versand pro Modem gleichzeitig
+    assert sorted(h.sender._busy) == ['a', 'b']
+    assert [h.status(job_id) for job_id in jobs].count('sending') == 2
+
+    h.release.set()
+    h.join()
+    h.dispatch()
+    h.join()
+    assert sorted(number for _, number in h.sent) == ['+490', '+491', '+492']
+    assert all(h.status(job_id) == 'sent' for job_id in jobs)
+    assert h.queue.pending() == []
+
+
+def test_dispatch_respects_send_rate(tmp_path):
+    h = Harness(tmp_path, connected=['a'], send_rate=60, send_burst=1)
+    h.sender.submit('+491', 'Hallo')
+    second = h.sender.submit('+492', 'Hallo')
+
+    h.dispatch()
+    h.join()
+    timeout = h.dispatch()
+    assert 0 < timeout <= 1
+    assert h.status(second) == 'pending'
+    assert len(h.sent) == 1
+
+
+def test_dispatch_waits_without_modems(tmp_path):
+    h = Harness(tmp_path)
+    job_id = h.sender.submit('+491', 'Hallo')
+
+    assert h.dispatch() == 5
+    assert h.status(job_id) == 'pending'
+
+    h.modems.append(Modem('a'))
+    h.dispatch()
+    h.join()
+    assert h.sent == [('a', '+491')]
+
+
+def test_pinned_job_waits_for_its_modem(tmp_path):
+    h = Harness(tmp_path, connected=['a'])
+    job_id = h.sender.submit('+491', 'Hallo', modem='b')
+
+    assert h.dispatch() == 5
+    assert h.status(job_id) == 'pending'
+    assert h.sent == []
+
+    h.modems.append(Modem('b'))
+    h.dispatch()
+    h.join()
+    assert h.sent == [('b', '+491')]
+
+
+def test_pinned_job_waits_for_busy_modem(tmp_path):
+    h = Harness(tmp_path, connected=['a', 'b'])
+    h.release.clear()
+    h.sender.submit('+491', 'Hallo', modem='a')
+    pinned = h.sender.submit('+492', 'Hallo', modem='a')
+
+    h.dispatch()
+    assert h.status(pinned) == 'pending'
+    h.release.set()
+    h.join()
+    h.dispatch()
+    h.join()
+    assert h.sent == [('a', '+491'), ('a', '+492')]
+
+
+def test_pinned_to_unknown_modem_fails(tmp_path):
+    h = Harness(tmp_path, connected=['a'],
+                modems=[{'index': 0, 'label': 'a'}, {'index': 1, 'label': 'b'}])
+    unknown = h.sender.submit('+491', 'Hallo', modem='c')
+    absent = h.sender.submit('+492', 'Hallo', modem='b')
+
+    h.dispatch()
+    assert h.status(unknown) == 'failed'
+    assert 'nicht konfiguriert' in h.sender.status(unknown)['last_error']
+    assert h.status(absent) == 'pending'
+
+
+def test_pinned_job_expires(tmp_path):
+    h = Harness(tmp_path, connected=['a'], send_modem_wait=60)
+    job = h.queue.create('+491', 'Hallo', modem='b')
+    job['created_at'] = (datetime.now() - timedelta(seconds=120)).isoformat()
+    h.queue.save(job)
+    with h.sender._cond:
+        h.sender._scan()
+
+    h.dispatch()
+    assert h.status(job['id']) == 'failed'
+    assert h.queue.pending() == []
+    assert h.sent == []
+
+
+def test_failed_send_is_retried(tmp_path):
+    h = Harness(tmp_path, connected=['a'], error=RuntimeError('Timeout'),
+                send_retry_delay=30)
+    job_id = h.sender.submit('+491', 'Hallo')
+
+    h.dispatch()
+    h.join()
+    status = h.sender.status(job_id)
+    assert status['status'] == 'pending'
+    assert status['attempts'] == 1
+    assert h.queue.pending()[0]['next_attempt'] > time.time() + 10
+
+
+def test_unconfirmed_send_is_not_retried(tmp_path):
+    h = Harness(tmp_path, connected=['a'], error=SendUnconfirmedError('SENDING'))
+    job_id = h.sender.submit('+491', 'Hallo')
+
+    h.dispatch()
+    h.join()
+    assert h.status(job_id) == 'failed'
+    assert h.queue.pending() == []
@@ -0,0 +1,204 @@
+"""Tests für die Datenbank verarbeiteter SMS (sms_monitor.store)"""
+
+import json
+import time
+
+import pytest
+
+from sms_monitor.store import (
+    BloomFilter, BloomFilteredStore, LogProcessedStore, SQLiteProcessedStore,
+    digest_key, open_processed_store
+)
+
+DAY = 86400
+
+
+@pytest.fixture(params=['sqlite', 'log'])
+def make_store(request, tmp_path):
+    """Fabrik für beide Backends (schließt am Ende den zuletzt geöffneten Store)"""
+    stores = []
+
+    def factory(**retention):
+        if request.param == 'sqlite':
+            store = SQLiteProcessedStore(tmp_path / 'processed.sqlite3', **retention)
+        else:
+            store = LogProcessedStore(tmp_path / 'processed.log', **retention)
+        stores.append(store)
+        return store
+
+    yield factory
+    if stores:
+        stores[-1].close()
+
+
+def test_add_is_visible_before_commit(make_store):
+    store = make_store()
+    assert '+49_1' not in store
+    store.add('+49_1')
+    assert '+49_1' in store
+    assert len(store) == 1
+
+
+def test_entries_survive_reopen(make_store):
+    store = make_store()
+    store.add('+49_1')
+    store.add('+49_2')
+    store.commit()
+    store.close()
+
+    store = make_store()
+    assert '+49_1' in store and '+49_2' in store
+    assert len(store) == 2
+
+
+def test_prune_retention(make_store):
+    store = make_store(retention_days=1)
+    now = time.time()
+    store.add('alt', now - 2 * DAY)
+    store.add('neu', now - 60)
+
+    assert store.prune() == 1
+    assert 'alt' not in store
+    assert 'neu' in store
+
+
+def test_prune_max_entries_keeps_newest(make_store):
+    store = make_store(max_entries=3)
+    now = time.time()
+    for i in range(5):
+        store.add(f"sms_{i}", now - 100 + i)
+
+    assert store.prune() == 2
+    assert len(store) == 3
+    assert 'sms_0' not in store and 'sms_1' not in store
+    assert all(f"sms_{i}" in store for i in range(2, 5))
+
+
+def test_commit_prunes(make_store):
+    store = make_store(retention_days=1)
+    store.add('alt', time.time() - 2 * DAY)
+    store.add('neu')
+    store.commit()
+    assert 'alt' not in store
+    assert 'neu' in store
+
+
+def test_maybe_prune_respects_interval(make_store):
+    store = make_store(retention_days=1)
+    store.add('alt', time.time() - 2 * DAY)
+    store.maybe_prune()
+    assert 'alt' not in store
+
+    # Innerhalb von PRUNE_INTERVAL kein weiterer Aufräumlauf
+    store.add('alt2', time.time() - 2 * DAY)
+    store.maybe_prune()
+    assert 'alt2' in store
+
+
+def test_without_limits_nothing_is_pruned(make_store):
+    store = make_store()
+    store.add('alt', time.time() - 365 * DAY)
+    store.maybe_prune()
+    assert 'alt' in store
+
+
+def test_log_skips_truncated_last_line(tmp_path):
+    path = tmp_path / 'processed.log'
+    store = LogProcessedStore(path)
+    store.add('+49_1')
+    store.commit()
+    store.close()
+
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write('{"d": "abc')
+
+    store = LogProcessedStore(path)
+    assert len(store) == 1
+    store.add('+49_2')
+    store.close()
+
+    # Der neue Eintrag steht in einer eigenen, lesbaren Zeile
+    store = LogProcessedStore(path)
+    assert '+49_1' in store and '+49_2' in store
+    store.close()
+
+
+def test_log_compact_drops_pruned_lines(tmp_path):
+    path = tmp_path / 'processed.log'
+    store = LogProcessedStore(path, max_entries=2)
+    for i in range(4):
+        store.add(f"sms_{i}", 1000 + i)
+    store.commit()
+    store.compact()
+    store.close()
+
+    lines = path.read_text(encoding='utf-8').splitlines()
+    assert len(lines) == 2
+    assert {json.loads(line)['d'] for line in lines} == {
+        digest_key('sms_2').hex(), digest_key('sms_3').hex()
+    }
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(1000)
+    digests = [digest_key(f"sms_{i}") for i in range(1000)]
+    for digest in digests:
+        bloom.add(digest)
+    assert all(digest in bloom for digest in digests)
+    assert bloom.count == 1000
+
+
+def test_bloom_filter_error_rate():
+    bloom = BloomFilter(1000, error_rate=0.01)
+    for i in range(1000):
+        bloom.add(digest_key(f"sms_{i}"))
+    false_positives = sum(digest_key(f"neu_{i}") in bloom for i in range(10000))
+    assert false_positives < 300
+
+
+def test_bloom_store_delegates_hits(tmp_path):
+    inner = SQLiteProcessedStore(tmp_path / 'processed.sqlite3')
+    inner.add('+49_1')
+    inner.commit()
+
+    store = BloomFilteredStore(inner, capacity=10)
+    assert '+49_1' in store
+    assert '+49_2' not in store
+    store.add('+49_2')
+    assert '+49_2' in store
+    store.close()
+
+
+def test_bloom_store_rebuilds_when_full(tmp_path):
+    store = BloomFilteredStore(SQLiteProcessedStore(tmp_path / 'processed.sqlite3'),
+                               capacity=4)
+    for i in range(10):
+        store.add(f"sms_{i}")
+    store.commit()
+
+    assert store.bloom.capacity >= 20
+    assert store.bloom.count == 10
+    assert all(f"sms_{i}" in store for i in range(10))
+    store.close()
+
+
+@pytest.mark.parametrize('backend, suffix', [('sqlite', '.sqlite3'), ('log', '.log')])
+def test_open_migrates_json(tmp_path, backend, suffix):
+    json_path = tmp_path / 'processed.json'
+    json_path.write_text(json.dumps({
+        '+49_1': {'saved_at': '2025-01-01T12:00:00'},
+        '+49_2': {'saved_at': '2025-01-02T12:00:00'},
+    }), encoding='utf-8')
+
+    store = open_processed_store(str(json_path), backend=backend)
+    assert '+49_1' in store and '+49_2' in store
+    store.close()
+
+    assert (tmp_path / f"processed{suffix}").exists()
+    assert not json_path.exists()
+    assert (tmp_path / 'processed.json.migrated').exists()
+
+
+def test_open_unknown_backend(tmp_path):
+    with pytest.raises(ValueError):
+        open_processed_store(str(tmp_path / 'processed.json'), backend='redis')